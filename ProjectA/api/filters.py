@@ -0,0 +1,15 @@
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.settings import api_settings
+
+from main.search import search_products
+
+
+class ProductSearchFilter(BaseFilterBackend):
+    search_param = api_settings.SEARCH_PARAM
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+        ranked = not request.query_params.get(api_settings.ORDERING_PARAM)
+        return search_products(queryset, query, ranked=ranked)
@@ -0,0 +1,102 @@
+import functools
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.db import transaction
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from marketplace.redis_client import get_redis
+
+
+HEADER = 'Idempotency-Key'
+RESULT_KEY = 'idempotency:{}'
+LOCK_KEY = 'idempotency:{}:lock'
+POLL_INTERVAL = 0.05
+
+
+def request_scope(request):
+    if request.user.is_authenticated:
+        return f'user:{request.user.pk}'
+    if request.session.session_key:
+        return f'session:{request.session.session_key}'
+    return None
+
+
+def fingerprint(request):
+    payload = json.dumps(request.data, cls=JSONEncoder, sort_keys=True)
+    return hashlib.sha256(f'{request.method} {request.path} {payload}'.encode()).hexdigest()
+
+
+def replay(stored, request):
+    stored = json.loads(stored)
+    if stored['fingerprint'] != fingerprint(request):
+        return Response(
+            {'error': 'Ключ ідемпотентності вже використано для іншого запиту'},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+    response = Response(stored['data'], status=stored['status'])
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def idempotent(view):
+    @functools.wraps(view)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        scope = request_scope(request)
+        if not key or scope is None:
+            return view(self, request, *args, **kwargs)
+
+        redis = get_redis()
+        name = f'{scope}:{request.path}:{key}'
+        result_key, lock_key = RESULT_KEY.format(name), LOCK_KEY.format(name)
+
+        stored = redis.get(result_key)
+        if stored is not None:
+            return replay(stored, request)
+
+        if not redis.set(lock_key, 1, nx=True, ex=settings.IDEMPOTENCY['LOCK_TIMEOUT']):
+            deadline = time.monotonic() + settings.IDEMPOTENCY['WAIT']
+            while time.monotonic() < deadline:
+                time.sleep(POLL_INTERVAL)
+                stored = redis.get(result_key)
+                if stored is not None:
+                    return replay(stored, request)
+            return Response(
+                {'error': 'Запит з цим ключем ще обробляється'},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        try:
+            stored = redis.get(result_key)
+            if stored is None:
+                response = view(self, request, *args, **kwargs)
+        except BaseException:
+            redis.delete(lock_key)
+            raise
+
+        if stored is not None:
+            redis.delete(lock_key)
+            return replay(stored, request)
+        if response.status_code >= 500:
+            redis.delete(lock_key)
+            return response
+
+        result = json.dumps({
+            'fingerprint': fingerprint(request),
+            'status': response.status_code,
+            'data': response.data,
+        }, cls=JSONEncoder)
+
+        def store():
+            redis.set(result_key, result, ex=settings.IDEMPOTENCY['TTL'])
+            redis.delete(lock_key)
+
+        transaction.on_commit(store)
+        return response
+
+    return wrapper
@@ -0,0 +1,52 @@
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+from main.pagination import keyset_page
+
+
+class ProductKeysetPagination(BasePagination):
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    orderings = ('created_at', 'price', 'views_count')
+    default_ordering = '-created_at'
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return settings.PRODUCT_PAGE_SIZE
+        return max(min(page_size, self.max_page_size), 1)
+
+    def get_ordering(self, request, queryset):
+        ordering = request.query_params.get(api_settings.ORDERING_PARAM, '').split(',')[0].strip()
+        if ordering.lstrip('-') in self.orderings:
+            return ordering
+        if 'search_rank' in queryset.query.annotations:
+            return '-search_rank'
+        return self.default_ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        try:
+            page, self.next_cursor = keyset_page(
+                queryset,
+                self.get_ordering(request, queryset),
+                request.query_params.get(self.cursor_query_param),
+                self.get_page_size(request),
+            )
+        except ValueError:
+            raise ParseError('Невірний курсор')
+        return page
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({'results': data, 'next': self.get_next_link()})
@@ -0,0 +1,21 @@
+from django.db.models import Prefetch
+from main.models import Category, Product
+
+
+def plan_product_list(queryset=None):
+    if queryset is None:
+        queryset = Product.objects.all()
+
+    return queryset.prefetch_related(
+        Prefetch('category', queryset=Category.objects.with_products_count())
+    )
+
+
+def plan_product_detail(queryset=None):
+    if queryset is None:
+        queryset = Product.objects.all()
+
+    return plan_product_list(queryset).select_related('seller').prefetch_related(
+        'images',
+        'product_sizes__size',
+    )
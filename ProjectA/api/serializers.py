@@ -1,7 +1,6 @@
 from rest_framework import serializers
-from django.db.models import Sum
 from main.models import Category, Product, ProductSize, ProductImage, Size
-from cart.models import Cart, CartItem
+from cart.models import CartItem
 from users.models import CustomUser
 from django.utils.text import slugify
 from seller.views import generate_unique_slug
@@ -68,6 +67,8 @@ class CategorySerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'slug']
 
     def get_products_count(self, obj):
+        if hasattr(obj, 'products_count'):
+            return obj.products_count
         return obj.products.count()
 
 
@@ -89,7 +90,7 @@ class ProductSizeSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = ProductSize
-        fields = ['id', 'size', 'size_id', 'size_name', 'stock']
+        fields = ['id', 'size', 'size_id', 'size_name', 'stock', 'available_stock']
 
 class ProductImageSerializer(serializers.ModelSerializer):
 
@@ -108,15 +109,16 @@ class SellerSerializer(serializers.ModelSerializer):
 class ProductListSerializer(serializers.ModelSerializer):
     category = CategorySerializer(read_only=True)
     discount_percent = serializers.SerializerMethodField()
-    is_in_stock = serializers.SerializerMethodField()
-    total_stock = serializers.SerializerMethodField()
+    is_in_stock = serializers.BooleanField(read_only=True)
+    total_stock = serializers.IntegerField(source='stock', read_only=True)
+    available_stock = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Product
         fields = [
             'id', 'name', 'slug', 'category', 'price', 'old_price',
-            'main_image', 'color', 'total_stock', 'is_in_stock', 'is_new', 'is_bestseller',
-            'is_recommended', 'discount_percent', 'views_count'
+            'main_image', 'color', 'total_stock', 'available_stock', 'is_in_stock', 'is_new', 'is_bestseller',
+            'is_recommended', 'flash_sale', 'discount_percent', 'views_count'
         ]
 
     def get_discount_percent(self, obj):
@@ -124,21 +126,6 @@ class ProductListSerializer(serializers.ModelSerializer):
             return round((1 - float(obj.price) / float(obj.old_price)) * 100)
         return 0
 
-    def get_is_in_stock(self, obj):
-        if obj.category and obj.category.requires_size:
-            total = obj.product_sizes.aggregate(total=Sum('stock'))['total']
-            return (total or 0) > 0
-        else:
-            if hasattr(obj, 'stock') and obj.stock is not None:
-                return obj.stock > 0
-            return True
-
-    def get_total_stock(self, obj):
-        if obj.category and obj.category.requires_size:
-            return obj.product_sizes.aggregate(total=Sum('stock'))['total'] or 0
-        else:
-            return getattr(obj, 'stock', 0) or 0
-
 
 class ProductDetailSerializer(serializers.ModelSerializer):
 
@@ -153,8 +140,8 @@ class ProductDetailSerializer(serializers.ModelSerializer):
     images = ProductImageSerializer(many=True, read_only=True)
     product_sizes = ProductSizeSerializer(many=True, read_only=True)
     discount_percent = serializers.SerializerMethodField()
-    is_in_stock = serializers.SerializerMethodField()
-    total_stock = serializers.SerializerMethodField()
+    is_in_stock = serializers.BooleanField(read_only=True)
+    total_stock = serializers.IntegerField(source='stock', read_only=True)
 
     class Meta:
         model = Product
@@ -162,7 +149,7 @@ class ProductDetailSerializer(serializers.ModelSerializer):
             'id', 'name', 'slug', 'description', 'category', 'category_id',
             'seller', 'price', 'old_price', 'main_image', 'images',
             'color', 'total_stock', 'is_in_stock', 'product_sizes',
-            'is_new', 'is_bestseller', 'is_recommended', 'discount_percent',
+            'is_new', 'is_bestseller', 'is_recommended', 'flash_sale', 'discount_percent',
             'views_count', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'slug', 'seller', 'views_count', 'created_at', 'updated_at']
@@ -172,21 +159,6 @@ class ProductDetailSerializer(serializers.ModelSerializer):
             return round((1 - float(obj.price) / float(obj.old_price)) * 100)
         return 0
 
-    def get_is_in_stock(self, obj):
-        if obj.category and obj.category.requires_size:
-            total = obj.product_sizes.aggregate(total=Sum('stock'))['total']
-            return (total or 0) > 0
-        else:
-            if hasattr(obj, 'stock') and obj.stock is not None:
-                return obj.stock > 0
-            return True
-
-    def get_total_stock(self, obj):
-        if obj.category and obj.category.requires_size:
-            return obj.product_sizes.aggregate(total=Sum('stock'))['total'] or 0
-        else:
-            return getattr(obj, 'stock', 0) or 0
-
     def create(self, validated_data):
         validated_data['seller'] = self.context['request'].user
         return super().create(validated_data)
@@ -298,16 +270,11 @@ class CartItemSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'added_at']
 
 
-class CartSerializer(serializers.ModelSerializer):
-    items = CartItemSerializer(many=True, read_only=True)
+class CartSerializer(serializers.Serializer):
+    items = CartItemSerializer(source='get_items', many=True, read_only=True)
     total_items = serializers.ReadOnlyField()
     subtotal = serializers.ReadOnlyField()
 
-    class Meta:
-        model = Cart
-        fields = ['id', 'session_key', 'items', 'total_items', 'subtotal', 'created_at', 'updated_at']
-        read_only_fields = ['id', 'session_key', 'created_at', 'updated_at']
-
 
 class AddToCartSerializer(serializers.Serializer):
     product_id = serializers.IntegerField()
@@ -322,4 +289,30 @@ class AddToCartSerializer(serializers.Serializer):
     def validate_product_size_id(self, value):
         if value and not ProductSize.objects.filter(id=value).exists():
             raise serializers.ValidationError('Size not found')
-        return value
\ No newline at end of file
+        return value
+
+
+class CartOperationSerializer(serializers.Serializer):
+    op = serializers.ChoiceField(choices=['add', 'update', 'remove'])
+    product_id = serializers.IntegerField(required=False)
+    product_size_id = serializers.IntegerField(required=False, allow_null=True)
+    item_id = serializers.IntegerField(required=False)
+    quantity = serializers.IntegerField(min_value=0, required=False)
+
+    def validate(self, data):
+        if data['op'] == 'add':
+            if 'product_id' not in data:
+                raise serializers.ValidationError({'product_id': 'This field is required.'})
+            data.setdefault('quantity', 1)
+            if data['quantity'] < 1:
+                raise serializers.ValidationError({'quantity': 'Ensure this value is greater than or equal to 1.'})
+        else:
+            if 'item_id' not in data:
+                raise serializers.ValidationError({'item_id': 'This field is required.'})
+            if data['op'] == 'update' and 'quantity' not in data:
+                raise serializers.ValidationError({'quantity': 'This field is required.'})
+        return data
+
+
+class CartBatchSerializer(serializers.Serializer):
+    operations = CartOperationSerializer(many=True, allow_empty=False, max_length=100)
\ No newline at end of file
@@ -4,21 +4,38 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly, AllowAny
 from rest_framework.views import APIView
 from rest_framework.authtoken.models import Token
+from django.conf import settings
 from django.contrib.auth import authenticate
-from django.db.models import F, Q
+from django.db import transaction
+from django.db.models import F
 from django_filters.rest_framework import DjangoFilterBackend
 from main.models import Category, Product, ProductSize, Size
-from cart.models import Cart, CartItem
+from main.cache import cached_catalog_data
+from main.facets import facet_counts, facet_filters
+from main.search import search_products
+from main.suggest import get_suggest_index
+from main.view_counter import view_counter
+from cart.batch import plan_batch
+from cart.storage import get_cart, merge_session_cart
 from users.models import CustomUser
-from orders.models import Order, OrderItem
-from decimal import Decimal
+from orders.models import Order
+from orders.flash_sale import enqueue_checkout, get_ticket, process_queue, queue_is_shared, requires_queue
+from orders.history import history_page
+from orders.reservations import available_for, reserve_cart
+from orders.services import CheckoutError, InsufficientStock, place_order
+from orders.tasks import process_flash_sale_queue
 from .serializers import (
     CategorySerializer, ProductListSerializer, ProductDetailSerializer,
     ProductCreateSerializer, SizeSerializer, ProductSizeSerializer,
-    CartSerializer, CartItemSerializer, AddToCartSerializer,
+    CartSerializer, CartItemSerializer, AddToCartSerializer, CartBatchSerializer,
     UserSerializer, UserDetailSerializer, UserRegistrationSerializer
 )
+from .filters import ProductSearchFilter
+from .idempotency import idempotent
+from .pagination import ProductKeysetPagination
 from .permissions import IsOwnerOrReadOnly, IsSellerOrReadOnly
+from .planner import plan_product_list, plan_product_detail
+from .query_budget import QueryBudgetMixin
 
 
 class RegisterAPIView(APIView):
@@ -54,6 +71,7 @@ class LoginAPIView(APIView):
 
         if user:
             token, created = Token.objects.get_or_create(user=user)
+            merge_session_cart(request, user)
             return Response({
                 'user': UserSerializer(user).data,
                 'token': token.key
@@ -94,10 +112,13 @@ class CurrentUserAPIView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class UserViewSet(viewsets.ReadOnlyModelViewSet):
+class UserViewSet(QueryBudgetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = CustomUser.objects.filter(is_active=True)
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    query_budgets = {
+        'products': 4,
+    }
 
     @action(detail=True, methods=['get'])
     def products(self, request, pk=None):
@@ -107,21 +128,32 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
                 {'error': 'Користувач не є продавцем'},
                 status=status.HTTP_404_NOT_FOUND
             )
-        products = Product.objects.filter(seller=user)
-        serializer = ProductListSerializer(products, many=True)
-        return Response(serializer.data)
+        products = plan_product_list(Product.objects.filter(seller=user))
+        paginator = ProductKeysetPagination()
+        page = paginator.paginate_queryset(products, request, view=self)
+        return paginator.get_paginated_response(ProductListSerializer(page, many=True).data)
 
 
-class CategoryViewSet(viewsets.ModelViewSet):
-    queryset = Category.objects.all()
+class CategoryViewSet(QueryBudgetMixin, viewsets.ModelViewSet):
+    queryset = Category.objects.with_products_count()
     serializer_class = CategorySerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     lookup_field = 'slug'
+    query_budgets = {
+        'list': 2,
+        'retrieve': 2,
+        'products': 4,
+    }
 
     @action(detail=True, methods=['get'])
     def products(self, request, slug=None):
+        return Response(cached_catalog_data(
+            'category-products', request, lambda: self.get_products_data(request)
+        ))
+
+    def get_products_data(self, request):
         category = self.get_object()
-        products = Product.objects.filter(category=category)
+        products = plan_product_list(Product.objects.filter(category=category))
 
         min_price = request.query_params.get('min_price')
         max_price = request.query_params.get('max_price')
@@ -134,19 +166,32 @@ class CategoryViewSet(viewsets.ModelViewSet):
         if color:
             products = products.filter(color__iexact=color)
 
-        serializer = ProductListSerializer(products, many=True)
-        return Response(serializer.data)
+        paginator = ProductKeysetPagination()
+        page = paginator.paginate_queryset(products, request, view=self)
+        return paginator.get_paginated_response(ProductListSerializer(page, many=True).data).data
 
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(QueryBudgetMixin, viewsets.ModelViewSet):
     queryset = Product.objects.all()
     permission_classes = [IsAuthenticatedOrReadOnly, IsSellerOrReadOnly]
     lookup_field = 'slug'
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['category', 'color', 'is_new', 'is_bestseller', 'is_recommended']
-    search_fields = ['name', 'description']
+    pagination_class = ProductKeysetPagination
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, ProductSearchFilter]
+    filterset_fields = ['category', 'is_new', 'is_bestseller', 'is_recommended']
     ordering_fields = ['price', 'created_at', 'views_count']
     ordering = ['-created_at']
+    query_budgets = {
+        'list': 3,
+        'retrieve': 5,
+        'recommended': 3,
+        'bestsellers': 3,
+        'new': 3,
+        'popular': 3,
+        'sale': 3,
+        'related': 6,
+        'suggest': 2,
+        'facets': 2,
+    }
 
     def get_serializer_class(self):
         if self.action == 'list':
@@ -171,96 +216,87 @@ class ProductViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
     def get_queryset(self):
-        queryset = Product.objects.all()
-
-        category_slug = self.request.query_params.get('category_slug')
-        if category_slug:
-            queryset = queryset.filter(category__slug=category_slug)
-
-        min_price = self.request.query_params.get('min_price')
-        max_price = self.request.query_params.get('max_price')
-        has_discount = self.request.query_params.get('has_discount')
-        color = self.request.query_params.get('color')
-        size = self.request.query_params.get('size')
-        in_stock = self.request.query_params.get('in_stock')
-
-        if min_price:
-            queryset = queryset.filter(price__gte=min_price)
-        if max_price:
-            queryset = queryset.filter(price__lte=max_price)
-        if has_discount:
-            queryset = queryset.filter(old_price__isnull=False, old_price__gt=F('price'))
-        if color:
-            queryset = queryset.filter(color__icontains=color)
-
-        if size:
-            if size.isdigit():
-                queryset = queryset.filter(product_sizes__size_id=size, product_sizes__stock__gt=0)
-            else:
-                queryset = queryset.filter(product_sizes__size__name__iexact=size, product_sizes__stock__gt=0)
-            queryset = queryset.distinct()
-
-        if in_stock == 'true':
-            from django.db.models import Sum, IntegerField
-            from django.db.models.functions import Coalesce
-
-            queryset = queryset.annotate(
-                sizes_stock=Coalesce(Sum('product_sizes__stock'), 0, output_field=IntegerField())
-            )
+        if self.action == 'list':
+            queryset = plan_product_list()
+        elif self.action in ('retrieve', 'update', 'partial_update'):
+            queryset = plan_product_detail()
+        else:
+            queryset = Product.objects.all()
 
-            queryset = queryset.filter(
-                Q(category__requires_size=True, sizes_stock__gt=0) |
-                Q(category__requires_size=False, stock__gt=0) |
-                Q(category__isnull=True, stock__gt=0)
-            )
+        return queryset.filter(*facet_filters(self.request.query_params).values())
 
-        return queryset
+    def list(self, request, *args, **kwargs):
+        build = super().list
+        return Response(cached_catalog_data(
+            'product-list', request, lambda: build(request, *args, **kwargs).data
+        ))
 
     def retrieve(self, request, *args, **kwargs):
-        instance = self.get_object()
-        Product.objects.filter(pk=instance.pk).update(views_count=F('views_count') + 1)
-        serializer = self.get_serializer(instance)
-        return Response(serializer.data)
+        data = cached_catalog_data(
+            'product-detail', request, lambda: self.get_serializer(self.get_object()).data
+        )
+        pending = view_counter.increment(data['id'])
+        return Response({**data, 'views_count': data['views_count'] + pending})
 
     @action(detail=False, methods=['get'])
     def recommended(self, request):
-        products = Product.objects.filter(is_recommended=True)[:12]
+        products = plan_product_list(Product.objects.filter(is_recommended=True))[:12]
         serializer = ProductListSerializer(products, many=True)
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
     def bestsellers(self, request):
-        products = Product.objects.filter(is_bestseller=True)[:12]
+        products = plan_product_list(Product.objects.filter(is_bestseller=True))[:12]
         serializer = ProductListSerializer(products, many=True)
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
     def new(self, request):
-        products = Product.objects.filter(is_new=True)[:12]
+        products = plan_product_list(Product.objects.filter(is_new=True))[:12]
         serializer = ProductListSerializer(products, many=True)
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
     def popular(self, request):
-        products = Product.objects.order_by('-views_count')[:12]
+        products = plan_product_list(Product.objects.order_by('-views_count'))[:12]
         serializer = ProductListSerializer(products, many=True)
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
     def sale(self, request):
-        products = Product.objects.filter(
+        products = plan_product_list(Product.objects.filter(
             old_price__isnull=False,
             old_price__gt=F('price')
-        )[:12]
+        ))[:12]
         serializer = ProductListSerializer(products, many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['get'])
+    def suggest(self, request):
+        limit = settings.SUGGEST['LIMIT']
+        try:
+            limit = max(min(int(request.query_params.get('limit', limit)), limit), 1)
+        except ValueError:
+            pass
+        return Response(get_suggest_index().suggest(request.query_params.get('q', ''), limit))
+
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        def build():
+            products = DjangoFilterBackend().filter_queryset(request, Product.objects.all(), self)
+            query = request.query_params.get('search', '').strip()
+            if query:
+                products = search_products(products, query, ranked=False)
+            return facet_counts(products, request.query_params)
+
+        return Response(cached_catalog_data('product-facets', request, build))
+
     @action(detail=True, methods=['get'])
     def related(self, request, slug=None):
         product = self.get_object()
-        related = Product.objects.filter(
-            category=product.category
-        ).exclude(id=product.id)[:8]
+        related = plan_product_list(Product.objects.filter(
+            category_id=product.category_id
+        ).exclude(id=product.id))[:8]
         serializer = ProductListSerializer(related, many=True)
         return Response(serializer.data)
 
@@ -291,13 +327,7 @@ class CartViewSet(viewsets.ViewSet):
     permission_classes = [AllowAny]
 
     def get_cart(self, request):
-        if not request.session.session_key:
-            request.session.create()
-
-        cart, created = Cart.objects.get_or_create(
-            session_key=request.session.session_key
-        )
-        return cart
+        return get_cart(request)
 
     def list(self, request):
         cart = self.get_cart(request)
@@ -305,6 +335,7 @@ class CartViewSet(viewsets.ViewSet):
         return Response(serializer.data)
 
     @action(detail=False, methods=['post'])
+    @idempotent
     def add(self, request):
         cart = self.get_cart(request)
         serializer = AddToCartSerializer(data=request.data)
@@ -319,48 +350,41 @@ class CartViewSet(viewsets.ViewSet):
         if data.get('product_size_id'):
             product_size = ProductSize.objects.get(id=data['product_size_id'])
         elif product.category.requires_size:
-            product_size = product.product_sizes.filter(stock__gt=0).first()
+            product_size = product.product_sizes.filter(stock__gt=F('reserved')).first()
             if not product_size:
                 return Response(
                     {'error': 'Немає доступних розмірів'},
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-        if product_size and product_size.stock < data['quantity']:
+        available_stock = available_for(cart, product_size) if product_size else None
+        if available_stock is not None and available_stock < data['quantity']:
             return Response(
-                {'error': f'Доступно лише {product_size.stock} шт.'},
+                {'error': f'Доступно лише {available_stock} шт.'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            product_size=product_size,
-            defaults={'quantity': data['quantity']}
-        )
+        existing_item = cart.find_item(product, product_size)
 
-        if not created:
-            new_quantity = cart_item.quantity + data['quantity']
-            if product_size and new_quantity > product_size.stock:
-                return Response(
-                    {'error': f'Максимальна кількість: {product_size.stock} шт.'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            cart_item.quantity = new_quantity
-            cart_item.save()
+        if existing_item and product_size and existing_item.quantity + data['quantity'] > available_stock:
+            return Response(
+                {'error': f'Максимальна кількість: {available_stock} шт.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        cart.add_product(product, product_size, data['quantity'])
 
         return Response({
             'message': 'Товар додано до кошика',
             'cart': CartSerializer(cart).data
-        }, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+        }, status=status.HTTP_200_OK if existing_item else status.HTTP_201_CREATED)
 
     @action(detail=False, methods=['patch'], url_path='update/(?P<item_id>[^/.]+)')
     def update_item(self, request, item_id=None):
         cart = self.get_cart(request)
 
-        try:
-            cart_item = cart.items.get(id=item_id)
-        except CartItem.DoesNotExist:
+        cart_item = cart.get_item(item_id)
+        if cart_item is None:
             return Response(
                 {'error': 'Товар не знайдено в кошику'},
                 status=status.HTTP_404_NOT_FOUND
@@ -369,20 +393,20 @@ class CartViewSet(viewsets.ViewSet):
         quantity = request.data.get('quantity', 1)
 
         if quantity <= 0:
-            cart_item.delete()
+            cart.remove_item(cart_item.id)
             return Response({
                 'message': 'Товар видалено з кошика',
                 'cart': CartSerializer(cart).data
             })
 
-        if cart_item.product_size and quantity > cart_item.product_size.stock:
+        available_stock = available_for(cart, cart_item.product_size) if cart_item.product_size else None
+        if available_stock is not None and quantity > available_stock:
             return Response(
-                {'error': f'Доступно лише {cart_item.product_size.stock} шт.'},
+                {'error': f'Доступно лише {available_stock} шт.'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        cart_item.quantity = quantity
-        cart_item.save()
+        cart.update_item_quantity(cart_item.id, quantity)
 
         return Response({
             'message': 'Кількість оновлено',
@@ -392,22 +416,38 @@ class CartViewSet(viewsets.ViewSet):
     @action(detail=False, methods=['delete'], url_path='remove/(?P<item_id>[^/.]+)')
     def remove_item(self, request, item_id=None):
         cart = self.get_cart(request)
-
-        try:
-            cart_item = cart.items.get(id=item_id)
-            cart_item.delete()
-        except CartItem.DoesNotExist:
-            pass
+        cart.remove_item(item_id)
 
         return Response({
             'message': 'Товар видалено',
             'cart': CartSerializer(cart).data
         })
 
+    @action(detail=False, methods=['post'])
+    @idempotent
+    def batch(self, request):
+        serializer = CartBatchSerializer(data=request.data)
+
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        cart = self.get_cart(request)
+
+        with transaction.atomic():
+            changes, errors = plan_batch(cart, serializer.validated_data['operations'])
+            if errors:
+                return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+            cart.set_quantities(changes)
+
+        return Response({
+            'message': 'Кошик оновлено',
+            'cart': CartSerializer(cart).data
+        })
+
     @action(detail=False, methods=['delete'])
     def clear(self, request):
         cart = self.get_cart(request)
-        cart.items.all().delete()
+        cart.clear()
 
         return Response({
             'message': 'Кошик очищено',
@@ -427,7 +467,14 @@ class OrderViewSet(viewsets.ViewSet):
     permission_classes = [IsAuthenticated]
 
     def list(self, request):
-        orders = Order.objects.filter(user=request.user).order_by('-created_at')
+        try:
+            orders, next_cursor = history_page(request.user, request.query_params.get('cursor'))
+        except ValueError:
+            return Response(
+                {'error': 'Невірний курсор'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
         data = []
         for order in orders:
             data.append({
@@ -437,9 +484,14 @@ class OrderViewSet(viewsets.ViewSet):
                 'created_at': order.created_at.isoformat(),
                 'city': order.city,
                 'address1': order.address1,
-                'items_count': order.items.count(),
+                'items_count': order.items_count,
+                'items_quantity': order.items_quantity,
             })
-        return Response(data)
+
+        next_url = None
+        if next_cursor:
+            next_url = request.build_absolute_uri(f'{request.path}?cursor={next_cursor}')
+        return Response({'results': data, 'next': next_url})
 
     def retrieve(self, request, pk=None):
         try:
@@ -487,21 +539,27 @@ class OrderViewSet(viewsets.ViewSet):
         return Response(data)
 
     @action(detail=False, methods=['post'])
-    def checkout(self, request):
-        if not request.session.session_key:
+    def reserve(self, request):
+        try:
+            expires_at = reserve_cart(get_cart(request))
+        except InsufficientStock as e:
             return Response(
-                {'error': 'Кошик порожній'},
+                {'error': str(e), 'shortages': e.shortages},
                 status=status.HTTP_400_BAD_REQUEST
             )
-
-        try:
-            cart = Cart.objects.get(session_key=request.session.session_key)
-        except Cart.DoesNotExist:
+        except CheckoutError as e:
             return Response(
-                {'error': 'Кошик порожній'},
+                {'error': str(e)},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        return Response({'expires_at': expires_at.isoformat()})
+
+    @action(detail=False, methods=['post'])
+    @idempotent
+    def checkout(self, request):
+        cart = get_cart(request)
+
         if cart.total_items == 0:
             return Response(
                 {'error': 'Кошик порожній'},
@@ -516,42 +574,50 @@ class OrderViewSet(viewsets.ViewSet):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-        order = Order.objects.create(
-            user=request.user,
-            first_name=request.data.get('first_name'),
-            last_name=request.data.get('last_name'),
-            email=request.data.get('email', request.user.email),
-            company=request.data.get('company', ''),
-            address1=request.data.get('address1', ''),
-            address2=request.data.get('address2', ''),
-            city=request.data.get('city', ''),
-            country=request.data.get('country', ''),
-            state=request.data.get('state', ''),
-            postal_code=request.data.get('postal_code', ''),
-            phone_number=request.data.get('phone_number', ''),
-            total_price=cart.subtotal,
-            payment_provider=request.data.get('payment_provider'),
-        )
-
-        for item in cart.items.select_related('product', 'product_size'):
-            OrderItem.objects.create(
-                order=order,
-                product=item.product,
-                size=item.product_size,
-                quantity=item.quantity,
-                price=item.product.price or Decimal('0.00'),
-            )
+        details = {
+            'first_name': request.data.get('first_name'),
+            'last_name': request.data.get('last_name'),
+            'email': request.data.get('email', request.user.email),
+            'company': request.data.get('company', ''),
+            'address1': request.data.get('address1', ''),
+            'address2': request.data.get('address2', ''),
+            'city': request.data.get('city', ''),
+            'country': request.data.get('country', ''),
+            'state': request.data.get('state', ''),
+            'postal_code': request.data.get('postal_code', ''),
+            'phone_number': request.data.get('phone_number', ''),
+            'payment_provider': request.data.get('payment_provider'),
+        }
 
-            if item.product_size:
-                item.product_size.stock = max(0, item.product_size.stock - item.quantity)
-                item.product_size.save(update_fields=['stock'])
-            elif hasattr(item.product, 'stock') and item.product.stock is not None:
-                item.product.stock = max(0, item.product.stock - item.quantity)
-                item.product.save(update_fields=['stock'])
+        if requires_queue(cart):
+            ticket = enqueue_checkout(request.user, details)
+            transaction.on_commit(process_flash_sale_queue.delay if queue_is_shared() else process_queue)
+            return Response(get_ticket(ticket, request.user), status=status.HTTP_202_ACCEPTED)
 
-        cart.items.all().delete()
+        try:
+            order = place_order(cart, request.user, **details)
+        except InsufficientStock as e:
+            return Response(
+                {'error': str(e), 'shortages': e.shortages},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        except CheckoutError as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
         return Response({
             'message': 'Замовлення створено',
             'order_id': order.id,
-        }, status=status.HTTP_201_CREATED)
\ No newline at end of file
+        }, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['get'], url_path=r'tickets/(?P<ticket>[0-9a-f]{32})')
+    def ticket(self, request, ticket=None):
+        data = get_ticket(ticket, request.user)
+        if data is None:
+            return Response(
+                {'error': 'Квиток не знайдено'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(data)
\ No newline at end of file
@@ -15,9 +15,10 @@ class CartItemInLine(admin.TabularInline):
 
 @admin.register(Cart)
 class CartAdmin(admin.ModelAdmin):
-    list_display = ('session_key', 'total_items', 'subtotal', 'created_at', 'updated_at')
+    list_display = ('session_key', 'user', 'total_items', 'subtotal', 'created_at', 'updated_at')
     list_filter = ('created_at', 'updated_at')
-    search_fields = ('session_key',)
+    search_fields = ('session_key', 'user__email')
+    list_select_related = ('user',)
     inlines = [CartItemInLine]
     readonly_fields = ('total_items', 'subtotal')
 
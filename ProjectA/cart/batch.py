@@ -0,0 +1,86 @@
+from django.db.models import F, Q
+
+from main.models import Product, ProductSize
+from orders.reservations import held_sizes
+
+
+def item_key(item):
+    return (item.product.pk, item.product_size.pk if item.product_size else None)
+
+
+def plan_batch(cart, operations):
+    items = {item.id: item for item in cart.get_items()}
+    current = {item_key(item): item.quantity for item in items.values()}
+
+    adds = [operation for operation in operations if operation['op'] == 'add']
+    products = Product.objects.select_related('category').in_bulk(
+        {operation['product_id'] for operation in adds}
+    )
+    size_ids = {operation['product_size_id'] for operation in adds if operation.get('product_size_id')}
+    default_size_products = {
+        operation['product_id'] for operation in adds
+        if not operation.get('product_size_id')
+        and operation['product_id'] in products
+        and products[operation['product_id']].category.requires_size
+    }
+
+    sized_items = [item for item in items.values() if item.product_size]
+    held = held_sizes(cart) if sized_items or size_ids or default_size_products else {}
+    stock = {
+        item.product_size.pk: item.product_size.available_stock + held.get(item.product_size.pk, 0)
+        for item in sized_items
+    }
+    sizes, default_sizes = {}, {}
+    if size_ids or default_size_products:
+        for size in ProductSize.objects.filter(
+            Q(pk__in=size_ids) | Q(product_id__in=default_size_products, stock__gt=F('reserved'))
+        ).order_by('pk'):
+            sizes[size.pk] = size
+            stock[size.pk] = size.available_stock + held.get(size.pk, 0)
+            if size.product_id in default_size_products and size.available_stock > 0:
+                default_sizes.setdefault(size.product_id, size)
+
+    quantities = dict(current)
+    touched = {}
+    errors = []
+    for index, operation in enumerate(operations):
+        if operation['op'] == 'add':
+            product = products.get(operation['product_id'])
+            if product is None:
+                errors.append({'index': index, 'error': 'Товар не знайдено'})
+                continue
+
+            size_id = operation.get('product_size_id')
+            if size_id:
+                product_size = sizes.get(size_id)
+                if product_size is None or product_size.product_id != product.pk:
+                    errors.append({'index': index, 'error': 'Розмір не знайдено'})
+                    continue
+            elif product.category.requires_size:
+                product_size = default_sizes.get(product.pk)
+                if product_size is None:
+                    errors.append({'index': index, 'error': 'Немає доступних розмірів'})
+                    continue
+            else:
+                product_size = None
+
+            key = (product.pk, product_size.pk if product_size else None)
+            quantities[key] = quantities.get(key, 0) + operation['quantity']
+        else:
+            item = items.get(operation['item_id'])
+            if item is None:
+                errors.append({'index': index, 'error': 'Товар не знайдено в кошику'})
+                continue
+
+            key = item_key(item)
+            quantities[key] = operation['quantity'] if operation['op'] == 'update' else 0
+        touched[key] = index
+
+    for key, quantity in quantities.items():
+        size_id = key[1]
+        if size_id and quantity > current.get(key, 0) and quantity > stock[size_id]:
+            errors.append({'index': touched[key], 'error': f'Доступно лише {stock[size_id]} шт.'})
+
+    errors.sort(key=lambda error: error['index'])
+    changes = {key: quantity for key, quantity in quantities.items() if quantity != current.get(key, 0)}
+    return changes, errors
@@ -0,0 +1,69 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from orders.models import StockReservation
+from .models import Cart, CartItem
+
+
+def stale_carts(anonymous_idle_days, user_idle_days=None, now=None):
+    now = now or timezone.now()
+    live_session = Session.objects.filter(session_key=OuterRef('session_key'), expire_date__gt=now)
+    condition = Q(user__isnull=True) & (
+        Q(updated_at__lt=now - timedelta(days=anonymous_idle_days)) | ~Exists(live_session)
+    )
+    if user_idle_days:
+        condition |= Q(user__isnull=False, updated_at__lt=now - timedelta(days=user_idle_days))
+    return Cart.objects.filter(condition).filter(~Exists(StockReservation.objects.filter(cart=OuterRef('pk'))))
+
+
+def expired_sessions(now=None):
+    return Session.objects.filter(expire_date__lt=now or timezone.now())
+
+
+def delete_in_batches(queryset, batch_size):
+    deleted = Counter()
+    while True:
+        with transaction.atomic():
+            pks = list(
+                queryset
+                .select_for_update(skip_locked=True)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if pks:
+                total, per_model = queryset.model.objects.filter(pk__in=pks).delete()
+                deleted.update(per_model)
+        if len(pks) < batch_size:
+            return deleted
+
+
+def purge_carts(anonymous_idle_days=None, user_idle_days=None, batch_size=None, dry_run=False):
+    config = settings.CART_RETENTION
+    anonymous_idle_days = anonymous_idle_days or config['ANONYMOUS_IDLE_DAYS']
+    user_idle_days = user_idle_days if user_idle_days is not None else config['USER_IDLE_DAYS']
+    batch_size = batch_size or config['BATCH_SIZE']
+
+    now = timezone.now()
+    carts = stale_carts(anonymous_idle_days, user_idle_days, now)
+    sessions = expired_sessions(now)
+
+    if dry_run:
+        return {
+            'carts': carts.count(),
+            'items': CartItem.objects.filter(cart__in=carts).count(),
+            'sessions': sessions.count(),
+        }
+
+    deleted = delete_in_batches(carts, batch_size)
+    deleted.update(delete_in_batches(sessions, batch_size))
+    return {
+        'carts': deleted[Cart._meta.label],
+        'items': deleted[CartItem._meta.label],
+        'sessions': deleted[Session._meta.label],
+    }
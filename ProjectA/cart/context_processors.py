@@ -1,14 +1,14 @@
-from .models import Cart
+from .storage import get_summary
 
-def cart_processor(request):
-    if not request.session.session_key:
-        request.session.create()
 
-    cart, created = Cart.objects.get_or_create(
-        session_key = request.session.session_key
-    )
+def get_cart_summary(request):
+    if not hasattr(request, '_cart_summary'):
+        request._cart_summary = get_summary(request)
+    return request._cart_summary
+
 
+def cart_processor(request):
     return {
-        'cart_total_items': cart.total_items,
-        'cart_subtotal': cart.subtotal,
-    }
\ No newline at end of file
+        'cart_total_items': lambda: get_cart_summary(request)['total_items'],
+        'cart_subtotal': lambda: get_cart_summary(request)['subtotal'],
+    }
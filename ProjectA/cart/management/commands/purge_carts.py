@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from cart.cleanup import purge_carts
+
+
+class Command(BaseCommand):
+    help = 'Delete abandoned carts and expired sessions in small batches'
+
+    def add_arguments(self, parser):
+        config = settings.CART_RETENTION
+        parser.add_argument('--idle-days', type=int, default=config['ANONYMOUS_IDLE_DAYS'])
+        parser.add_argument(
+            '--user-idle-days', type=int, default=config['USER_IDLE_DAYS'],
+            help='Also purge carts of signed-in users idle this long, 0 keeps them',
+        )
+        parser.add_argument('--batch-size', type=int, default=config['BATCH_SIZE'])
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        result = purge_carts(
+            anonymous_idle_days=options['idle_days'],
+            user_idle_days=options['user_idle_days'],
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run'],
+        )
+        verb = 'would be deleted' if options['dry_run'] else 'deleted'
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['carts']} carts, {result['items']} cart items, {result['sessions']} sessions {verb}"
+        ))
@@ -1,24 +1,147 @@
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import DecimalField, F, OuterRef, Prefetch, Subquery, Sum, Value
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.db.models.functions import Coalesce
 from django.contrib.sessions.models import Session
-from main.models import Product, ProductSize
+from main.models import Category, Product, ProductSize
 from decimal import Decimal
 
 class Cart(models.Model):
-    session_key = models.CharField(max_length=40, unique=True)
+    session_key = models.CharField(max_length=40, unique=True, null=True, blank=True)
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        related_name='cart',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+    )
+    items_count = models.PositiveIntegerField(default=0)
+    subtotal_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at']),
+        ]
+
     def __str__(self):
-        return f"Cart {self.session_key}"
+        return f"Cart {self.user or self.session_key}"
 
+    @classmethod
+    def for_request(cls, request):
+        if not request.session.session_key:
+            request.session.create()
+
+        cart, created = cls.objects.get_or_create(
+            session_key=request.session.session_key
+        )
+        request.session['cart_id'] = cart.pk
+        return cart
+
+    @classmethod
+    def for_user(cls, user):
+        cart, created = cls.objects.get_or_create(user=user)
+        return cart
+
+    @classmethod
+    def from_session(cls, session):
+        cart_id = session.get('cart_id')
+        if cart_id is None:
+            return None
+        return cls.objects.filter(pk=cart_id, user__isnull=True).first()
+
+    @classmethod
+    def stored_summary(cls, **lookup):
+        summary = cls.objects.filter(**lookup).values_list('items_count', 'subtotal_amount').first()
+        if summary is None:
+            return {'total_items': 0, 'subtotal': Decimal('0')}
+        return {'total_items': summary[0], 'subtotal': summary[1]}
+
+    @classmethod
+    def summary_for_request(cls, request):
+        if not request.session.session_key:
+            return {'total_items': 0, 'subtotal': Decimal('0')}
+        return cls.stored_summary(session_key=request.session.session_key)
+
+    @classmethod
+    def summary_for_user(cls, user):
+        return cls.stored_summary(user=user)
 
     @property
     def total_items(self):
-        return sum(item.quantity for item in self.items.all())
+        return self.items_count
 
     @property
     def subtotal(self):
-        return sum(item.total_price for item in self.items.all())
+        return self.subtotal_amount
+
+    def summary(self):
+        return self.items.aggregate(**CartItem.summary_aggregates())
+
+    def get_items(self):
+        return list(
+            self.items
+            .select_related('product', 'product_size__size')
+            .prefetch_related(Prefetch('product__category', queryset=Category.objects.with_products_count()))
+            .order_by('-added_at')
+        )
+
+    def get_item(self, item_id):
+        try:
+            item_id = int(item_id)
+        except (TypeError, ValueError):
+            return None
+        return (
+            self.items
+            .select_related('product__category', 'product_size__size')
+            .filter(id=item_id)
+            .first()
+        )
+
+    def find_item(self, product, product_size):
+        return self.items.filter(product=product, product_size=product_size).first()
+
+    def lines(self):
+        return list(self.items.values_list('product_id', 'product_size_id', 'quantity'))
+
+    def set_quantities(self, quantities):
+        with transaction.atomic():
+            existing = {
+                (item.product_id, item.product_size_id): item
+                for item in self.items.select_for_update()
+            }
+            created, updated, removed = [], [], []
+            for (product_id, size_id), quantity in quantities.items():
+                item = existing.get((product_id, size_id))
+                if quantity <= 0:
+                    if item is not None:
+                        removed.append(item.pk)
+                elif item is None:
+                    created.append(CartItem(
+                        cart=self, product_id=product_id, product_size_id=size_id, quantity=quantity,
+                    ))
+                elif item.quantity != quantity:
+                    item.quantity = quantity
+                    updated.append(item)
+
+            if removed:
+                CartItem.objects.filter(pk__in=removed).delete()
+            CartItem.objects.bulk_create(created)
+            CartItem.objects.bulk_update(updated, ['quantity'])
+            self.refresh_summary()
+
+    def discard(self, session):
+        self.delete()
+        session.pop('cart_id', None)
+
+    def refresh_summary(self):
+        summary = self.summary()
+        self.items_count = summary['total_items']
+        self.subtotal_amount = summary['subtotal']
+        self.save(update_fields=['items_count', 'subtotal_amount', 'updated_at'])
 
     def add_product(self, product, product_size, quantity=1):
         cart_item, created = CartItem.objects.get_or_create(
@@ -32,14 +155,16 @@ class Cart(models.Model):
             cart_item.quantity += quantity
             cart_item.save()
 
+        self.refresh_summary()
         return cart_item
 
-    def remove_item(self,item_id):
+    def remove_item(self, item_id):
         try:
             item = self.items.get(id=item_id)
             item.delete()
+            self.refresh_summary()
             return True
-        except CartItem.DoesNotExist:
+        except (CartItem.DoesNotExist, TypeError, ValueError):
             return False
 
     def update_item_quantity(self, item_id, quantity):
@@ -50,12 +175,16 @@ class Cart(models.Model):
                 item.save()
             else:
                 item.delete()
+            self.refresh_summary()
             return True
         except CartItem.DoesNotExist:
             return False
 
     def clear(self):
         self.items.all().delete()
+        self.items_count = 0
+        self.subtotal_amount = Decimal('0')
+        self.save(update_fields=['items_count', 'subtotal_amount', 'updated_at'])
 
 
 class CartItem(models.Model):
@@ -68,6 +197,18 @@ class CartItem(models.Model):
     class Meta:
         unique_together = ('cart', 'product', 'product_size')
 
+    @staticmethod
+    def summary_aggregates():
+        money = DecimalField(max_digits=12, decimal_places=2)
+        return {
+            'total_items': Coalesce(Sum('quantity'), 0),
+            'subtotal': Coalesce(
+                Sum(F('quantity') * F('product__price'), output_field=money),
+                Value(Decimal('0')),
+                output_field=money,
+            ),
+        }
+
     def __str__(self):
         size_info = f" - {self.product_size.size.name}" if self.product_size else ""
         return f"{self.product.name}{size_info} * {self.quantity}"
@@ -79,3 +220,20 @@ class CartItem(models.Model):
     @property
     def size_name(self):
         return self.product_size.size.name if self.product_size else "N/A"
+
+
+
+@receiver(post_save, sender=Product)
+def refresh_cart_subtotals(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and 'price' not in update_fields):
+        return
+
+    Cart.objects.filter(items__product=instance).update(
+        subtotal_amount=Subquery(
+            CartItem.objects
+            .filter(cart=OuterRef('pk'))
+            .values('cart')
+            .annotate(subtotal=CartItem.summary_aggregates()['subtotal'])
+            .values('subtotal')
+        ),
+    )
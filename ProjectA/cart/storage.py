@@ -0,0 +1,326 @@
+import json
+import secrets
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Prefetch
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.module_loading import import_string
+
+from main.models import Category, Product, ProductSize
+from marketplace.redis_client import get_redis
+
+from .models import Cart
+
+
+SESSION_KEY = 'cart_token'
+KEY = 'cart:{}'
+SEQUENCE_FIELD = 'seq'
+
+
+def empty_summary():
+    return {'total_items': 0, 'subtotal': Decimal('0')}
+
+
+class StoredCartItem:
+
+    def __init__(self, id, product, product_size, quantity, added_at):
+        self.id = id
+        self.product = product
+        self.product_size = product_size
+        self.quantity = quantity
+        self.added_at = added_at
+
+    @property
+    def total_price(self):
+        return Decimal(str(self.product.price)) * self.quantity
+
+    @property
+    def size_name(self):
+        return self.product_size.size.name if self.product_size else "N/A"
+
+    def to_entry(self):
+        return {
+            'product_id': self.product.pk,
+            'product_size_id': self.product_size.pk if self.product_size else None,
+            'quantity': self.quantity,
+            'added_at': self.added_at.isoformat(),
+        }
+
+
+class RedisCart:
+
+    def __init__(self, token, timeout=None):
+        self.token = token
+        self.key = KEY.format(token)
+        self.timeout = timeout or settings.CART_STORAGE['TIMEOUT']
+        self._entries = None
+        self._summary = None
+
+    @classmethod
+    def for_request(cls, request):
+        token = request.session.get(SESSION_KEY)
+        if token is None:
+            token = request.session[SESSION_KEY] = secrets.token_urlsafe(18)
+        return cls(token)
+
+    @classmethod
+    def from_session(cls, session):
+        token = session.get(SESSION_KEY)
+        return cls(token) if token else None
+
+    @classmethod
+    def summary_for_request(cls, request):
+        cart = cls.from_session(request.session)
+        return cart.summary() if cart else empty_summary()
+
+    def entries(self):
+        if self._entries is None:
+            self._entries = {
+                int(field): json.loads(value)
+                for field, value in get_redis().hgetall(self.key).items()
+                if field != SEQUENCE_FIELD
+            }
+        return self._entries
+
+    def _changed(self):
+        self._entries = None
+        self._summary = None
+        get_redis().expire(self.key, self.timeout)
+
+    def _build_items(self, entries):
+        products = Product.objects.prefetch_related(
+            Prefetch('category', queryset=Category.objects.with_products_count())
+        ).in_bulk(
+            {entry['product_id'] for entry in entries.values()}
+        )
+        sizes = ProductSize.objects.select_related('size').in_bulk(
+            {entry['product_size_id'] for entry in entries.values() if entry['product_size_id']}
+        )
+
+        items = []
+        for item_id, entry in entries.items():
+            product = products.get(entry['product_id'])
+            product_size = sizes.get(entry['product_size_id'])
+            if product is None or (entry['product_size_id'] and product_size is None):
+                continue
+            items.append(StoredCartItem(
+                item_id,
+                product,
+                product_size,
+                entry['quantity'],
+                parse_datetime(entry['added_at']),
+            ))
+        items.sort(key=lambda item: (item.added_at, item.id), reverse=True)
+        return items
+
+    def get_items(self):
+        return self._build_items(self.entries())
+
+    def get_item(self, item_id):
+        try:
+            item_id = int(item_id)
+        except (TypeError, ValueError):
+            return None
+        entry = self.entries().get(item_id)
+        if entry is None:
+            return None
+        items = self._build_items({item_id: entry})
+        return items[0] if items else None
+
+    def find_item(self, product, product_size):
+        size_id = product_size.pk if product_size else None
+        for item_id, entry in self.entries().items():
+            if entry['product_id'] == product.pk and entry['product_size_id'] == size_id:
+                return StoredCartItem(
+                    item_id, product, product_size, entry['quantity'], parse_datetime(entry['added_at'])
+                )
+        return None
+
+    def lines(self):
+        return [
+            (entry['product_id'], entry['product_size_id'], entry['quantity'])
+            for entry in self.entries().values()
+        ]
+
+    def add_product(self, product, product_size, quantity=1):
+        item = self.find_item(product, product_size)
+        if item is None:
+            item_id = get_redis().hincrby(self.key, SEQUENCE_FIELD, 1)
+            item = StoredCartItem(item_id, product, product_size, quantity, timezone.now())
+        else:
+            item.quantity += quantity
+
+        get_redis().hset(self.key, item.id, json.dumps(item.to_entry()))
+        self._changed()
+        return item
+
+    def set_quantities(self, quantities):
+        current = {
+            (entry['product_id'], entry['product_size_id']): (item_id, entry)
+            for item_id, entry in self.entries().items()
+        }
+        new_keys = [key for key, quantity in quantities.items() if quantity > 0 and key not in current]
+        next_id = 0
+        if new_keys:
+            next_id = get_redis().hincrby(self.key, SEQUENCE_FIELD, len(new_keys)) - len(new_keys)
+
+        added_at = timezone.now().isoformat()
+        mapping, removed = {}, []
+        for (product_id, size_id), quantity in quantities.items():
+            item_id, entry = current.get((product_id, size_id), (None, None))
+            if quantity <= 0:
+                if item_id is not None:
+                    removed.append(item_id)
+            elif item_id is None:
+                next_id += 1
+                mapping[next_id] = json.dumps({
+                    'product_id': product_id,
+                    'product_size_id': size_id,
+                    'quantity': quantity,
+                    'added_at': added_at,
+                })
+            elif entry['quantity'] != quantity:
+                mapping[item_id] = json.dumps({**entry, 'quantity': quantity})
+
+        if mapping:
+            get_redis().hset(self.key, mapping=mapping)
+        if removed:
+            get_redis().hdel(self.key, *removed)
+        self._changed()
+
+    def update_item_quantity(self, item_id, quantity):
+        try:
+            entry = self.entries().get(int(item_id))
+        except (TypeError, ValueError):
+            entry = None
+        if entry is None:
+            return False
+
+        if quantity > 0:
+            entry['quantity'] = quantity
+            get_redis().hset(self.key, item_id, json.dumps(entry))
+        else:
+            get_redis().hdel(self.key, item_id)
+        self._changed()
+        return True
+
+    def remove_item(self, item_id):
+        try:
+            item_id = int(item_id)
+        except (TypeError, ValueError):
+            return False
+        removed = get_redis().hdel(self.key, item_id)
+        self._changed()
+        return bool(removed)
+
+    def clear(self):
+        get_redis().delete(self.key)
+        self._entries = {}
+        self._summary = None
+
+    def discard(self, session):
+        self.clear()
+        session.pop(SESSION_KEY, None)
+
+    def summary(self):
+        if self._summary is None:
+            entries = self.entries()
+            prices = dict(
+                Product.objects
+                .filter(pk__in={entry['product_id'] for entry in entries.values()})
+                .values_list('pk', 'price')
+            ) if entries else {}
+
+            summary = empty_summary()
+            for entry in entries.values():
+                if entry['product_id'] in prices:
+                    summary['total_items'] += entry['quantity']
+                    summary['subtotal'] += (prices[entry['product_id']] or Decimal('0')) * entry['quantity']
+            self._summary = summary
+        return self._summary
+
+    @property
+    def total_items(self):
+        return self.summary()['total_items']
+
+    @property
+    def subtotal(self):
+        return self.summary()['subtotal']
+
+
+def anonymous_backend():
+    return import_string(settings.CART_STORAGE['ANONYMOUS'])
+
+
+def is_authenticated(request):
+    user = getattr(request, 'user', None)
+    return user is not None and user.is_authenticated
+
+
+def merge_lines(cart, lines):
+    lines = [line for line in lines if line[2] > 0]
+    if not lines:
+        return cart
+
+    product_ids = set(Product.objects.filter(pk__in={line[0] for line in lines}).values_list('pk', flat=True))
+    stock = dict(
+        ProductSize.objects
+        .filter(pk__in={line[1] for line in lines if line[1]})
+        .values_list('pk', 'stock')
+    )
+
+    with transaction.atomic():
+        current = dict(
+            ((product_id, size_id), quantity)
+            for product_id, size_id, quantity in cart.items.select_for_update().values_list(
+                'product_id', 'product_size_id', 'quantity',
+            )
+        )
+        quantities = dict(current)
+        for product_id, size_id, quantity in lines:
+            if product_id not in product_ids or (size_id and size_id not in stock):
+                continue
+
+            key = (product_id, size_id)
+            quantities[key] = quantities.get(key, 0) + quantity
+            if size_id:
+                quantities[key] = min(quantities[key], max(stock[size_id], current.get(key, 0)))
+
+        cart.set_quantities({
+            key: quantity for key, quantity in quantities.items() if quantity != current.get(key, 0)
+        })
+    return cart
+
+
+def merge_session_cart(request, user):
+    source = anonymous_backend().from_session(request.session)
+    if source is None:
+        return None
+
+    cart = Cart.for_user(user)
+    merge_lines(cart, source.lines())
+    source.discard(request.session)
+    return cart
+
+
+def get_cart(request):
+    if is_authenticated(request):
+        return merge_session_cart(request, request.user) or Cart.for_user(request.user)
+    return anonymous_backend().for_request(request)
+
+
+def find_cart(request):
+    if is_authenticated(request):
+        return Cart.objects.filter(user=request.user).first()
+    return anonymous_backend().from_session(request.session)
+
+
+def get_summary(request):
+    if is_authenticated(request):
+        if anonymous_backend().from_session(request.session) is not None:
+            return get_cart(request).summary()
+        return Cart.summary_for_user(request.user)
+    return anonymous_backend().summary_for_request(request)
@@ -0,0 +1,8 @@
+from celery import shared_task
+
+from .cleanup import purge_carts as purge
+
+
+@shared_task
+def purge_carts():
+    return purge()
@@ -1,18 +1,11 @@
 from django import template
-from cart.models import Cart
+from cart.context_processors import get_cart_summary
 
 register = template.Library()
 
 @register.simple_tag(takes_context=True)
 def get_cart_count(context):
-    request = context['request']
-    if not request.session.session_key:
-        return 0
-    try:
-        cart = Cart.objects.get(session_key=request.session.session_key)
-        return cart.total_items
-    except Cart.DoesNotExist:
-        return 0
+    return get_cart_summary(context['request'])['total_items']
 
 
 @register.filter
@@ -1,28 +1,23 @@
 from django.shortcuts import get_object_or_404, redirect
 from django.views.generic import View
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
 from django.template.response import TemplateResponse
 from main.models import ProductSize, Product
-from .models import Cart, CartItem
 from django.db import transaction
+from django.db.models import F
+from orders.reservations import available_for, with_available_stock
 from .forms import AddToCartForm
+from .storage import get_cart
 
 
 class CartMixin:
     def get_cart(self, request):
         if hasattr(request, 'cart'):
             return request.cart
+        return get_cart(request)
 
-        if not request.session.session_key:
-            request.session.create()
-
-        cart, created = Cart.objects.get_or_create(
-            session_key=request.session.session_key
-        )
-
-        request.session['cart_id'] = cart.id
-        request.session.modified = True
-        return cart
+    def get_cart_items(self, cart):
+        return with_available_stock(cart, cart.get_items())
 
 
 class CartModalView(CartMixin, View):
@@ -30,11 +25,7 @@ class CartModalView(CartMixin, View):
         cart = self.get_cart(request)
         context = {
             'cart': cart,
-            'cart_items': cart.items.select_related(
-                'product',
-                'product_size',
-                'product_size__size',
-            ).order_by('-added_at')
+            'cart_items': self.get_cart_items(cart)
         }
         return TemplateResponse(request, 'cart/cart_modal_content.html', context)
 
@@ -69,7 +60,7 @@ class AddToCartView(CartMixin, View):
                 product=product,
             )
         elif requires_size:
-            product_size = product.product_sizes.filter(stock__gt=0).first()
+            product_size = product.product_sizes.filter(stock__gt=F('reserved')).first()
             if not product_size:
                 if request.headers.get('HX-Request'):
                     return TemplateResponse(request, 'cart/cart_error.html', {
@@ -82,23 +73,21 @@ class AddToCartView(CartMixin, View):
         quantity = form.cleaned_data['quantity']
 
         if product_size:
-            if product_size.stock < quantity:
-                error_msg = f'Доступно лише {product_size.stock} шт.'
+            available_stock = available_for(cart, product_size)
+            if available_stock < quantity:
+                error_msg = f'Доступно лише {available_stock} шт.'
                 if request.headers.get('HX-Request'):
                     return TemplateResponse(request, 'cart/cart_error.html', {
                         'error': error_msg
                     })
                 return JsonResponse({'error': error_msg}, status=400)
 
-            existing_item = cart.items.filter(
-                product=product,
-                product_size=product_size,
-            ).first()
+            existing_item = cart.find_item(product, product_size)
 
             if existing_item:
                 total_quantity = existing_item.quantity + quantity
-                if total_quantity > product_size.stock:
-                    available = product_size.stock - existing_item.quantity
+                if total_quantity > available_stock:
+                    available = available_stock - existing_item.quantity
                     error_msg = f"Неможливо додати {quantity} шт. Доступно лише {available} шт."
                     if request.headers.get('HX-Request'):
                         return TemplateResponse(request, 'cart/cart_error.html', {
@@ -108,17 +97,10 @@ class AddToCartView(CartMixin, View):
 
         cart_item = cart.add_product(product, product_size, quantity)
 
-        request.session['cart_id'] = cart.id
-        request.session.modified = True
-
         if request.headers.get('HX-Request'):
             context = {
                 'cart': cart,
-                'cart_items': cart.items.select_related(
-                    'product',
-                    'product_size',
-                    'product_size__size',
-                ).order_by('-added_at'),
+                'cart_items': self.get_cart_items(cart),
                 'added_product': product,
                 'added_quantity': quantity,
             }
@@ -136,7 +118,9 @@ class UpdateCartItemView(CartMixin, View):
     @transaction.atomic
     def post(self, request, item_id):
         cart = self.get_cart(request)
-        cart_item = get_object_or_404(CartItem, id=item_id, cart=cart)
+        cart_item = cart.get_item(item_id)
+        if cart_item is None:
+            raise Http404
 
         try:
             quantity = int(request.POST.get('quantity', 1))
@@ -147,29 +131,22 @@ class UpdateCartItemView(CartMixin, View):
             return JsonResponse({'error': 'Invalid quantity'}, status=400)
 
         if quantity == 0:
-            cart_item.delete()
+            cart.remove_item(cart_item.id)
         else:
-            if cart_item.product_size and quantity > cart_item.product_size.stock:
-                error_msg = f'Доступно лише {cart_item.product_size.stock} шт.'
+            available_stock = available_for(cart, cart_item.product_size) if cart_item.product_size else None
+            if available_stock is not None and quantity > available_stock:
+                error_msg = f'Доступно лише {available_stock} шт.'
                 if request.headers.get('HX-Request'):
                     return TemplateResponse(request, 'cart/cart_error.html', {
                         'error': error_msg
                     })
                 return JsonResponse({'error': error_msg}, status=400)
 
-            cart_item.quantity = quantity
-            cart_item.save()
-
-        request.session['cart_id'] = cart.id
-        request.session.modified = True
+            cart.update_item_quantity(cart_item.id, quantity)
 
         context = {
             'cart': cart,
-            'cart_items': cart.items.select_related(
-                'product',
-                'product_size',
-                'product_size__size',
-            ).order_by('-added_at')
+            'cart_items': self.get_cart_items(cart)
         }
 
         if request.headers.get('HX-Request'):
@@ -186,36 +163,28 @@ class RemoveCartItemView(CartMixin, View):
     def post(self, request, item_id):
         cart = self.get_cart(request)
 
-        try:
-            cart_item = cart.items.get(id=item_id)
-            product_name = cart_item.product.name
-            cart_item.delete()
-
-            request.session['cart_id'] = cart.id
-            request.session.modified = True
+        cart_item = cart.get_item(item_id)
+        if cart_item is None:
+            return JsonResponse({'error': 'Item not found'}, status=404)
 
-            context = {
-                'cart': cart,
-                'cart_items': cart.items.select_related(
-                    'product',
-                    'product_size',
-                    'product_size__size',
-                ).order_by('-added_at'),
-                'removed_product': product_name,
-            }
+        product_name = cart_item.product.name
+        cart.remove_item(cart_item.id)
 
-            if request.headers.get('HX-Request'):
-                return TemplateResponse(request, 'cart/cart_modal_content.html', context)
+        context = {
+            'cart': cart,
+            'cart_items': self.get_cart_items(cart),
+            'removed_product': product_name,
+        }
 
-            return JsonResponse({
-                'success': True,
-                'total_items': cart.total_items,
-                'subtotal': float(cart.subtotal),
-                'message': f'{product_name} видалено з кошика',
-            })
+        if request.headers.get('HX-Request'):
+            return TemplateResponse(request, 'cart/cart_modal_content.html', context)
 
-        except CartItem.DoesNotExist:
-            return JsonResponse({'error': 'Item not found'}, status=404)
+        return JsonResponse({
+            'success': True,
+            'total_items': cart.total_items,
+            'subtotal': float(cart.subtotal),
+            'message': f'{product_name} видалено з кошика',
+        })
 
 
 class CartCountView(CartMixin, View):
@@ -232,9 +201,6 @@ class ClearCartView(CartMixin, View):
         cart = self.get_cart(request)
         cart.clear()
 
-        request.session['cart_id'] = cart.id
-        request.session.modified = True
-
         if request.headers.get('HX-Request'):
             return TemplateResponse(request, 'cart/cart_empty.html', {
                 'cart': cart
@@ -251,11 +217,7 @@ class CartSummaryView(CartMixin, View):
         cart = self.get_cart(request)
         context = {
             'cart': cart,
-            'cart_items': cart.items.select_related(
-                'product',
-                'product_size',
-                'product_size__size',
-            ).order_by('-added_at')
+            'cart_items': self.get_cart_items(cart)
         }
 
         if request.headers.get('HX-Request'):
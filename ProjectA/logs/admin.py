@@ -1,4 +1,12 @@
+import datetime
+
 from django.contrib import admin
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .archive import list_archives, search_action_logs
 from .models import ActionLog
 
 
@@ -21,10 +29,9 @@ class ActionLogAdmin(admin.ModelAdmin):
         'object_type'
     ]
     search_fields = [
-        'user__email',
-        'description',
-        'object_repr',
-        'ip_address'
+        '=user__email',
+        '^object_repr',
+        '=ip_address'
     ]
     readonly_fields = [
         'user',
@@ -40,8 +47,10 @@ class ActionLogAdmin(admin.ModelAdmin):
         'error_message',
         'created_at'
     ]
-    date_hierarchy = 'created_at'
     ordering = ['-created_at']
+    list_select_related = ['user']
+    show_full_result_count = False
+    change_list_template = 'admin/logs/actionlog/change_list.html'
 
     fieldsets = (
         ('Main information', {
@@ -63,6 +72,40 @@ class ActionLogAdmin(admin.ModelAdmin):
         }),
     )
 
+    def get_urls(self):
+        return [
+            path(
+                'archive/',
+                self.admin_site.admin_view(self.archive_view),
+                name='logs_actionlog_archive',
+            ),
+        ] + super().get_urls()
+
+    def archive_view(self, request):
+        today = timezone.localdate()
+        date_from = parse_date(request.GET.get('date_from', '')) or today - datetime.timedelta(days=30)
+        date_to = parse_date(request.GET.get('date_to', '')) or today
+        action_type = request.GET.get('action_type', '')
+        query = request.GET.get('q', '').strip()
+
+        tz = timezone.get_current_timezone()
+        start = datetime.datetime.combine(date_from, datetime.time.min, tzinfo=tz)
+        end = datetime.datetime.combine(date_to + datetime.timedelta(days=1), datetime.time.min, tzinfo=tz)
+
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Action log archive',
+            'date_from': date_from,
+            'date_to': date_to,
+            'action_type': action_type,
+            'query': query,
+            'action_types': ActionLog.ActionType.choices,
+            'archived_months': list_archives(),
+            'logs': search_action_logs(start, end, action_type, query),
+        }
+        return TemplateResponse(request, 'admin/logs/actionlog/archive.html', context)
+
     def has_add_permission(self, request):
         return False
 
@@ -0,0 +1,149 @@
+import collections
+import datetime
+import gzip
+import json
+import os
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.validators import validate_ipv46_address
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from .models import ActionLog
+from .partitions import add_months, month_bounds, month_start
+
+
+ARCHIVE_FIELDS = [
+    'id',
+    'created_at',
+    'user_id',
+    'user__email',
+    'action_type',
+    'description',
+    'object_type',
+    'object_id',
+    'object_repr',
+    'extra_data',
+    'ip_address',
+    'user_agent',
+    'is_success',
+    'error_message',
+]
+
+
+def archive_dir():
+    return settings.ACTION_LOG_ARCHIVE_DIR
+
+
+def archive_path(month):
+    return os.path.join(archive_dir(), f'actionlog-{month.year:04d}-{month.month:02d}.jsonl.gz')
+
+
+def is_archived(month):
+    return os.path.exists(archive_path(month))
+
+
+def list_archives():
+    if not os.path.isdir(archive_dir()):
+        return []
+    months = []
+    for filename in os.listdir(archive_dir()):
+        if filename.startswith('actionlog-') and filename.endswith('.jsonl.gz'):
+            year, month = filename[len('actionlog-'):-len('.jsonl.gz')].split('-')
+            months.append(datetime.date(int(year), int(month), 1))
+    return sorted(months)
+
+
+def archive_month(month, chunk_size=2000):
+    start, end = month_bounds(month)
+    rows = (
+        ActionLog.objects
+        .filter(created_at__gte=start, created_at__lt=end)
+        .order_by('created_at', 'id')
+        .values(*ARCHIVE_FIELDS)
+    )
+
+    path = archive_path(month)
+    os.makedirs(archive_dir(), exist_ok=True)
+    tmp_path = f'{path}.tmp'
+
+    count = 0
+    with gzip.open(tmp_path, 'wt', encoding='utf-8') as archive:
+        for row in rows.iterator(chunk_size=chunk_size):
+            row['user_email'] = row.pop('user__email')
+            archive.write(json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False))
+            archive.write('\n')
+            count += 1
+
+    os.replace(tmp_path, path)
+    return count
+
+
+def read_archive(month):
+    with gzip.open(archive_path(month), 'rt', encoding='utf-8') as archive:
+        for line in archive:
+            row = json.loads(line)
+            row['created_at'] = parse_datetime(row['created_at'])
+            yield row
+
+
+def _matches(row, start, end, action_type, query):
+    if not start <= row['created_at'] < end:
+        return False
+    if action_type and row['action_type'] != action_type:
+        return False
+    if query:
+        query = query.lower()
+        return (
+            (row['user_email'] or '').lower() == query
+            or row['ip_address'] == query
+            or (row['object_repr'] or '').lower().startswith(query)
+        )
+    return True
+
+
+def search_archives(start, end, action_type='', query='', limit=200):
+    results = []
+    month = month_start(end - datetime.timedelta(microseconds=1))
+    first = month_start(start)
+    while month >= first and len(results) < limit:
+        if is_archived(month):
+            matches = collections.deque(maxlen=limit - len(results))
+            for row in read_archive(month):
+                if _matches(row, start, end, action_type, query):
+                    matches.append(row)
+            results.extend(reversed(matches))
+        month = add_months(month, -1)
+    return results
+
+
+def search_live(start, end, action_type='', query='', limit=200):
+    logs = ActionLog.objects.filter(created_at__gte=start, created_at__lt=end)
+    if action_type:
+        logs = logs.filter(action_type=action_type)
+    if query:
+        condition = Q(user__email__iexact=query) | Q(object_repr__istartswith=query)
+        try:
+            validate_ipv46_address(query)
+        except ValidationError:
+            pass
+        else:
+            condition |= Q(ip_address=query)
+        logs = logs.filter(condition)
+    rows = []
+    for row in logs.order_by('-created_at', '-id').values(*ARCHIVE_FIELDS)[:limit]:
+        row['user_email'] = row.pop('user__email')
+        rows.append(row)
+    return rows
+
+
+def search_action_logs(start, end, action_type='', query='', limit=200):
+    rows = search_live(start, end, action_type, query, limit)
+    seen = {(row['id'], row['created_at']) for row in rows}
+    for row in search_archives(start, end, action_type, query, limit):
+        if (row['id'], row['created_at']) not in seen:
+            rows.append(row)
+    rows.sort(key=lambda row: (row['created_at'], row['id']), reverse=True)
+    return rows[:limit]
@@ -0,0 +1,143 @@
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.db import connections, transaction
+
+
+logger = logging.getLogger(__name__)
+
+
+class ActionLogBuffer:
+
+    def __init__(self, batch_size=100, flush_interval=5.0, max_size=10000, enabled=True):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_size = max_size
+        self.enabled = enabled
+
+        self.dropped = 0
+        self.written = 0
+
+        self._entries = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def from_settings(cls):
+        config = getattr(settings, 'ACTION_LOG_BUFFER', {})
+        return cls(
+            batch_size=config.get('BATCH_SIZE', 100),
+            flush_interval=config.get('FLUSH_INTERVAL', 5.0),
+            max_size=config.get('MAX_SIZE', 10000),
+            enabled=config.get('ENABLED', True),
+        )
+
+    def add(self, entry):
+        if not self.enabled or self._stopped.is_set():
+            self._write_sync([entry])
+        else:
+            transaction.on_commit(lambda: self._enqueue(entry))
+        return entry
+
+    def _enqueue(self, entry):
+        with self._lock:
+            if len(self._entries) >= self.max_size:
+                self.dropped += 1
+                logger.warning('Action log buffer is full, entry dropped')
+                return
+            self._entries.append(entry)
+            batch_ready = len(self._entries) >= self.batch_size
+
+        if not self._start_worker():
+            if batch_ready:
+                self.flush()
+        elif batch_ready:
+            self._wakeup.set()
+
+    def _start_worker(self):
+        if not self.flush_interval:
+            return False
+        if self._thread is not None and self._thread.is_alive():
+            return True
+
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name='action-log-writer', daemon=True
+                )
+                self._thread.start()
+                atexit.register(self.drain)
+        return True
+
+    def _run(self):
+        try:
+            while not self._stopped.is_set():
+                self._wakeup.wait(self.flush_interval)
+                self._wakeup.clear()
+                self.flush()
+        finally:
+            connections.close_all()
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                entries, self._entries = self._entries, []
+            if not entries:
+                return 0
+
+            from .models import ActionLog
+
+            try:
+                ActionLog.objects.bulk_create(entries, batch_size=self.batch_size)
+            except Exception:
+                logger.exception('Bulk write of %s action log entries failed', len(entries))
+                return self._write_sync(entries)
+
+            self.written += len(entries)
+            return len(entries)
+
+    def _write_sync(self, entries):
+        written = 0
+        for entry in entries:
+            try:
+                entry.save()
+                written += 1
+            except Exception:
+                self.dropped += 1
+                logger.exception('Action log entry dropped')
+        self.written += written
+        return written
+
+    def drain(self):
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=10)
+        return self.flush()
+
+    def stats(self):
+        with self._lock:
+            queued = len(self._entries)
+        return {
+            'queued': queued,
+            'dropped': self.dropped,
+            'written': self.written,
+        }
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_action_log_buffer():
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = ActionLogBuffer.from_settings()
+    return _buffer
@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from logs.archive import archive_month, is_archived
+from logs.partitions import expired_partitions
+
+
+class Command(BaseCommand):
+    help = 'Archive action log partitions outside the retention window to compressed JSONL files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months', type=int, default=settings.ACTION_LOG_RETENTION_MONTHS)
+        parser.add_argument('--overwrite', action='store_true')
+
+    def handle(self, *args, **options):
+        for month, name in expired_partitions(options['months']):
+            if is_archived(month) and not options['overwrite']:
+                self.stdout.write(f'{name}: already archived')
+                continue
+            count = archive_month(month)
+            self.stdout.write(self.style.SUCCESS(f'{name}: archived {count} entries'))
@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from logs.archive import is_archived
+from logs.partitions import drop_partition, ensure_partitions, expired_partitions
+
+
+class Command(BaseCommand):
+    help = 'Create upcoming action log partitions and drop archived ones outside the retention window'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months', type=int, default=settings.ACTION_LOG_RETENTION_MONTHS)
+        parser.add_argument('--ahead', type=int, default=3)
+        parser.add_argument('--force', action='store_true', help='Drop partitions even if they were not archived')
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        if not options['dry_run']:
+            for name in ensure_partitions(options['ahead']):
+                self.stdout.write(f'{name}: created')
+
+        for month, name in expired_partitions(options['months']):
+            if not is_archived(month) and not options['force']:
+                self.stdout.write(self.style.WARNING(f'{name}: not archived, skipped'))
+                continue
+            if not options['dry_run']:
+                drop_partition(name)
+            self.stdout.write(self.style.SUCCESS(f'{name}: dropped'))
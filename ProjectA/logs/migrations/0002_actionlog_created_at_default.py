@@ -0,0 +1,24 @@
+# Generated by Django 5.2.9 on 2026-10-18 02:40
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='actionlog',
+            name='action_type',
+            field=models.CharField(choices=[('login', 'Login'), ('logout', 'Logout'), ('register', 'Register'), ('password_change', 'Password Change'), ('product_create', 'Product Create'), ('product_update', 'Product Update'), ('product_delete', 'Product Delete'), ('product_view', 'Product View'), ('cart_add', 'Cart Add'), ('cart_update', 'Cart Update'), ('cart_remove', 'Cart Remove'), ('cart_clear', 'Cart Clear'), ('order_create', 'Order Create'), ('order_update', 'Order Update'), ('order_cancel', 'Order Cancel'), ('review_create', 'Review Create'), ('review_update', 'Review Update'), ('review_delete', 'Review Delete'), ('profile_update', 'Profile Update'), ('other', 'Other')], max_length=50, verbose_name='Action type'),
+        ),
+        migrations.AlterField(
+            model_name='actionlog',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Time of action'),
+        ),
+    ]
@@ -0,0 +1,79 @@
+from django.conf import settings
+from django.db import migrations
+
+from logs.partitions import (
+    DEFAULT_PARTITION, PARENT_TABLE, add_months, month_bounds, month_start, partition_name,
+)
+
+
+LEGACY_TABLE = f'{PARENT_TABLE}_legacy'
+
+
+def partition_action_log(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    ActionLog = apps.get_model('logs', 'ActionLog')
+    users_table = ActionLog._meta.get_field('user').related_model._meta.db_table
+    quote = schema_editor.quote_name
+
+    schema_editor.execute(f'ALTER TABLE {quote(PARENT_TABLE)} RENAME TO {quote(LEGACY_TABLE)}')
+    schema_editor.execute(
+        f'ALTER TABLE {quote(LEGACY_TABLE)} '
+        f'RENAME CONSTRAINT {quote(PARENT_TABLE + "_pkey")} TO {quote(LEGACY_TABLE + "_pkey")}'
+    )
+    schema_editor.execute(
+        f'CREATE TABLE {quote(PARENT_TABLE)} '
+        f'(LIKE {quote(LEGACY_TABLE)} INCLUDING DEFAULTS INCLUDING IDENTITY INCLUDING CONSTRAINTS) '
+        'PARTITION BY RANGE (created_at)'
+    )
+    schema_editor.execute(
+        f'ALTER TABLE {quote(PARENT_TABLE)} '
+        f'ADD CONSTRAINT {quote(PARENT_TABLE + "_pkey")} PRIMARY KEY (id, created_at)'
+    )
+    schema_editor.execute(
+        f'ALTER TABLE {quote(PARENT_TABLE)} ADD CONSTRAINT {quote(PARENT_TABLE + "_user_id_fk")} '
+        f'FOREIGN KEY (user_id) REFERENCES {quote(users_table)} (id) '
+        'DEFERRABLE INITIALLY DEFERRED'
+    )
+    schema_editor.execute(
+        f'CREATE TABLE {quote(DEFAULT_PARTITION)} PARTITION OF {quote(PARENT_TABLE)} DEFAULT'
+    )
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f'SELECT min(created_at) FROM {quote(LEGACY_TABLE)}')
+        oldest = cursor.fetchone()[0]
+
+    month = month_start(oldest)
+    last = add_months(month_start(), 3)
+    while month <= last:
+        start, end = month_bounds(month)
+        schema_editor.execute(
+            f'CREATE TABLE {quote(partition_name(month))} PARTITION OF {quote(PARENT_TABLE)} '
+            'FOR VALUES FROM (%s) TO (%s)',
+            [start, end],
+        )
+        month = add_months(month, 1)
+
+    schema_editor.execute(f'INSERT INTO {quote(PARENT_TABLE)} SELECT * FROM {quote(LEGACY_TABLE)}')
+    schema_editor.execute(
+        "SELECT setval(pg_get_serial_sequence(%s, 'id'), "
+        f'COALESCE((SELECT max(id) FROM {quote(PARENT_TABLE)}), 0) + 1, false)',
+        [PARENT_TABLE],
+    )
+    schema_editor.execute(f'DROP TABLE {quote(LEGACY_TABLE)}')
+
+    for index in ActionLog._meta.indexes:
+        schema_editor.add_index(ActionLog, index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('logs', '0002_actionlog_created_at_default'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_action_log, migrations.RunPython.noop, elidable=False),
+    ]
@@ -1,5 +1,8 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
+
+from .buffer import get_action_log_buffer
 
 
 class ActionLog(models.Model):
@@ -92,7 +95,8 @@ class ActionLog(models.Model):
     )
 
     created_at = models.DateTimeField(
-        auto_now_add=True,
+        default=timezone.now,
+        editable=False,
         verbose_name='Time of action'
     )
 
@@ -136,8 +140,7 @@ class ActionLog(models.Model):
             log_entry.object_id = obj.pk
             log_entry.object_repr = str(obj)[:255]
 
-        log_entry.save()
-        return log_entry
+        return get_action_log_buffer().add(log_entry)
 
     @staticmethod
     def _get_client_ip(request):
@@ -0,0 +1,133 @@
+import datetime
+import re
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+
+PARENT_TABLE = 'logs_actionlog'
+DEFAULT_PARTITION = f'{PARENT_TABLE}_default'
+PARTITION_RE = re.compile(rf'^{PARENT_TABLE}_p(\d{{4}})_(\d{{2}})$')
+
+
+def month_start(value=None):
+    value = value or timezone.now()
+    if isinstance(value, datetime.datetime):
+        value = timezone.localtime(value) if timezone.is_aware(value) else value
+        value = value.date()
+    return value.replace(day=1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def month_bounds(month):
+    tz = timezone.get_default_timezone()
+    start = datetime.datetime.combine(month, datetime.time.min, tzinfo=tz)
+    end = datetime.datetime.combine(add_months(month, 1), datetime.time.min, tzinfo=tz)
+    return start, end
+
+
+def partition_name(month):
+    return f'{PARENT_TABLE}_p{month.year:04d}_{month.month:02d}'
+
+
+def is_partitioned():
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass',
+            [PARENT_TABLE],
+        )
+        return cursor.fetchone() is not None
+
+
+def list_partitions():
+    if not is_partitioned():
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT child.relname FROM pg_inherits '
+            'JOIN pg_class child ON child.oid = pg_inherits.inhrelid '
+            'WHERE pg_inherits.inhparent = %s::regclass',
+            [PARENT_TABLE],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    partitions = []
+    for name in names:
+        match = PARTITION_RE.match(name)
+        if match:
+            partitions.append((datetime.date(int(match[1]), int(match[2]), 1), name))
+    return sorted(partitions)
+
+
+def create_partition(month):
+    name = partition_name(month)
+    start, end = month_bounds(month)
+    quote = connection.ops.quote_name
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT count(*) FROM {quote(DEFAULT_PARTITION)} '
+            'WHERE created_at >= %s AND created_at < %s',
+            [start, end],
+        )
+        stray_rows = cursor.fetchone()[0]
+
+        if stray_rows:
+            cursor.execute(
+                f'ALTER TABLE {quote(PARENT_TABLE)} DETACH PARTITION {quote(DEFAULT_PARTITION)}'
+            )
+
+        cursor.execute(
+            f'CREATE TABLE {quote(name)} PARTITION OF {quote(PARENT_TABLE)} '
+            'FOR VALUES FROM (%s) TO (%s)',
+            [start, end],
+        )
+
+        if stray_rows:
+            cursor.execute(
+                f'INSERT INTO {quote(name)} SELECT * FROM {quote(DEFAULT_PARTITION)} '
+                'WHERE created_at >= %s AND created_at < %s',
+                [start, end],
+            )
+            cursor.execute(
+                f'DELETE FROM {quote(DEFAULT_PARTITION)} '
+                'WHERE created_at >= %s AND created_at < %s',
+                [start, end],
+            )
+            cursor.execute(
+                f'ALTER TABLE {quote(PARENT_TABLE)} ATTACH PARTITION {quote(DEFAULT_PARTITION)} DEFAULT'
+            )
+    return name
+
+
+def ensure_partitions(months_ahead=3, start=None):
+    if not is_partitioned():
+        return []
+
+    existing = {month for month, name in list_partitions()}
+    first = month_start(start)
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(first, offset)
+        if month not in existing:
+            created.append(create_partition(month))
+    return created
+
+
+def expired_partitions(retention_months, now=None):
+    cutoff = add_months(month_start(now), -retention_months)
+    return [(month, name) for month, name in list_partitions() if month < cutoff]
+
+
+def drop_partition(name):
+    quote = connection.ops.quote_name
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+        cursor.execute(f'ALTER TABLE {quote(PARENT_TABLE)} DETACH PARTITION {quote(name)}')
+        cursor.execute(f'DROP TABLE {quote(name)}')
@@ -0,0 +1,8 @@
+from celery import shared_task
+from django.core.management import call_command
+
+
+@shared_task
+def maintain_action_log_partitions():
+    call_command('archive_action_logs')
+    call_command('enforce_action_log_retention')
@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.utils.html import format_html
 from .models import Category, Product, ProductSize, ProductImage, Size
+from .stock import refresh_stock
 
 
 @admin.register(Category)
@@ -23,6 +24,7 @@ class ProductImageInline(admin.TabularInline):
 class ProductSizeInline(admin.TabularInline):
     model = ProductSize
     extra = 1
+    readonly_fields = ('reserved',)
 
 
 @admin.register(Product)
@@ -30,17 +32,17 @@ class ProductAdmin(admin.ModelAdmin):
     list_display = (
         'id', 'name', 'category', 'price', 'old_price',
         'stock', 'stock_status', 'is_recommended', 'is_bestseller',
-        'is_new', 'views_count', 'created_at'
+        'is_new', 'flash_sale', 'views_count', 'created_at'
     )
     list_display_links = ('id', 'name')
     list_filter = (
         'category', 'is_recommended', 'is_bestseller',
-        'is_new', 'seller', 'created_at'
+        'is_new', 'flash_sale', 'seller', 'created_at'
     )
     search_fields = ('name', 'description', 'slug')
     prepopulated_fields = {'slug': ('name',)}
-    readonly_fields = ('views_count', 'created_at', 'updated_at', 'preview_image')
-    list_editable = ('stock', 'is_recommended', 'is_bestseller', 'is_new')
+    readonly_fields = ('views_count', 'reserved', 'created_at', 'updated_at', 'preview_image')
+    list_editable = ('stock', 'is_recommended', 'is_bestseller', 'is_new', 'flash_sale')
     date_hierarchy = 'created_at'
     list_per_page = 25
     inlines = [ProductImageInline, ProductSizeInline]
@@ -50,10 +52,10 @@ class ProductAdmin(admin.ModelAdmin):
             'fields': ('name', 'slug', 'seller', 'category', 'description')
         }),
         ('Price', {
-            'fields': ('price', 'old_price')
+            'fields': ('price', 'old_price', 'flash_sale')
         }),
         ('Stock', {
-            'fields': ('stock', 'color'),
+            'fields': ('stock', 'reserved', 'color'),
             'description': 'Quantity 0 = no in stock'
         }),
         ('Images', {
@@ -130,11 +132,13 @@ class ProductAdmin(admin.ModelAdmin):
     @admin.action(description='Stock 10 pcs.)')
     def make_in_stock(self, request, queryset):
         queryset.update(stock=10)
+        refresh_stock(queryset)
         self.message_user(request, f'{queryset.count()} products updated')
 
     @admin.action(description='Out of stock')
     def make_out_of_stock(self, request, queryset):
         queryset.update(stock=0)
+        refresh_stock(queryset)
         self.message_user(request, f'{queryset.count()} products updated')
 
     @admin.action(description='Mark as bestseller')
@@ -156,10 +160,11 @@ class SizeAdmin(admin.ModelAdmin):
 
 @admin.register(ProductSize)
 class ProductSizeAdmin(admin.ModelAdmin):
-    list_display = ('product', 'size', 'stock')
+    list_display = ('product', 'size', 'stock', 'reserved')
     list_filter = ('size', 'product__category')
     search_fields = ('product__name',)
     list_editable = ('stock',)
+    readonly_fields = ('reserved',)
 
 
 @admin.register(ProductImage)
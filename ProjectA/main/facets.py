@@ -0,0 +1,102 @@
+from django.conf import settings
+from django.db.models import Case, CharField, Count, F, Q, Value, When
+from django.db.models.functions import Cast
+
+from .models import ProductSize
+
+
+TOTAL = 'total'
+BOOLEAN_FACETS = ('discount', 'in_stock')
+
+
+def price_buckets():
+    bounds = settings.FACETS['PRICE_BUCKETS']
+    return [f'{lower}-{upper}' for lower, upper in zip((0, *bounds), bounds)] + [f'{bounds[-1]}+']
+
+
+def price_bucket():
+    bounds = settings.FACETS['PRICE_BUCKETS']
+    labels = price_buckets()
+    return Case(
+        *[When(price__lt=upper, then=Value(label)) for upper, label in zip(bounds, labels)],
+        default=Value(labels[-1]),
+        output_field=CharField(),
+    )
+
+
+def flag(condition):
+    return Case(When(condition, then=Value('true')), default=Value('false'), output_field=CharField())
+
+
+def size_filter(value):
+    sizes = ProductSize.objects.filter(stock__gt=0)
+    if value.isdigit():
+        sizes = sizes.filter(size_id=value)
+    else:
+        sizes = sizes.filter(size__name__iexact=value)
+    return Q(pk__in=sizes.values('product_id'))
+
+
+def facet_filters(params):
+    filters = {}
+
+    if params.get('category_slug'):
+        filters['category'] = Q(category__slug=params['category_slug'])
+    if params.get('color'):
+        filters['color'] = Q(color__icontains=params['color'])
+    if params.get('size'):
+        filters['size'] = size_filter(params['size'])
+
+    price = Q()
+    if params.get('min_price'):
+        price &= Q(price__gte=params['min_price'])
+    if params.get('max_price'):
+        price &= Q(price__lte=params['max_price'])
+    if price:
+        filters['price'] = price
+
+    if params.get('has_discount'):
+        filters['discount'] = Q(old_price__isnull=False, old_price__gt=F('price'))
+    if params.get('in_stock') == 'true':
+        filters['in_stock'] = Q(is_in_stock=True)
+
+    return filters
+
+
+def facet_values():
+    return {
+        TOTAL: (Value(''), Q()),
+        'category': (F('category__slug'), Q()),
+        'color': (F('color'), ~Q(color='')),
+        'size': (F('product_sizes__size__name'), Q(product_sizes__stock__gt=0)),
+        'price': (price_bucket(), Q()),
+        'discount': (flag(Q(old_price__isnull=False, old_price__gt=F('price'))), Q()),
+        'in_stock': (flag(Q(is_in_stock=True)), Q()),
+    }
+
+
+def facet_counts(products, params):
+    filters = facet_filters(params)
+    querysets = []
+    for name, (value, condition) in facet_values().items():
+        others = [q for facet, q in filters.items() if facet != name]
+        querysets.append(
+            products.filter(*others).filter(condition).order_by()
+            .annotate(facet=Value(name), value=Cast(value, CharField()))
+            .values('facet', 'value')
+            .annotate(count=Count('pk', distinct=True))
+        )
+
+    rows = querysets[0].union(*querysets[1:], all=True)
+
+    counts = {name: {} for name in facet_values()}
+    for row in rows:
+        counts[row['facet']][row['value']] = row['count']
+
+    result = {TOTAL: counts.pop(TOTAL).get('', 0)}
+    for name in ('category', 'color', 'size'):
+        result[name] = dict(sorted(counts[name].items(), key=lambda item: (-item[1], item[0])))
+    result['price'] = {label: counts['price'].get(label, 0) for label in price_buckets()}
+    for name in BOOLEAN_FACETS:
+        result[name] = {'true': counts[name].get('true', 0), 'false': counts[name].get('false', 0)}
+    return result
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from main.view_counter import view_counter
+
+
+class Command(BaseCommand):
+    help = 'Write buffered product view counts back to the database'
+
+    def handle(self, *args, **options):
+        flushed = view_counter.flush()
+        self.stdout.write(self.style.SUCCESS(f'Flushed {flushed} product views'))
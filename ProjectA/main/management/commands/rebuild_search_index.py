@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from main.models import Product
+from main.search import refresh_search_vector
+
+
+class Command(BaseCommand):
+    help = 'Recompute the full-text search vector of every product (e.g. after bulk imports)'
+
+    def handle(self, *args, **options):
+        updated = refresh_search_vector(Product.objects.all())
+        self.stdout.write(self.style.SUCCESS(f'Reindexed {updated} products'))
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.9 on 2026-10-18 02:32
+
+from django.db import migrations, models
+from django.db.models import F, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.db.models.lookups import GreaterThan
+
+
+def backfill_stock_projection(apps, schema_editor):
+    Product = apps.get_model('main', 'Product')
+    ProductSize = apps.get_model('main', 'ProductSize')
+
+    totals = ProductSize.objects.filter(
+        product=OuterRef('pk')
+    ).order_by().values('product').annotate(
+        total=Sum('stock')
+    ).values('total')
+    sizes_total = Coalesce(Subquery(totals, output_field=IntegerField()), 0)
+
+    Product.objects.filter(category__requires_size=True).update(
+        stock=sizes_total,
+        is_in_stock=GreaterThan(sizes_total, 0),
+    )
+    Product.objects.filter(category__requires_size=False).update(
+        is_in_stock=GreaterThan(F('stock'), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0009_product_stock'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='is_in_stock',
+            field=models.BooleanField(db_index=True, default=False, verbose_name='In stock'),
+        ),
+        migrations.RunPython(backfill_stock_projection, migrations.RunPython.noop),
+    ]
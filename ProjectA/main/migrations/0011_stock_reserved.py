@@ -0,0 +1,23 @@
+# Generated by Django 5.2.9 on 2026-10-18 03:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0010_product_is_in_stock'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='reserved',
+            field=models.PositiveIntegerField(default=0, verbose_name='Reserved at checkout'),
+        ),
+        migrations.AddField(
+            model_name='productsize',
+            name='reserved',
+            field=models.PositiveIntegerField(default=0, verbose_name='Reserved at checkout'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.9 on 2026-10-18 04:21
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+from main.search import product_search_vector
+
+
+INDEX_NAME = 'main_product_search_vector_gin'
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    Product = apps.get_model('main', 'Product')
+    quote = schema_editor.quote_name
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS {quote(INDEX_NAME)} '
+        f'ON {quote(Product._meta.db_table)} USING gin ({quote("search_vector")})'
+    )
+    Product.objects.update(search_vector=product_search_vector())
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX IF EXISTS {schema_editor.quote_name(INDEX_NAME)}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0012_product_flash_sale'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index, elidable=False),
+    ]
@@ -1,9 +1,18 @@
 from django.db import models
 from django.utils.text import slugify
 from reviews.models import Review
-from django.db.models import Avg, Count, Sum
+from django.db.models import Avg, Count
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
+from django.contrib.postgres.search import SearchVectorField
+from .search import refresh_search_vector
+from .stock import refresh_stock
+
+
+class CategoryQuerySet(models.QuerySet):
+
+    def with_products_count(self):
+        return self.annotate(products_count=Count('products'))
 
 
 class Category(models.Model):
@@ -11,6 +20,8 @@ class Category(models.Model):
     slug = models.CharField(max_length=100, unique=True)
     requires_size = models.BooleanField(default=False, verbose_name="Need a size")
 
+    objects = CategoryQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'Category'
         verbose_name_plural = 'Categories'
@@ -35,6 +46,13 @@ class Size(models.Model):
         return self.name
 
 
+def saved_fields(instance, update_fields):
+    if update_fields is None and not instance._state.adding:
+        fields = {field.attname for field in instance._meta.concrete_fields if not field.primary_key}
+        return fields - instance.get_deferred_fields() - {'reserved'}
+    return update_fields
+
+
 class Product(models.Model):
     name = models.CharField(max_length=100, verbose_name='Name')
     slug = models.CharField(max_length=100, unique=True)
@@ -58,16 +76,47 @@ class Product(models.Model):
     rating = models.DecimalField(max_digits=2, decimal_places=1, default=0, verbose_name='Rating')
     reviews_count = models.PositiveIntegerField(default=0, verbose_name='Quantity of reviews')
     stock = models.PositiveIntegerField(default=0,verbose_name='Quantity in warehouse')
+    reserved = models.PositiveIntegerField(default=0, verbose_name='Reserved at checkout')
+    is_in_stock = models.BooleanField(default=False, db_index=True, verbose_name='In stock')
+    flash_sale = models.BooleanField(default=False, verbose_name='Flash sale')
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         verbose_name = 'Product'
         verbose_name_plural = 'Products'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='product_created_keyset_idx'),
+            models.Index(fields=['price', 'id'], name='product_price_keyset_idx'),
+            models.Index(fields=['views_count', 'id'], name='product_views_keyset_idx'),
+            models.Index(fields=['category', '-created_at', '-id'], name='product_category_keyset_idx'),
+            models.Index(fields=['seller', '-created_at', '-id'], name='product_seller_keyset_idx'),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.name)
+        update_fields = saved_fields(self, kwargs.get('update_fields'))
+        if update_fields is None or 'stock' in update_fields:
+            self.is_in_stock = self.stock > self.reserved
+        if update_fields is not None:
+            kwargs['update_fields'] = update_fields
+        if update_fields is not None and 'stock' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'is_in_stock'}
         super().save(*args, **kwargs)
+        self._saved_stock = self.stock_source()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._saved_stock = instance.stock_source()
+        return instance
+
+    def stock_source(self):
+        return self.__dict__.get('category_id'), self.__dict__.get('stock')
+
+    def stock_source_changed(self):
+        return getattr(self, '_saved_stock', None) != self.stock_source()
 
     def __str__(self):
         return self.name
@@ -87,13 +136,13 @@ class Product(models.Model):
         self.reviews_count = stats['count']
         self.save(update_fields=['rating', 'reviews_count'])
 
+    @property
+    def available_stock(self):
+        return max(self.stock - self.reserved, 0)
+
     def update_stock_from_sizes(self):
-        if self.category and self.category.requires_size:
-            total_stock = self.product_sizes.aggregate(
-                total=Sum('stock')
-            )['total'] or 0
-            self.stock = total_stock
-            self.save(update_fields=['stock'])
+        refresh_stock(Product.objects.filter(pk=self.pk))
+        self.refresh_from_db(fields=['stock', 'is_in_stock'])
 
 
 class ProductSize(models.Model):
@@ -101,6 +150,7 @@ class ProductSize(models.Model):
                                 related_name='product_sizes')
     size = models.ForeignKey(Size, on_delete=models.CASCADE)
     stock = models.PositiveIntegerField(default=0, verbose_name='On stock')
+    reserved = models.PositiveIntegerField(default=0, verbose_name='Reserved at checkout')
 
     class Meta:
         verbose_name = 'Size'
@@ -109,24 +159,38 @@ class ProductSize(models.Model):
     def __str__(self):
         return f"{self.size.name} ({self.stock} pcs.) for {self.product.name}"
 
+    def save(self, *args, **kwargs):
+        update_fields = saved_fields(self, kwargs.get('update_fields'))
+        if update_fields is not None:
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
+    @property
+    def available_stock(self):
+        return max(self.stock - self.reserved, 0)
+
 @receiver(post_save, sender=ProductSize)
 def update_product_stock_on_save(sender, instance, **kwargs):
-    if instance.product.category and instance.product.category.requires_size:
-        total_stock = instance.product.product_sizes.aggregate(
-            total=Sum('stock')
-        )['total'] or 0
-        Product.objects.filter(pk=instance.product.pk).update(stock=total_stock)
+    refresh_stock(Product.objects.filter(pk=instance.product_id))
 
 @receiver(post_delete, sender=ProductSize)
 def update_product_stock_on_delete(sender, instance, **kwargs):
-    try:
-        if instance.product.category and instance.product.category.requires_size:
-            total_stock = instance.product.product_sizes.aggregate(
-                total=Sum('stock')
-            )['total'] or 0
-            Product.objects.filter(pk=instance.product.pk).update(stock=total_stock)
-    except Product.DoesNotExist:
-        pass
+    refresh_stock(Product.objects.filter(pk=instance.product_id))
+
+@receiver(post_save, sender=Product)
+def update_sized_product_stock(sender, instance, **kwargs):
+    if instance.stock_source_changed() and instance.category.requires_size:
+        instance.update_stock_from_sizes()
+
+@receiver(post_save, sender=Product)
+def update_product_search_vector(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or {'name', 'description'} & set(update_fields):
+        refresh_search_vector(Product.objects.filter(pk=instance.pk))
+
+@receiver(post_save, sender=Category)
+def update_category_products_stock(sender, instance, created, **kwargs):
+    if not created:
+        refresh_stock(instance.products.all())
 
 
 class ProductImage(models.Model):
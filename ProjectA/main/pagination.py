@@ -0,0 +1,55 @@
+import base64
+import json
+from decimal import Decimal
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+KEYS = {
+    'created_at': parse_datetime,
+    'price': Decimal,
+    'views_count': int,
+    'search_rank': float,
+}
+
+
+def encode_cursor(product, field):
+    value = getattr(product, field)
+    if isinstance(value, Decimal):
+        value = str(value)
+    elif hasattr(value, 'isoformat'):
+        value = value.isoformat()
+    return base64.urlsafe_b64encode(json.dumps([field, value, product.pk]).encode()).decode()
+
+
+def decode_cursor(cursor, field):
+    try:
+        key, value, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        value = KEYS[field](value)
+        pk = int(pk)
+    except (TypeError, ValueError, KeyError, UnicodeError, ArithmeticError):
+        raise ValueError('Invalid cursor')
+    if key != field or value is None:
+        raise ValueError('Invalid cursor')
+    return value, pk
+
+
+def after(products, ordering, value, pk):
+    field = ordering.lstrip('-')
+    lookup = 'lt' if ordering.startswith('-') else 'gt'
+    return products.filter(
+        Q(**{f'{field}__{lookup}e': value}),
+        Q(**{f'{field}__{lookup}': value}) | Q(**{field: value, f'pk__{lookup}': pk}),
+    )
+
+
+def keyset_page(products, ordering, cursor=None, page_size=20):
+    field = ordering.lstrip('-')
+    products = products.order_by(ordering, '-pk' if ordering.startswith('-') else 'pk')
+    if cursor:
+        products = after(products, ordering, *decode_cursor(cursor, field))
+
+    products = list(products[:page_size + 1])
+    next_cursor = encode_cursor(products[page_size - 1], field) if len(products) > page_size else None
+    return products[:page_size], next_cursor
@@ -0,0 +1,52 @@
+import re
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import F, FloatField, Q
+from django.db.models.functions import Cast
+
+
+TERM = re.compile(r'\w+')
+
+
+def full_text_enabled():
+    return connection.vendor == 'postgresql'
+
+
+def product_search_vector():
+    config = settings.SEARCH_CONFIG
+    return SearchVector('name', weight='A', config=config) + SearchVector('description', weight='B', config=config)
+
+
+def refresh_search_vector(products):
+    if full_text_enabled():
+        return products.update(search_vector=product_search_vector())
+    return 0
+
+
+def parse_query(query):
+    terms = TERM.findall(query)
+    if not terms:
+        return None
+    return SearchQuery(
+        ' & '.join(f'{term}:*' for term in terms),
+        config=settings.SEARCH_CONFIG,
+        search_type='raw',
+    )
+
+
+def search_products(products, query, ranked=True):
+    if not full_text_enabled():
+        return products.filter(Q(name__icontains=query) | Q(description__icontains=query))
+
+    search_query = parse_query(query)
+    if search_query is None:
+        return products.none()
+
+    products = products.filter(search_vector=search_query)
+    if ranked:
+        products = products.annotate(
+            search_rank=Cast(SearchRank(F('search_vector'), search_query), FloatField()),
+        ).order_by('-search_rank', '-created_at')
+    return products
@@ -0,0 +1,27 @@
+from django.db.models import F, OuterRef, Subquery, Sum, IntegerField
+from django.db.models.functions import Coalesce
+from django.db.models.lookups import GreaterThan
+
+
+def sizes_stock_subquery():
+    from .models import ProductSize
+
+    totals = ProductSize.objects.filter(
+        product=OuterRef('pk')
+    ).order_by().values('product').annotate(
+        total=Sum('stock')
+    ).values('total')
+
+    return Coalesce(Subquery(totals, output_field=IntegerField()), 0)
+
+
+def refresh_stock(products):
+    sizes_total = sizes_stock_subquery()
+
+    products.filter(category__requires_size=True).update(
+        stock=sizes_total,
+        is_in_stock=GreaterThan(sizes_total, F('reserved')),
+    )
+    products.filter(category__requires_size=False).update(
+        is_in_stock=GreaterThan(F('stock'), F('reserved')),
+    )
@@ -0,0 +1,197 @@
+import bisect
+import heapq
+import re
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Category, Product
+
+
+VERSION_KEY = 'suggest:version'
+TOKEN = re.compile(r'\w+')
+PRODUCT = 'product'
+CATEGORY = 'category'
+
+
+def tokenize(text):
+    return TOKEN.findall(text.casefold())
+
+
+def product_score(views_count, total_sales):
+    return views_count + settings.SUGGEST['SALES_WEIGHT'] * (total_sales or 0)
+
+
+class Entry:
+    __slots__ = ('kind', 'pk', 'name', 'slug', 'score', 'tokens')
+
+    def __init__(self, kind, pk, name, slug, score):
+        self.kind = kind
+        self.pk = pk
+        self.name = name
+        self.slug = slug
+        self.score = score
+        self.tokens = tuple(sorted(set(tokenize(name))))
+
+    def matches(self, terms):
+        return all(any(token.startswith(term) for token in self.tokens) for term in terms)
+
+    def as_dict(self):
+        return {'id': self.pk, 'name': self.name, 'slug': self.slug}
+
+
+class SuggestIndex:
+
+    def __init__(self):
+        self.keys = []
+        self.entries = {}
+        self.version = None
+        self.built_at = 0
+        self._pending = 0
+        self._lock = threading.RLock()
+
+    def _version(self):
+        cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+        return cache.get(VERSION_KEY)
+
+    def _publish(self):
+        self._version()
+        try:
+            version = cache.incr(VERSION_KEY)
+        except ValueError:
+            version = time.time_ns()
+            cache.set(VERSION_KEY, version, timeout=None)
+        with self._lock:
+            if self._pending > 0:
+                self._pending -= 1
+                if self.version == version - 1:
+                    self.version = version
+
+    def _changed(self, local):
+        if local:
+            with self._lock:
+                self._pending += 1
+        transaction.on_commit(self._publish)
+
+    def _insert(self, entry):
+        self.entries[(entry.kind, entry.pk)] = entry
+        for token in entry.tokens:
+            bisect.insort(self.keys, (token, entry.kind, entry.pk))
+
+    def _discard(self, kind, pk):
+        entry = self.entries.pop((kind, pk), None)
+        if entry is None:
+            return None
+        for token in entry.tokens:
+            position = bisect.bisect_left(self.keys, (token, kind, pk))
+            if position < len(self.keys) and self.keys[position] == (token, kind, pk):
+                del self.keys[position]
+        return entry
+
+    def rebuild(self, version=None):
+        version = version if version is not None else self._version()
+        entries = [
+            Entry(PRODUCT, pk, name, slug, product_score(views_count, total_sales))
+            for pk, name, slug, views_count, total_sales in Product.objects.order_by().values_list(
+                'pk', 'name', 'slug', 'views_count', 'score__total_sales',
+            )
+        ]
+        entries += [
+            Entry(CATEGORY, category.pk, category.name, category.slug, category.products_count)
+            for category in Category.objects.with_products_count()
+        ]
+        keys = sorted((token, entry.kind, entry.pk) for entry in entries for token in entry.tokens)
+
+        with self._lock:
+            self.keys = keys
+            self.entries = {(entry.kind, entry.pk): entry for entry in entries}
+            self.version = version
+            self.built_at = time.monotonic()
+
+    def ensure_fresh(self):
+        version = self._version()
+        if self.version != version or time.monotonic() - self.built_at > settings.SUGGEST['MAX_AGE']:
+            self.rebuild(version)
+
+    def suggest(self, query, limit=None):
+        limit = limit or settings.SUGGEST['LIMIT']
+        terms = tokenize(query)
+        if not terms or len(''.join(terms)) < settings.SUGGEST['MIN_LENGTH']:
+            return {'products': [], 'categories': []}
+
+        self.ensure_fresh()
+        key = max(terms, key=len)
+        with self._lock:
+            start = bisect.bisect_left(self.keys, (key,))
+            end = bisect.bisect_left(self.keys, (key + '\U0010ffff',))
+            found = {(kind, pk) for _, kind, pk in self.keys[start:end]}
+            matches = [self.entries[found_key] for found_key in found]
+
+        matches = [entry for entry in matches if entry.matches(terms)]
+
+        def ranked(kind):
+            return heapq.nlargest(
+                limit,
+                (entry for entry in matches if entry.kind == kind),
+                key=lambda entry: (entry.score, -entry.pk),
+            )
+
+        return {
+            'products': [entry.as_dict() for entry in ranked(PRODUCT)],
+            'categories': [entry.as_dict() for entry in ranked(CATEGORY)],
+        }
+
+    def update(self, kind, pk, name, slug):
+        with self._lock:
+            built = self.version is not None
+            if built:
+                previous = self._discard(kind, pk)
+                self._insert(Entry(kind, pk, name, slug, previous.score if previous else 0))
+        self._changed(built)
+
+    def remove(self, kind, pk):
+        with self._lock:
+            built = self.version is not None
+            if built:
+                self._discard(kind, pk)
+        self._changed(built)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_suggest_index():
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = SuggestIndex()
+    return _index
+
+
+@receiver(post_save, sender=Product)
+def product_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        get_suggest_index().update(PRODUCT, instance.pk, instance.name, instance.slug)
+
+
+@receiver(post_delete, sender=Product)
+def product_deleted(sender, instance, **kwargs):
+    get_suggest_index().remove(PRODUCT, instance.pk)
+
+
+@receiver(post_save, sender=Category)
+def category_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        get_suggest_index().update(CATEGORY, instance.pk, instance.name, instance.slug)
+
+
+@receiver(post_delete, sender=Category)
+def category_deleted(sender, instance, **kwargs):
+    get_suggest_index().remove(CATEGORY, instance.pk)
@@ -0,0 +1,8 @@
+from celery import shared_task
+
+from .view_counter import view_counter
+
+
+@shared_task
+def flush_view_counts():
+    return view_counter.flush()
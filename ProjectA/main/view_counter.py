@@ -0,0 +1,59 @@
+import uuid
+
+from django.db import transaction
+from django.db.models import Case, F, PositiveIntegerField, Value, When
+from redis.exceptions import ResponseError
+
+from marketplace.redis_client import get_redis
+from .models import Product
+
+
+class ViewCounter:
+
+    def __init__(self, key='product_views:pending'):
+        self.key = key
+
+    def increment(self, product_id, amount=1):
+        return get_redis().hincrby(self.key, product_id, amount)
+
+    def pending(self, product_id):
+        return int(get_redis().hget(self.key, product_id) or 0)
+
+    def live_count(self, product):
+        return product.views_count + self.pending(product.pk)
+
+    def flush(self):
+        redis = get_redis()
+        batch_key = f'{self.key}:flushing:{uuid.uuid4().hex}'
+
+        try:
+            redis.rename(self.key, batch_key)
+        except ResponseError:
+            return 0
+
+        counts = {
+            int(product_id): int(amount)
+            for product_id, amount in redis.hgetall(batch_key).items()
+        }
+
+        try:
+            with transaction.atomic():
+                Product.objects.filter(pk__in=counts).update(
+                    views_count=F('views_count') + Case(
+                        *[When(pk=product_id, then=Value(amount))
+                          for product_id, amount in counts.items()],
+                        default=Value(0),
+                        output_field=PositiveIntegerField(),
+                    )
+                )
+        except Exception:
+            for product_id, amount in counts.items():
+                redis.hincrby(self.key, product_id, amount)
+            raise
+        finally:
+            redis.delete(batch_key)
+
+        return sum(counts.values())
+
+
+view_counter = ViewCounter()
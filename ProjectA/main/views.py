@@ -1,8 +1,14 @@
+from django.conf import settings
 from django.shortcuts import get_object_or_404
 from django.views.generic import TemplateView, DetailView
 from django.template.response import TemplateResponse
 from .models import Category, Product, Size
-from django.db.models import Q, F
+from .cache import cached_catalog_data
+from .facets import facet_counts, facet_filters
+from .pagination import keyset_page
+from .search import search_products
+from .view_counter import view_counter
+from django.db.models import F
 
 
 class IndexView(TemplateView):
@@ -10,31 +16,35 @@ class IndexView(TemplateView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['categories'] = Category.objects.all()
+        context.update(cached_catalog_data('index', self.request, self.get_catalog_blocks))
         context['current_category'] = None
+        return context
 
-        context['recommended_products'] = Product.objects.filter(
-            is_recommended=True
-        ).order_by('-created_at')[:8]
+    def get_catalog_blocks(self):
+        return {
+            'categories': list(Category.objects.with_products_count()),
 
-        context['bestseller_products'] = Product.objects.filter(
-            is_bestseller=True
-        ).order_by('-created_at')[:8]
+            'recommended_products': list(Product.objects.filter(
+                is_recommended=True
+            ).order_by('-created_at')[:8]),
 
-        context['new_products'] = Product.objects.filter(
-            is_new=True
-        ).order_by('-created_at')[:8]
+            'bestseller_products': list(Product.objects.filter(
+                is_bestseller=True
+            ).order_by('-created_at')[:8]),
 
-        context['popular_products'] = Product.objects.all().order_by(
-            '-views_count'
-        )[:8]
+            'new_products': list(Product.objects.filter(
+                is_new=True
+            ).order_by('-created_at')[:8]),
 
-        context['sale_products'] = Product.objects.filter(
-            old_price__isnull=False,
-            old_price__gt=F('price')
-        ).order_by('-created_at')[:8]
+            'popular_products': list(Product.objects.all().order_by(
+                '-views_count'
+            )[:8]),
 
-        return context
+            'sale_products': list(Product.objects.filter(
+                old_price__isnull=False,
+                old_price__gt=F('price')
+            ).order_by('-created_at')[:8]),
+        }
 
     def get(self, request, *args, **kwargs):
         context = self.get_context_data(**kwargs)
@@ -46,12 +56,7 @@ class IndexView(TemplateView):
 class CatalogView(TemplateView):
     template_name = 'main/base.html'
 
-    FILTER_MAPPING = {
-        'color': lambda queryset, value: queryset.filter(color__iexact=value),
-        'min_price': lambda queryset, value: queryset.filter(price__gte=value),
-        'max_price': lambda queryset, value: queryset.filter(price__lte=value),
-        'size': lambda queryset, value: queryset.filter(product_sizes__size__name=value)
-    }
+    FILTER_PARAMS = ('color', 'min_price', 'max_price', 'size', 'has_discount', 'in_stock')
 
     SORT_MAPPING = {
         'newest': '-created_at',
@@ -60,46 +65,74 @@ class CatalogView(TemplateView):
         'popular': '-views_count',
     }
 
+    def is_fragment(self):
+        return bool(self.request.headers.get('HX-Request') and self.request.GET.get('cursor'))
+
+    def get_page(self, products, ordering):
+        cursor = self.request.GET.get('cursor')
+        try:
+            products, next_cursor = keyset_page(products, ordering, cursor, settings.CATALOG_PAGE_SIZE)
+        except ValueError:
+            if self.is_fragment():
+                return [], None
+            products, next_cursor = keyset_page(products, ordering, None, settings.CATALOG_PAGE_SIZE)
+
+        next_url = None
+        if next_cursor:
+            params = self.request.GET.copy()
+            params['cursor'] = next_cursor
+            params.pop('show_filters', None)
+            next_url = f'{self.request.path}?{params.urlencode()}'
+        return products, next_url
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         category_slug = kwargs.get('category_slug')
-        categories = Category.objects.all()
         products = Product.objects.all()
         current_category = None
 
         if category_slug:
             current_category = get_object_or_404(Category, slug=category_slug)
-            products = products.filter(category=current_category)
 
         query = self.request.GET.get('q')
+        ranked = bool(query) and 'sort' not in self.request.GET
         if query:
-            products = products.filter(
-                Q(name__icontains=query) | Q(description__icontains=query)
-            )
-
-        filter_params = {}
-        for param, filter_func in self.FILTER_MAPPING.items():
-            value = self.request.GET.get(param)
-            if value:
-                products = filter_func(products, value)
-                filter_params[param] = value
-            else:
-                filter_params[param] = ''
-
-        filter_params['q'] = query or ''
+            products = search_products(products, query, ranked=ranked)
 
+        filter_params = {param: self.request.GET.get(param, '') for param in self.FILTER_PARAMS}
         sort = self.request.GET.get('sort', 'newest')
-        order_by = self.SORT_MAPPING.get(sort, '-created_at')
-        products = products.order_by(order_by)
+        ordering = self.SORT_MAPPING.get(sort, '-created_at')
+        if ranked and 'search_rank' in products.query.annotations:
+            ordering = '-search_rank'
+
+        if not self.is_fragment():
+            facets = facet_counts(products, {**filter_params, 'category_slug': category_slug})
+
+            categories = list(Category.objects.all())
+            for category in categories:
+                category.facet_count = facets['category'].get(category.slug, 0)
+            sizes = list(Size.objects.all())
+            for size in sizes:
+                size.facet_count = facets['size'].get(size.name, 0)
+
+            context.update({
+                'categories': categories,
+                'sizes': sizes,
+                'facets': facets,
+            })
+
+        if current_category:
+            products = products.filter(category=current_category)
+        products = products.filter(*facet_filters(filter_params).values())
+        products, next_url = self.get_page(products, ordering)
 
-        products = products.distinct()
+        filter_params['q'] = query or ''
 
         context.update({
-            'categories': categories,
             'products': products,
+            'next_url': next_url,
             'current_category': category_slug,
             'filter_params': filter_params,
-            'sizes': Size.objects.all(),
             'search_query': query or '',
             'current_sort': sort,
         })
@@ -114,6 +147,9 @@ class CatalogView(TemplateView):
     def get(self, request, *args, **kwargs):
         context = self.get_context_data(**kwargs)
 
+        if self.is_fragment():
+            return TemplateResponse(request, 'main/catalog_products.html', context)
+
         if request.headers.get('HX-Request'):
             if context.get('show_search'):
                 return TemplateResponse(request, 'main/search_input.html', context)
@@ -164,12 +200,9 @@ class ProductDetailView(DetailView):
 
     def get(self, request, *args, **kwargs):
         self.object = self.get_object()
+        self.object.views_count += view_counter.increment(self.object.pk)
         context = self.get_context_data(**kwargs)
 
-        Product.objects.filter(pk=self.object.pk).update(
-            views_count=F('views_count') + 1
-        )
-
         if request.headers.get('HX-Request'):
             return TemplateResponse(request, 'main/product_detail.html', context)
 
@@ -0,0 +1,118 @@
+import threading
+
+import redis
+from django.conf import settings
+
+
+class LocalRedis:
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.RLock()
+
+    def _hash(self, name):
+        return self._data.setdefault(name, {})
+
+    def hincrby(self, name, key, amount=1):
+        with self._lock:
+            values = self._hash(name)
+            value = int(values.get(str(key), 0)) + amount
+            values[str(key)] = str(value)
+            return value
+
+    def hset(self, name, key=None, value=None, mapping=None):
+        items = dict(mapping or {})
+        if key is not None:
+            items[key] = value
+        with self._lock:
+            values = self._hash(name)
+            created = sum(1 for field in items if str(field) not in values)
+            values.update({str(field): str(item) for field, item in items.items()})
+            return created
+
+    def hdel(self, name, *keys):
+        with self._lock:
+            values = self._data.get(name, {})
+            removed = sum(1 for key in keys if values.pop(str(key), None) is not None)
+            if name in self._data and not values:
+                del self._data[name]
+            return removed
+
+    def hget(self, name, key):
+        with self._lock:
+            return self._data.get(name, {}).get(str(key))
+
+    def hgetall(self, name):
+        with self._lock:
+            return dict(self._data.get(name, {}))
+
+    def get(self, name):
+        with self._lock:
+            return self._data.get(name)
+
+    def set(self, name, value, nx=False, ex=None):
+        with self._lock:
+            if nx and name in self._data:
+                return None
+            self._data[name] = str(value)
+            return True
+
+    def rpush(self, name, *values):
+        with self._lock:
+            items = self._data.setdefault(name, [])
+            items.extend(str(value) for value in values)
+            return len(items)
+
+    def lpop(self, name):
+        with self._lock:
+            items = self._data.get(name)
+            if not items:
+                return None
+            value = items.pop(0)
+            if not items:
+                del self._data[name]
+            return value
+
+    def llen(self, name):
+        with self._lock:
+            return len(self._data.get(name, []))
+
+    def rename(self, src, dst):
+        with self._lock:
+            if src not in self._data:
+                raise redis.exceptions.ResponseError('no such key')
+            self._data[dst] = self._data.pop(src)
+            return True
+
+    def exists(self, *names):
+        with self._lock:
+            return sum(1 for name in names if name in self._data)
+
+    def expire(self, name, seconds):
+        with self._lock:
+            return name in self._data
+
+    def delete(self, *names):
+        with self._lock:
+            return sum(1 for name in names if self._data.pop(name, None) is not None)
+
+    def flushdb(self):
+        with self._lock:
+            self._data.clear()
+            return True
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_redis():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                if settings.REDIS_URL:
+                    _client = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+                else:
+                    _client = LocalRedis()
+    return _client
@@ -57,6 +57,7 @@ INSTALLED_APPS = [
     'reviews',
     'orders',
     'logs',
+    'recommendations',
 
 ]
 
@@ -114,6 +115,27 @@ DATABASES = {
 }
 
 
+REDIS_HOST = os.getenv('REDIS_HOST')
+REDIS_PORT = os.getenv('REDIS_PORT', '6379')
+REDIS_URL = f'redis://{REDIS_HOST}:{REDIS_PORT}/0' if REDIS_HOST else None
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+CATALOG_CACHE_TIMEOUT = 300
+
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -167,12 +189,17 @@ CORS_ALLOW_HEADERS = [
     "authorization",
     "content-type",
     "dnt",
+    "idempotency-key",
     "origin",
     "user-agent",
     "x-csrftoken",
     "x-requested-with",
 ]
 
+CORS_EXPOSE_HEADERS = [
+    "idempotent-replayed",
+]
+
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'static')
 
@@ -203,6 +230,121 @@ REST_FRAMEWORK = {
     ],
 }
 
+CELERY_BROKER_URL = REDIS_URL or 'memory://'
+CELERY_TIMEZONE = TIME_ZONE
+
+VIEW_COUNTER_FLUSH_INTERVAL = 30
+
+COPURCHASE_BUILD_INTERVAL = 10 * 60
+
+PRODUCT_SCORE_REFRESH_INTERVAL = 15 * 60
+
+RECOMMENDATION_CACHE = {
+    'SIZE': 50,
+    'TIMEOUT': 60 * 60,
+    'LOCAL_MAX_ENTRIES': 1000,
+    'LOCAL_TIMEOUT': 30,
+    'ACTIVE_DAYS': 30,
+}
+
+CART_STORAGE = {
+    'ANONYMOUS': 'cart.storage.RedisCart',
+    'TIMEOUT': 60 * 60 * 24 * 14,
+}
+
+CART_RETENTION = {
+    'ANONYMOUS_IDLE_DAYS': 14,
+    'USER_IDLE_DAYS': 180,
+    'BATCH_SIZE': 500,
+}
+
+STOCK_RESERVATION = {
+    'TTL': 10 * 60,
+    'BATCH_SIZE': 500,
+}
+
+ORDER_HISTORY_PAGE_SIZE = 20
+
+PRODUCT_PAGE_SIZE = 24
+
+CATALOG_PAGE_SIZE = 24
+
+SEARCH_CONFIG = 'simple'
+
+SUGGEST = {
+    'LIMIT': 8,
+    'MIN_LENGTH': 2,
+    'SALES_WEIGHT': 5,
+    'MAX_AGE': 10 * 60,
+}
+
+FACETS = {
+    'PRICE_BUCKETS': (500, 1000, 2500, 5000, 10000, 25000),
+}
+
+IDEMPOTENCY = {
+    'TTL': 24 * 60 * 60,
+    'LOCK_TIMEOUT': 30,
+    'WAIT': 5,
+}
+
+# Without REDIS_HOST the flash-sale queue lives in process memory, so the API drains it
+# inline after commit instead of handing it to the Celery worker.
+FLASH_SALE = {
+    'WORKERS': 4,
+    'WORKER_LEASE': 60,
+    'TICKET_TTL': 30 * 60,
+}
+
+SIMILARITY_INDEX_PATH = os.getenv('SIMILARITY_INDEX_PATH', os.path.join(BASE_DIR, 'var', 'similarity_index.npz'))
+
+CELERY_BEAT_SCHEDULE = {
+    'flush-view-counts': {
+        'task': 'main.tasks.flush_view_counts',
+        'schedule': VIEW_COUNTER_FLUSH_INTERVAL,
+    },
+    'maintain-action-log-partitions': {
+        'task': 'logs.tasks.maintain_action_log_partitions',
+        'schedule': 24 * 60 * 60,
+    },
+    'build-copurchase': {
+        'task': 'recommendations.tasks.build_copurchase',
+        'schedule': COPURCHASE_BUILD_INTERVAL,
+    },
+    'refresh-product-scores': {
+        'task': 'recommendations.tasks.refresh_product_scores',
+        'schedule': PRODUCT_SCORE_REFRESH_INTERVAL,
+    },
+    'precompute-user-recommendations': {
+        'task': 'recommendations.tasks.precompute_user_recommendations',
+        'schedule': RECOMMENDATION_CACHE['TIMEOUT'],
+    },
+    'purge-carts': {
+        'task': 'cart.tasks.purge_carts',
+        'schedule': 60 * 60,
+    },
+    'release-stock-reservations': {
+        'task': 'orders.tasks.release_expired_reservations',
+        'schedule': 60,
+    },
+    'process-flash-sale-queue': {
+        'task': 'orders.tasks.process_flash_sale_queue',
+        'schedule': 5,
+    },
+}
+
+ACTION_LOG_BUFFER = {
+    'ENABLED': os.getenv('ACTION_LOG_BUFFER_ENABLED', 'True') == 'True',
+    'BATCH_SIZE': 100,
+    'FLUSH_INTERVAL': 5,
+    'MAX_SIZE': 10000,
+}
+
+ACTION_LOG_RETENTION_MONTHS = int(os.getenv('ACTION_LOG_RETENTION_MONTHS', 6))
+ACTION_LOG_ARCHIVE_DIR = os.getenv('ACTION_LOG_ARCHIVE_DIR', os.path.join(BASE_DIR, 'archive', 'action_logs'))
+
+QUERY_BUDGET_STRICT = os.getenv('QUERY_BUDGET_STRICT', 'False') == 'True'
+
 from django.http.request import HttpRequest
 
 _original_get_host = HttpRequest.get_host
@@ -0,0 +1,112 @@
+import json
+import logging
+import uuid
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+
+from cart.models import Cart
+from marketplace.redis_client import LocalRedis, get_redis
+from .services import CheckoutError, InsufficientStock, place_order
+
+
+QUEUE_KEY = 'flash_sale:queue'
+TICKET_KEY = 'flash_sale:ticket:{}'
+COUNTERS_KEY = 'flash_sale:counters'
+WORKER_KEY = 'flash_sale:worker:{}'
+
+logger = logging.getLogger(__name__)
+
+
+def queue_is_shared():
+    return not isinstance(get_redis(), LocalRedis)
+
+
+def requires_queue(cart):
+    return any(item.product.flash_sale for item in cart.get_items())
+
+
+def enqueue_checkout(user, details):
+    redis = get_redis()
+    ticket = uuid.uuid4().hex
+    key = TICKET_KEY.format(ticket)
+    number = redis.hincrby(COUNTERS_KEY, 'issued')
+    redis.hset(key, mapping={
+        'status': 'queued',
+        'user_id': user.pk,
+        'number': number,
+        'details': json.dumps(details),
+    })
+    redis.expire(key, settings.FLASH_SALE['TICKET_TTL'])
+    redis.rpush(QUEUE_KEY, ticket)
+    return ticket
+
+
+def get_ticket(ticket, user):
+    redis = get_redis()
+    data = redis.hgetall(TICKET_KEY.format(ticket))
+    if not data or int(data['user_id']) != user.pk:
+        return None
+
+    result = {'ticket': ticket, 'status': data['status']}
+    if data['status'] == 'queued':
+        admitted = int(redis.hget(COUNTERS_KEY, 'admitted') or 0)
+        result['position'] = max(int(data['number']) - admitted, 1)
+    if 'order_id' in data:
+        result['order_id'] = int(data['order_id'])
+    if 'error' in data:
+        result['error'] = data['error']
+    if 'shortages' in data:
+        result['shortages'] = json.loads(data['shortages'])
+    return result
+
+
+def acquire_worker(redis, token):
+    for slot in range(settings.FLASH_SALE['WORKERS']):
+        key = WORKER_KEY.format(slot)
+        if redis.set(key, token, nx=True, ex=settings.FLASH_SALE['WORKER_LEASE']):
+            return key
+    return None
+
+
+def admit(redis, ticket):
+    key = TICKET_KEY.format(ticket)
+    data = redis.hgetall(key)
+    if not data:
+        return
+
+    try:
+        user = get_user_model().objects.filter(pk=data['user_id']).first()
+        if user is None:
+            raise CheckoutError('Користувача не знайдено')
+        order = place_order(Cart.for_user(user), user, **json.loads(data['details']))
+    except InsufficientStock as e:
+        redis.hset(key, mapping={'status': 'rejected', 'error': str(e), 'shortages': json.dumps(e.shortages)})
+    except CheckoutError as e:
+        redis.hset(key, mapping={'status': 'rejected', 'error': str(e)})
+    except Exception:
+        logger.exception('Flash-sale checkout failed for ticket %s', ticket)
+        redis.hset(key, mapping={'status': 'error', 'error': 'Не вдалося оформити замовлення, спробуйте ще раз'})
+    else:
+        redis.hset(key, mapping={'status': 'completed', 'order_id': order.pk})
+
+
+def process_queue(limit=None):
+    redis = get_redis()
+    worker = acquire_worker(redis, uuid.uuid4().hex)
+    if worker is None:
+        return 0
+
+    processed = 0
+    try:
+        while limit is None or processed < limit:
+            ticket = redis.lpop(QUEUE_KEY)
+            if ticket is None:
+                break
+            redis.hincrby(COUNTERS_KEY, 'admitted')
+            admit(redis, ticket)
+            redis.expire(worker, settings.FLASH_SALE['WORKER_LEASE'])
+            processed += 1
+    finally:
+        redis.delete(worker)
+    return processed
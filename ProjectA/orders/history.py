@@ -0,0 +1,34 @@
+import base64
+
+from django.conf import settings
+from django.utils.dateparse import parse_datetime
+
+from .models import Order
+
+
+def encode_cursor(order):
+    value = f'{order.created_at.isoformat()}|{order.pk}'
+    return base64.urlsafe_b64encode(value.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        created_at, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        created_at = parse_datetime(created_at)
+        pk = int(pk)
+    except (TypeError, ValueError, UnicodeError):
+        raise ValueError('Invalid cursor')
+    if created_at is None:
+        raise ValueError('Invalid cursor')
+    return created_at, pk
+
+
+def history_page(user, cursor=None, page_size=None):
+    page_size = page_size or settings.ORDER_HISTORY_PAGE_SIZE
+    orders = Order.objects.history(user)
+    if cursor:
+        orders = orders.before(*decode_cursor(cursor))
+
+    orders = list(orders[:page_size + 1])
+    next_cursor = encode_cursor(orders[page_size - 1]) if len(orders) > page_size else None
+    return orders[:page_size], next_cursor
@@ -0,0 +1,169 @@
+import threading
+import time
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from cart.models import Cart, CartItem
+from main.models import Category, Product, ProductSize, Size
+from marketplace.redis_client import get_redis
+from orders.flash_sale import QUEUE_KEY, enqueue_checkout, get_ticket, process_queue
+from orders.models import Order
+from orders.services import CheckoutError, place_order
+
+
+class Command(BaseCommand):
+    help = 'Burst synthetic buyers at one hot size, checking out directly and through the flash-sale queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--buyers', type=int, default=80)
+        parser.add_argument('--stock', type=int, default=20)
+        parser.add_argument('--workers', type=int, default=4)
+
+    def handle(self, *args, **options):
+        product_size, buyers = self.seed(options)
+        try:
+            for name, run in (('direct', self.direct), ('queued', self.queued)):
+                ProductSize.objects.filter(pk=product_size.pk).update(stock=options['stock'], reserved=0)
+                self.reset_carts(product_size, buyers)
+
+                monitor = LockMonitor()
+                monitor.start()
+                timings = run(buyers, options)
+                monitor.stop()
+
+                sold = Order.objects.filter(user__in=buyers).count()
+                Order.objects.filter(user__in=buyers).delete()
+                self.report(name, timings, sold, monitor.peak)
+        finally:
+            get_redis().delete(QUEUE_KEY)
+            product_size.product.seller.delete()
+            get_user_model().objects.filter(pk__in=[buyer.pk for buyer in buyers]).delete()
+            Category.objects.filter(slug='flash-sale-benchmark').delete()
+
+    def seed(self, options):
+        User = get_user_model()
+        seller = User.objects.create_user(
+            email='flash-sale-benchmark@example.com', first_name='Benchmark', last_name='Seller',
+        )
+        category = Category.objects.create(name='Flash sale benchmark', slug='flash-sale-benchmark', requires_size=True)
+        product = Product.objects.create(
+            name='Flash sale benchmark', slug='flash-sale-benchmark', seller=seller, category=category,
+            price=Decimal('100.00'), old_price=Decimal('200.00'), description='Benchmark', flash_sale=True,
+        )
+        product_size = ProductSize.objects.create(product=product, size=Size.objects.create(name='BENCH'))
+        buyers = User.objects.bulk_create([
+            User(email=f'flash-buyer-{i}@example.com', first_name='Buyer', last_name=str(i))
+            for i in range(options['buyers'])
+        ])
+        Cart.objects.bulk_create([Cart(user=buyer) for buyer in buyers])
+        return product_size, buyers
+
+    def reset_carts(self, product_size, buyers):
+        carts = Cart.objects.filter(user__in=buyers)
+        CartItem.objects.filter(cart__in=carts).delete()
+        CartItem.objects.bulk_create([
+            CartItem(cart=cart, product=product_size.product, product_size=product_size, quantity=1)
+            for cart in carts
+        ])
+        carts.update(items_count=1, subtotal_amount=product_size.product.price)
+
+    def burst(self, buyers, buy):
+        barrier = threading.Barrier(len(buyers))
+        timings = []
+
+        def run(buyer):
+            try:
+                barrier.wait()
+                started = time.perf_counter()
+                buy(buyer)
+                timings.append((time.perf_counter() - started) * 1000)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=run, args=(buyer,)) for buyer in buyers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return timings
+
+    def direct(self, buyers, options):
+        def buy(buyer):
+            try:
+                place_order(Cart.objects.get(user=buyer), buyer, **details(buyer))
+            except CheckoutError:
+                pass
+
+        return self.burst(buyers, buy)
+
+    def queued(self, buyers, options):
+        done = threading.Event()
+
+        def work():
+            try:
+                while not done.is_set():
+                    if not process_queue():
+                        time.sleep(0.005)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=work) for _ in range(options['workers'])]
+        for worker in workers:
+            worker.start()
+
+        def buy(buyer):
+            ticket = enqueue_checkout(buyer, details(buyer))
+            while get_ticket(ticket, buyer)['status'] == 'queued':
+                time.sleep(0.005)
+
+        try:
+            return self.burst(buyers, buy)
+        finally:
+            done.set()
+            for worker in workers:
+                worker.join()
+
+    def report(self, name, timings, sold, peak):
+        timings.sort()
+        self.stdout.write(
+            f'{name:<7} sold {sold:4d}   p50 {percentile(timings, 0.5):8.1f} ms   '
+            f'p99 {percentile(timings, 0.99):8.1f} ms   max lock waiters {peak}'
+        )
+
+
+class LockMonitor(threading.Thread):
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.peak = 0
+        self.done = threading.Event()
+
+    def run(self):
+        if connection.vendor != 'postgresql':
+            return
+        try:
+            with connection.cursor() as cursor:
+                while not self.done.is_set():
+                    cursor.execute(
+                        "SELECT count(*) FROM pg_stat_activity "
+                        "WHERE datname = current_database() AND wait_event_type = 'Lock'"
+                    )
+                    self.peak = max(self.peak, cursor.fetchone()[0])
+                    time.sleep(0.01)
+        finally:
+            connection.close()
+
+    def stop(self):
+        self.done.set()
+        self.join()
+
+
+def details(buyer):
+    return {'first_name': buyer.first_name, 'last_name': buyer.last_name, 'email': buyer.email}
+
+
+def percentile(timings, fraction):
+    return timings[min(int(len(timings) * fraction), len(timings) - 1)]
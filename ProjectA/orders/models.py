@@ -1,8 +1,23 @@
 from django.db import models
 from django.conf import settings
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
 from main.models import Product, ProductSize
 
 
+class OrderQuerySet(models.QuerySet):
+
+    def history(self, user):
+        return (
+            self.filter(user=user)
+            .annotate(items_count=Count('items'), items_quantity=Coalesce(Sum('items__quantity'), 0))
+            .order_by('-created_at', '-id')
+        )
+
+    def before(self, created_at, pk):
+        return self.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+
+
 class Order(models.Model):
     STATUS_CHOICES = (
         ('pending', 'Pending'),
@@ -58,10 +73,15 @@ class Order(models.Model):
     created_at = models.DateTimeField('Created_at', auto_now_add=True)
     updated_at = models.DateTimeField('Updated_at', auto_now=True)
 
+    objects = OrderQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'Order'
         verbose_name_plural = 'Orders'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='order_user_history_idx'),
+        ]
 
     def __str__(self):
         return f"Order #{self.id} - {self.email}"
@@ -101,4 +121,37 @@ class OrderItem(models.Model):
         return f"{self.product.name} - {size_name} ({self.quantity})"
 
     def get_total_price(self):
-        return self.price * self.quantity
\ No newline at end of file
+        return self.price * self.quantity
+
+
+class StockReservation(models.Model):
+    cart = models.ForeignKey(
+        'cart.Cart',
+        on_delete=models.CASCADE,
+        related_name='reservations',
+        verbose_name='Cart'
+    )
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='reservations',
+        verbose_name='Product'
+    )
+    size = models.ForeignKey(
+        ProductSize,
+        on_delete=models.CASCADE,
+        related_name='reservations',
+        verbose_name='Size',
+        null=True,
+        blank=True
+    )
+    quantity = models.PositiveIntegerField('Quantity')
+    expires_at = models.DateTimeField('Expires at', db_index=True)
+    created_at = models.DateTimeField('Created_at', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Stock reservation'
+        verbose_name_plural = 'Stock reservations'
+
+    def __str__(self):
+        return f"{self.product} x {self.quantity} until {self.expires_at:%H:%M:%S}"
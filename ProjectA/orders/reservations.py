@@ -0,0 +1,118 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Sum
+from django.db.models.lookups import GreaterThan
+from django.utils import timezone
+
+from cart.models import Cart
+from main.models import Product, ProductSize
+from .models import StockReservation
+from .services import (
+    EmptyCart, InsufficientStock, demand, find_shortages, item_lines, lock_stock, quantity_case,
+    reservation_lines,
+)
+
+
+def adjust_reserved(sizes, totals):
+    if sizes:
+        ProductSize.objects.filter(pk__in=sizes).update(reserved=F('reserved') + quantity_case(sizes))
+    if totals:
+        reserved = F('reserved') + quantity_case(totals)
+        Product.objects.filter(pk__in=totals).update(
+            reserved=reserved,
+            is_in_stock=GreaterThan(F('stock'), reserved),
+        )
+
+
+def delta(new, old):
+    changes = Counter(new)
+    changes.subtract(old)
+    return {pk: quantity for pk, quantity in changes.items() if quantity}
+
+
+def held_sizes(cart):
+    if not isinstance(cart, Cart) or cart.pk is None:
+        return {}
+    return dict(
+        StockReservation.objects.filter(cart=cart, size__isnull=False)
+        .values('size').annotate(total=Sum('quantity')).values_list('size', 'total')
+    )
+
+
+def available_for(cart, product_size):
+    return product_size.available_stock + held_sizes(cart).get(product_size.pk, 0)
+
+
+def with_available_stock(cart, items):
+    held = held_sizes(cart) if any(item.product_size for item in items) else {}
+    for item in items:
+        if item.product_size:
+            item.available_stock = item.product_size.available_stock + held.get(item.product_size.pk, 0)
+    return items
+
+
+def reserve_cart(cart, ttl=None):
+    items = cart.get_items()
+    if not items:
+        raise EmptyCart('Кошик порожній')
+
+    ttl = ttl or settings.STOCK_RESERVATION['TTL']
+    expires_at = timezone.now() + timedelta(seconds=ttl)
+
+    with transaction.atomic():
+        reservations = list(StockReservation.objects.select_for_update().filter(cart=cart).order_by('pk'))
+        held = demand(reservation_lines(reservations))
+        requested = demand(item_lines(items))
+
+        shortages = find_shortages(items, requested, held, lock_stock(requested, held))
+        if shortages:
+            raise InsufficientStock(shortages)
+
+        adjust_reserved(delta(requested[0], held[0]), delta(requested[2], held[2]))
+        StockReservation.objects.filter(pk__in=[hold.pk for hold in reservations]).delete()
+        StockReservation.objects.bulk_create([
+            StockReservation(
+                cart=cart,
+                product=item.product,
+                size=item.product_size,
+                quantity=item.quantity,
+                expires_at=expires_at,
+            )
+            for item in items
+        ])
+    return expires_at
+
+
+def release_reservations(reservations):
+    held = demand(reservation_lines(reservations))
+    lock_stock(held, held)
+    adjust_reserved(delta({}, held[0]), delta({}, held[2]))
+    StockReservation.objects.filter(pk__in=[hold.pk for hold in reservations]).delete()
+
+
+def release_cart(cart):
+    with transaction.atomic():
+        reservations = list(StockReservation.objects.select_for_update().filter(cart=cart).order_by('pk'))
+        release_reservations(reservations)
+    return len(reservations)
+
+
+def release_expired(batch_size=None, now=None):
+    batch_size = batch_size or settings.STOCK_RESERVATION['BATCH_SIZE']
+    now = now or timezone.now()
+    released = 0
+    while True:
+        with transaction.atomic():
+            reservations = list(
+                StockReservation.objects
+                .select_for_update(skip_locked=True)
+                .filter(expires_at__lte=now)
+                .order_by('pk')[:batch_size]
+            )
+            release_reservations(reservations)
+        released += len(reservations)
+        if len(reservations) < batch_size:
+            return released
@@ -0,0 +1,163 @@
+from collections import Counter
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.db.models.lookups import GreaterThan
+
+from main.cache import invalidate_catalog
+from main.models import Product, ProductSize
+from main.stock import refresh_stock
+from .models import Order, OrderItem, StockReservation
+from .signals import order_placed
+
+
+class CheckoutError(Exception):
+    pass
+
+
+class EmptyCart(CheckoutError):
+    pass
+
+
+class InsufficientStock(CheckoutError):
+
+    def __init__(self, shortages):
+        self.shortages = shortages
+        super().__init__('Недостатньо товару на складі')
+
+
+def quantity_case(quantities):
+    return Case(
+        *[When(pk=pk, then=Value(quantity)) for pk, quantity in quantities.items()],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def demand(lines):
+    sizes, products, totals = Counter(), Counter(), Counter()
+    for product_id, size_id, quantity in lines:
+        if size_id:
+            sizes[size_id] += quantity
+        else:
+            products[product_id] += quantity
+        totals[product_id] += quantity
+    return sizes, products, totals
+
+
+def item_lines(items):
+    return [
+        (item.product.pk, item.product_size.pk if item.product_size else None, item.quantity)
+        for item in items
+    ]
+
+
+def reservation_lines(reservations):
+    return [(hold.product_id, hold.size_id, hold.quantity) for hold in reservations]
+
+
+def locked_stock(model, pks):
+    if not pks:
+        return {}
+    return {
+        pk: stock - reserved
+        for pk, stock, reserved in (
+            model.objects
+            .select_for_update()
+            .filter(pk__in=pks)
+            .order_by('pk')
+            .values_list('pk', 'stock', 'reserved')
+        )
+    }
+
+
+def lock_stock(requested, held):
+    return (
+        locked_stock(ProductSize, {*requested[0], *held[0]}),
+        locked_stock(Product, {*requested[2], *held[2]}),
+    )
+
+
+def find_shortages(items, requested, held, available):
+    shortages = []
+    for item in items:
+        if item.product_size:
+            pk, kind = item.product_size.pk, 0
+        else:
+            pk, kind = item.product.pk, 1
+        free = available[kind].get(pk, 0) + held[kind][pk]
+        if requested[kind][pk] > free:
+            shortages.append({
+                'product_id': item.product.pk,
+                'product_size_id': item.product_size.pk if item.product_size else None,
+                'name': item.product.name,
+                'requested': requested[kind][pk],
+                'available': free,
+            })
+    return shortages
+
+
+def consume_stock(items, held):
+    sizes, products, totals = demand(item_lines(items))
+    sized_products = {item.product.pk for item in items if item.product_size}
+
+    if sizes or held[0]:
+        ProductSize.objects.filter(pk__in={*sizes, *held[0]}).update(
+            stock=F('stock') - quantity_case(sizes),
+            reserved=F('reserved') - quantity_case(held[0]),
+        )
+    if held[2]:
+        reserved = F('reserved') - quantity_case(held[2])
+        Product.objects.filter(pk__in=held[2]).update(
+            reserved=reserved,
+            is_in_stock=GreaterThan(F('stock'), reserved),
+        )
+    if sized_products:
+        refresh_stock(Product.objects.filter(pk__in=sized_products))
+    if products:
+        remaining = F('stock') - quantity_case(products)
+        Product.objects.filter(pk__in=products).update(
+            stock=remaining,
+            is_in_stock=GreaterThan(remaining, F('reserved')),
+        )
+    invalidate_catalog()
+
+
+def place_order(cart, user, **details):
+    items = cart.get_items()
+    if not items:
+        raise EmptyCart('Кошик порожній')
+
+    with transaction.atomic():
+        reservations = list(StockReservation.objects.select_for_update().filter(cart=cart).order_by('pk'))
+        held = demand(reservation_lines(reservations))
+        requested = demand(item_lines(items))
+
+        shortages = find_shortages(items, requested, held, lock_stock(requested, held))
+        if shortages:
+            raise InsufficientStock(shortages)
+
+        consume_stock(items, held)
+        if reservations:
+            StockReservation.objects.filter(pk__in=[hold.pk for hold in reservations]).delete()
+
+        order = Order.objects.create(
+            user=user,
+            total_price=sum((item.total_price for item in items), Decimal('0.00')),
+            **details,
+        )
+        order_items = OrderItem.objects.bulk_create([
+            OrderItem(
+                order=order,
+                product=item.product,
+                size=item.product_size,
+                quantity=item.quantity,
+                price=item.product.price or Decimal('0.00'),
+            )
+            for item in items
+        ])
+        order_placed.send(sender=Order, order=order, items=order_items)
+        cart.clear()
+
+    return order
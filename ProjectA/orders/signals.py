@@ -0,0 +1,4 @@
+from django.dispatch import Signal
+
+
+order_placed = Signal()
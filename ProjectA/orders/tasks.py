@@ -0,0 +1,14 @@
+from celery import shared_task
+
+from .flash_sale import process_queue
+from .reservations import release_expired
+
+
+@shared_task
+def release_expired_reservations():
+    return release_expired()
+
+
+@shared_task
+def process_flash_sale_queue():
+    return process_queue()
@@ -1,10 +1,11 @@
 from django.urls import path
-from .views import CheckoutView, OrderHistoryView, OrderDetailView
+from .views import CheckoutView, FlashSaleTicketView, OrderHistoryView, OrderDetailView
 
 app_name = 'orders'
 
 urlpatterns = [
     path('checkout/', CheckoutView.as_view(), name='checkout'),
+    path('tickets/<str:ticket>/', FlashSaleTicketView.as_view(), name='ticket'),
     path('history/', OrderHistoryView.as_view(), name='history'),
     path('<int:order_id>/', OrderDetailView.as_view(), name='detail'),
 ]
\ No newline at end of file
@@ -2,16 +2,20 @@ from django.shortcuts import render, redirect
 from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.utils.decorators import method_decorator
-from django.http import HttpResponse, JsonResponse
+from django.db import transaction
+from django.http import Http404, HttpResponse, JsonResponse
 from django.template.response import TemplateResponse
 from django.views.generic import View
+from .flash_sale import enqueue_checkout, get_ticket, process_queue, queue_is_shared, requires_queue
 from .forms import OrderForm
-from .models import Order, OrderItem
+from .models import Order
+from .history import history_page
+from .reservations import reserve_cart
+from .services import CheckoutError, InsufficientStock, place_order
+from .tasks import process_flash_sale_queue
 from cart.views import CartMixin
-from cart.models import Cart
 from main.models import ProductSize
 from django.shortcuts import get_object_or_404
-from decimal import Decimal
 
 
 @method_decorator(login_required(login_url='/users/login'), name='dispatch')
@@ -27,11 +31,19 @@ class CheckoutView(CartMixin, View):
         total_price = cart.subtotal
 
         form = OrderForm(user=request.user)
+        reserved_until = None
+        try:
+            reserved_until = reserve_cart(cart)
+        except InsufficientStock as e:
+            for shortage in e.shortages:
+                form.add_error(None, f"{shortage['name']}: доступно лише {shortage['available']} шт.")
+
         context = {
             'form': form,
             'cart': cart,
-            'cart_items': cart.items.select_related('product', 'product_size__size').order_by('added_at'),
+            'cart_items': cart.get_items(),
             'total_price': total_price,
+            'reserved_until': reserved_until,
         }
 
         if request.headers.get('HX-Request'):
@@ -54,48 +66,50 @@ class CheckoutView(CartMixin, View):
         form = OrderForm(form_data, user=request.user)
 
         if form.is_valid():
-            order = Order.objects.create(
-                user=request.user,
-                first_name=form.cleaned_data['first_name'],
-                last_name=form.cleaned_data['last_name'],
-                email=form.cleaned_data['email'],
-                company=form.cleaned_data.get('company', ''),
-                address1=form.cleaned_data.get('address1', ''),
-                address2=form.cleaned_data.get('address2', ''),
-                city=form.cleaned_data.get('city', ''),
-                country=form.cleaned_data.get('country', ''),
-                state=form.cleaned_data.get('state', ''),
-                postal_code=form.cleaned_data.get('postal_code', ''),
-                phone_number=form.cleaned_data.get('phone_number', ''),
-                special_instructions='',
-                total_price=total_price,
-                payment_provider=payment_provider,
-            )
-
-            for item in cart.items.select_related('product', 'product_size__size'):
-                OrderItem.objects.create(
-                    order=order,
-                    product=item.product,
-                    size=item.product_size,
-                    quantity=item.quantity,
-                    price=item.product.price or Decimal('0.00')
-                )
-
-            cart.items.all().delete()
-
-            context = {
-                'order': order,
-                'message': 'Замовлення успішно створено!'
+            details = {
+                'first_name': form.cleaned_data['first_name'],
+                'last_name': form.cleaned_data['last_name'],
+                'email': form.cleaned_data['email'],
+                'company': form.cleaned_data.get('company', ''),
+                'address1': form.cleaned_data.get('address1', ''),
+                'address2': form.cleaned_data.get('address2', ''),
+                'city': form.cleaned_data.get('city', ''),
+                'country': form.cleaned_data.get('country', ''),
+                'state': form.cleaned_data.get('state', ''),
+                'postal_code': form.cleaned_data.get('postal_code', ''),
+                'phone_number': form.cleaned_data.get('phone_number', ''),
+                'special_instructions': '',
+                'payment_provider': payment_provider,
             }
 
-            if request.headers.get('HX-Request'):
-                return TemplateResponse(request, 'orders/order_success.html', context)
-            return render(request, 'orders/order_success.html', context)
+            if requires_queue(cart):
+                ticket = enqueue_checkout(request.user, details)
+                transaction.on_commit(process_flash_sale_queue.delay if queue_is_shared() else process_queue)
+                return TemplateResponse(request, 'orders/flash_sale_ticket.html', {
+                    'ticket': get_ticket(ticket, request.user),
+                })
+
+            try:
+                order = place_order(cart, request.user, **details)
+            except InsufficientStock as e:
+                for shortage in e.shortages:
+                    form.add_error(None, f"{shortage['name']}: доступно лише {shortage['available']} шт.")
+            except CheckoutError as e:
+                form.add_error(None, str(e))
+            else:
+                context = {
+                    'order': order,
+                    'message': 'Замовлення успішно створено!'
+                }
+
+                if request.headers.get('HX-Request'):
+                    return TemplateResponse(request, 'orders/order_success.html', context)
+                return render(request, 'orders/order_success.html', context)
 
         context = {
             'form': form,
             'cart': cart,
-            'cart_items': cart.items.select_related('product', 'product_size__size').order_by('added_at'),
+            'cart_items': cart.get_items(),
             'total_price': total_price,
             'errors': form.errors,
         }
@@ -104,14 +118,28 @@ class CheckoutView(CartMixin, View):
         return render(request, 'orders/checkout.html', context)
 
 
+@method_decorator(login_required(login_url='/users/login'), name='dispatch')
+class FlashSaleTicketView(View):
+
+    def get(self, request, ticket):
+        data = get_ticket(ticket, request.user)
+        if data is None:
+            raise Http404('Квиток не знайдено')
+        return TemplateResponse(request, 'orders/flash_sale_ticket.html', {'ticket': data})
+
+
 @method_decorator(login_required(login_url='/users/login'), name='dispatch')
 class OrderHistoryView(View):
 
     def get(self, request):
-        orders = Order.objects.filter(user=request.user).order_by('-created_at')
+        try:
+            orders, next_cursor = history_page(request.user, request.GET.get('cursor'))
+        except ValueError:
+            orders, next_cursor = history_page(request.user)
 
         context = {
             'orders': orders,
+            'next_cursor': next_cursor,
         }
 
         if request.headers.get('HX-Request'):
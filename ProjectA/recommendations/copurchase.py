@@ -0,0 +1,78 @@
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from orders.models import Order, OrderItem
+from .models import ProductCoPurchase, RecommendationCursor
+
+
+CURSOR_NAME = 'copurchase'
+
+
+def count_pairs(items):
+    orders = defaultdict(list)
+    for order_id, product_id in items:
+        orders[order_id].append(product_id)
+
+    pairs = Counter()
+    for product_ids in orders.values():
+        for product_id in set(product_ids):
+            for other_id in product_ids:
+                if other_id != product_id:
+                    pairs[product_id, other_id] += 1
+    return pairs
+
+
+def apply_pairs(pairs, chunk_size=1000):
+    table = connection.ops.quote_name(ProductCoPurchase._meta.db_table)
+    rows = [(product_id, other_id, count) for (product_id, other_id), count in pairs.items()]
+
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            cursor.execute(
+                f'INSERT INTO {table} (product_id, other_product_id, count) '
+                f'VALUES {", ".join(["(%s, %s, %s)"] * len(chunk))} '
+                'ON CONFLICT (product_id, other_product_id) '
+                f'DO UPDATE SET count = {table}.count + EXCLUDED.count',
+                [value for row in chunk for value in row],
+            )
+
+
+def build_copurchase(batch_size=2000, settle_seconds=60):
+    processed = 0
+
+    with transaction.atomic():
+        cursor, _ = RecommendationCursor.objects.select_for_update().get_or_create(name=CURSOR_NAME)
+
+        upper = Order.objects.filter(
+            id__gt=cursor.position,
+            created_at__lte=timezone.now() - timedelta(seconds=settle_seconds),
+        ).aggregate(upper=Max('id'))['upper']
+
+        while upper and cursor.position < upper:
+            order_ids = list(
+                Order.objects
+                .filter(id__gt=cursor.position, id__lte=upper)
+                .order_by('id')
+                .values_list('id', flat=True)[:batch_size]
+            )
+            items = OrderItem.objects.filter(order_id__in=order_ids).values_list('order_id', 'product_id')
+            apply_pairs(count_pairs(items))
+
+            cursor.position = order_ids[-1]
+            processed += len(order_ids)
+
+        cursor.save(update_fields=['position', 'updated_at'])
+
+    return processed
+
+
+def rebuild_copurchase(**kwargs):
+    with transaction.atomic():
+        ProductCoPurchase.objects.all().delete()
+        RecommendationCursor.objects.filter(name=CURSOR_NAME).update(position=0)
+        return build_copurchase(**kwargs)
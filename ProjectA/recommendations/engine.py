@@ -1,4 +1,4 @@
-from django.db.models import Count, Avg, Q, F
+from django.db.models import Count, Avg, Q, F, Sum
 from django.db.models.functions import Coalesce
 from decimal import Decimal
 import random
@@ -6,12 +6,24 @@ import random
 
 class RecommendationEngine:
 
-    def __init__(self, product_model, order_item_model, review_model=None):
+    def __init__(self, product_model, order_item_model, review_model=None, copurchase_model=None,
+                 score_model=None, similarity_index=None):
         self.Product = product_model
         self.OrderItem = order_item_model
         self.Review = review_model
+        self.CoPurchase = copurchase_model
+        self.Score = score_model
+        self.similarity_index = similarity_index
+
+    def _scored_products(self):
+        return self.Product.objects.filter(score__isnull=False)
 
     def get_similar_products(self, product, limit=8):
+        if self.similarity_index:
+            product_ids = self.similarity_index.similar(product, limit)
+            products = self.Product.objects.in_bulk(product_ids)
+            return [products[pk] for pk in product_ids if pk in products]
+
         price_range = Decimal('0.3')
         min_price = product.price * (1 - price_range)
         max_price = product.price * (1 + price_range)
@@ -43,6 +55,11 @@ class RecommendationEngine:
         return results
 
     def get_also_bought(self, product, limit=6):
+        if self.CoPurchase:
+            return self.Product.objects.filter(
+                copurchased_with__product=product
+            ).order_by('-copurchased_with__count')[:limit]
+
         orders_with_product = self.OrderItem.objects.filter(
             product=product
         ).values_list('order_id', flat=True)
@@ -68,6 +85,9 @@ class RecommendationEngine:
 
 
     def get_trending(self, days=7, limit=12):
+        if self.Score and days == 7:
+            return self._scored_products().order_by('-score__trend_score')[:limit]
+
         from django.utils import timezone
         from datetime import timedelta
         from django.db.models import Value, IntegerField
@@ -91,6 +111,9 @@ class RecommendationEngine:
         return trending
 
     def get_bestsellers(self, limit=12):
+        if self.Score:
+            return self._scored_products().order_by('-score__total_sales')[:limit]
+
         return self.Product.objects.annotate(
             total_sales=Count('orderitem')
         ).order_by('-total_sales')[:limit]
@@ -99,6 +122,11 @@ class RecommendationEngine:
         if not self.Review:
             return self.Product.objects.none()
 
+        if self.Score:
+            return self._scored_products().filter(
+                score__reviews_count__gte=min_reviews
+            ).order_by('-score__avg_rating', '-score__reviews_count')[:limit]
+
         return self.Product.objects.annotate(
             avg_rating=Avg('reviews__rating'),
             review_count=Count('reviews')
@@ -111,23 +139,21 @@ class RecommendationEngine:
         if not user or not user.is_authenticated:
             return self.get_trending(limit=limit)
 
-        purchased_categories = self.OrderItem.objects.filter(
+        purchased = list(self.OrderItem.objects.filter(
             order__user=user
-        ).values_list('product__category_id', flat=True).distinct()
+        ).values_list('product_id', 'product__category_id', 'product__price'))
 
-        from django.db.models import Avg as DjangoAvg
-        avg_price = self.OrderItem.objects.filter(
-            order__user=user
-        ).aggregate(avg=DjangoAvg('product__price'))['avg'] or Decimal('500')
+        purchased_products = {product_id for product_id, _, _ in purchased}
+        purchased_categories = {category_id for _, category_id, _ in purchased}
+        if purchased:
+            avg_price = sum(price for _, _, price in purchased) / len(purchased)
+        else:
+            avg_price = Decimal('500')
 
         price_range = Decimal('0.5')
         min_price = avg_price * (1 - price_range)
         max_price = avg_price * (1 + price_range)
 
-        purchased_products = self.OrderItem.objects.filter(
-            order__user=user
-        ).values_list('product_id', flat=True)
-
         recommendations = self.Product.objects.filter(
             category_id__in=purchased_categories,
             price__gte=min_price,
@@ -136,7 +162,11 @@ class RecommendationEngine:
             id__in=purchased_products
         )
 
-        if self.Review:
+        if self.Review and self.Score:
+            recommendations = recommendations.order_by(
+                F('score__avg_rating').desc(nulls_last=True), '-views_count'
+            )
+        elif self.Review:
             recommendations = recommendations.annotate(
                 avg_rating=Coalesce(Avg('reviews__rating'), Decimal('0'))
             ).order_by('-avg_rating', '-views_count')
@@ -146,9 +176,10 @@ class RecommendationEngine:
         results = list(recommendations[:limit])
 
         if len(results) < limit:
-            trending = self.get_trending(limit=limit - len(results))
-            for p in trending:
-                if p not in results and p.id not in purchased_products:
+            seen = purchased_products | {p.id for p in results}
+            for p in self.get_trending(limit=limit - len(results)):
+                if p.id not in seen:
+                    seen.add(p.id)
                     results.append(p)
 
         return results
@@ -161,6 +192,24 @@ class RecommendationEngine:
         cart_categories = [p.category_id for p in cart_products]
         cart_ids = [p.id for p in cart_products]
 
+        if self.CoPurchase:
+            cross_sell = self.Product.objects.filter(
+                copurchased_with__product_id__in=cart_ids
+            ).exclude(
+                id__in=cart_ids
+            ).exclude(
+                category_id__in=cart_categories
+            ).annotate(
+                copurchase_count=Sum('copurchased_with__count')
+            ).order_by('-copurchase_count')[:limit]
+
+            if cross_sell:
+                return cross_sell
+
+            return self.Product.objects.exclude(
+                category_id__in=cart_categories
+            ).order_by('-views_count')[:limit]
+
         cross_sell = self.OrderItem.objects.filter(
             order__items__product_id__in=cart_ids
         ).exclude(
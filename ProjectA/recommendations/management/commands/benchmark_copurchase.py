@@ -0,0 +1,123 @@
+import itertools
+import random
+import statistics
+import time
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from main.models import Category, Product
+from orders.models import Order, OrderItem
+from recommendations.copurchase import rebuild_copurchase
+from recommendations.engine import RecommendationEngine
+from recommendations.models import ProductCoPurchase
+
+
+class Command(BaseCommand):
+    help = 'Compare also-bought and cross-sell latency on a synthetic order history (rolled back afterwards)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=1_000_000)
+        parser.add_argument('--products', type=int, default=5000)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--samples', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+
+        with transaction.atomic():
+            products = self.seed(rng, options)
+
+            started = time.perf_counter()
+            rebuild_copurchase(batch_size=5000, settle_seconds=0)
+            self.stdout.write(f'Co-purchase table built in {time.perf_counter() - started:.1f}s '
+                              f'({ProductCoPurchase.objects.count()} pairs)')
+
+            self.analyze()
+
+            old = RecommendationEngine(Product, OrderItem)
+            new = RecommendationEngine(Product, OrderItem, copurchase_model=ProductCoPurchase)
+            samples = rng.sample(products, options['samples'])
+            carts = [rng.sample(products, 3) for _ in range(options['samples'])]
+
+            self.report('get_also_bought', [
+                ('self-join', lambda product: list(old.get_also_bought(product))),
+                ('lookup', lambda product: list(new.get_also_bought(product))),
+            ], samples)
+            self.report('get_cross_sell', [
+                ('self-join', lambda cart: list(old.get_cross_sell(cart))),
+                ('lookup', lambda cart: list(new.get_cross_sell(cart))),
+            ], carts)
+
+            transaction.set_rollback(True)
+
+    def seed(self, rng, options):
+        self.stdout.write(f"Generating {options['items']} order items...")
+        seller = get_user_model().objects.create_user(
+            email='copurchase-benchmark@example.com',
+            first_name='Benchmark',
+            last_name='Seller',
+        )
+        categories = Category.objects.bulk_create([
+            Category(name=f'Benchmark {i}', slug=f'benchmark-{i}')
+            for i in range(options['categories'])
+        ])
+        products = Product.objects.bulk_create([
+            Product(
+                name=f'Benchmark product {i}',
+                slug=f'benchmark-product-{i}',
+                seller=seller,
+                category=rng.choice(categories),
+                price=Decimal(rng.randint(100, 10000)),
+                description='Benchmark',
+            )
+            for i in range(options['products'])
+        ], batch_size=2000)
+
+        cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(products))))
+        remaining = options['items']
+        while remaining > 0:
+            orders = Order.objects.bulk_create([
+                Order(
+                    user=seller,
+                    first_name='Bench',
+                    last_name='Mark',
+                    email=seller.email,
+                    total_price=Decimal('0'),
+                )
+                for _ in range(5000)
+            ])
+            items = []
+            for order in orders:
+                size = min(rng.randint(1, 7), remaining - len(items))
+                if size <= 0:
+                    break
+                for product in rng.choices(products, cum_weights=cum_weights, k=size):
+                    items.append(OrderItem(order=order, product=product, quantity=1, price=product.price))
+            OrderItem.objects.bulk_create(items, batch_size=5000)
+            remaining -= len(items)
+        return products
+
+    def analyze(self):
+        if connection.vendor != 'postgresql':
+            return
+        with connection.cursor() as cursor:
+            for model in (Product, Order, OrderItem, ProductCoPurchase):
+                cursor.execute(f'ANALYZE {connection.ops.quote_name(model._meta.db_table)}')
+
+    def report(self, title, paths, samples):
+        self.stdout.write(title)
+        for name, call in paths:
+            timings = []
+            for sample in samples:
+                started = time.perf_counter()
+                call(sample)
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            self.stdout.write(
+                f'  {name:<10} median {statistics.median(timings):8.2f} ms   '
+                f'p95 {timings[int(len(timings) * 0.95) - 1]:8.2f} ms'
+            )
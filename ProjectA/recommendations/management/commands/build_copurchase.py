@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from recommendations.copurchase import build_copurchase, rebuild_copurchase
+
+
+class Command(BaseCommand):
+    help = 'Add orders placed since the last run to the co-purchase table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true', help='Drop the table and process all orders again')
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--settle-seconds', type=int, default=60)
+
+    def handle(self, *args, **options):
+        build = rebuild_copurchase if options['rebuild'] else build_copurchase
+        processed = build(batch_size=options['batch_size'], settle_seconds=options['settle_seconds'])
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} orders'))
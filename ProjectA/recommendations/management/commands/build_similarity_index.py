@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from recommendations.similarity import get_similarity_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the product similarity index and save it to disk for warm worker starts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default=settings.SIMILARITY_INDEX_PATH)
+
+    def handle(self, *args, **options):
+        index = get_similarity_index()
+        index.rebuild()
+        index.save(options['path'])
+        products = sum(len(category) for category in index.categories.values())
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {products} products in {len(index.categories)} categories to {options['path']}"
+        ))
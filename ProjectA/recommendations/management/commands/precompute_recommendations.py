@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from recommendations.user_cache import active_users, get_user_recommendation_cache
+from recommendations.views import get_engine
+
+
+class Command(BaseCommand):
+    help = 'Precompute cached personal recommendations for recently active users'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.RECOMMENDATION_CACHE['ACTIVE_DAYS'])
+        parser.add_argument('--batch-size', type=int, default=200)
+
+    def handle(self, *args, **options):
+        engine = get_engine()
+        recommendation_cache = get_user_recommendation_cache()
+
+        total = 0
+        batch = []
+        for user in active_users(options['days']).iterator(chunk_size=options['batch_size']):
+            batch.append(user)
+            if len(batch) == options['batch_size']:
+                total += recommendation_cache.precompute(engine, batch)
+                batch = []
+        if batch:
+            total += recommendation_cache.precompute(engine, batch)
+
+        self.stdout.write(self.style.SUCCESS(f'Precomputed recommendations for {total} users'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from recommendations.scores import refresh_scores
+
+
+class Command(BaseCommand):
+    help = 'Decay sales windows and recompute trend scores for all products'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true', help='Also recompute total sales and ratings')
+
+    def handle(self, *args, **options):
+        refresh_scores(rebuild=options['rebuild'])
+        self.stdout.write(self.style.SUCCESS('Product scores refreshed'))
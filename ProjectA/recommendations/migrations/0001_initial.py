@@ -0,0 +1,44 @@
+# Generated by Django 5.2.9 on 2026-10-18 02:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('main', '0010_product_is_in_stock'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecommendationCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True, verbose_name='Name')),
+                ('position', models.BigIntegerField(default=0, verbose_name='Last processed ID')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated')),
+            ],
+            options={
+                'verbose_name': 'Recommendation cursor',
+                'verbose_name_plural': 'Recommendation cursors',
+            },
+        ),
+        migrations.CreateModel(
+            name='ProductCoPurchase',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Times bought together')),
+                ('other_product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='copurchased_with', to='main.product', verbose_name='Bought together with')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='copurchases', to='main.product', verbose_name='Product')),
+            ],
+            options={
+                'verbose_name': 'Co-purchase',
+                'verbose_name_plural': 'Co-purchases',
+                'indexes': [models.Index(fields=['product', '-count'], name='recommendat_product_9fcff6_idx')],
+                'constraints': [models.UniqueConstraint(fields=('product', 'other_product'), name='unique_copurchase_pair')],
+            },
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 5.2.9 on 2026-10-18 03:13
+
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Avg, Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+def backfill_scores(apps, schema_editor):
+    Product = apps.get_model('main', 'Product')
+    OrderItem = apps.get_model('orders', 'OrderItem')
+    Review = apps.get_model('reviews', 'Review')
+    ProductScore = apps.get_model('recommendations', 'ProductScore')
+
+    def per_product(queryset, aggregate):
+        return Coalesce(
+            Subquery(
+                queryset
+                .filter(product_id=OuterRef('product_id'))
+                .values('product_id')
+                .annotate(value=aggregate)
+                .values('value')
+            ),
+            0,
+        )
+
+    now = timezone.now()
+    ProductScore.objects.bulk_create(
+        [ProductScore(product_id=pk) for pk in Product.objects.values_list('pk', flat=True).iterator()],
+        batch_size=1000,
+    )
+    ProductScore.objects.update(
+        sales_7d=per_product(OrderItem.objects.filter(order__created_at__gte=now - timedelta(days=7)), Count('id')),
+        sales_30d=per_product(OrderItem.objects.filter(order__created_at__gte=now - timedelta(days=30)), Count('id')),
+        total_sales=per_product(OrderItem.objects, Count('id')),
+        avg_rating=per_product(Review.objects, Avg('rating')),
+        reviews_count=per_product(Review.objects, Count('id')),
+    )
+    ProductScore.objects.update(
+        trend_score=F('sales_7d') * 3 + Subquery(
+            Product.objects.filter(pk=OuterRef('product_id')).values('views_count')
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0010_product_is_in_stock'),
+        ('orders', '0003_alter_order_options_alter_orderitem_options_and_more'),
+        ('reviews', '0002_alter_review_options_alter_reviewhelpful_options_and_more'),
+        ('recommendations', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductScore',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='score', serialize=False, to='main.product', verbose_name='Product')),
+                ('sales_7d', models.PositiveIntegerField(default=0, verbose_name='Sales in 7 days')),
+                ('sales_30d', models.PositiveIntegerField(default=0, verbose_name='Sales in 30 days')),
+                ('total_sales', models.PositiveIntegerField(default=0, verbose_name='Total sales')),
+                ('avg_rating', models.DecimalField(decimal_places=2, default=0, max_digits=3, verbose_name='Average rating')),
+                ('reviews_count', models.PositiveIntegerField(default=0, verbose_name='Quantity of reviews')),
+                ('trend_score', models.PositiveIntegerField(default=0, verbose_name='Trend score')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated')),
+            ],
+            options={
+                'verbose_name': 'Product score',
+                'verbose_name_plural': 'Product scores',
+                'indexes': [models.Index(fields=['-trend_score'], name='recommendat_trend_s_eb9ff6_idx'), models.Index(fields=['-total_sales'], name='recommendat_total_s_dd3963_idx'), models.Index(fields=['-avg_rating', '-reviews_count'], name='recommendat_avg_rat_9e6031_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_scores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,74 @@
+from django.db import models
+
+
+class ProductCoPurchase(models.Model):
+    product = models.ForeignKey(
+        'main.Product',
+        on_delete=models.CASCADE,
+        related_name='copurchases',
+        verbose_name='Product'
+    )
+    other_product = models.ForeignKey(
+        'main.Product',
+        on_delete=models.CASCADE,
+        related_name='copurchased_with',
+        verbose_name='Bought together with'
+    )
+    count = models.PositiveIntegerField(default=0, verbose_name='Times bought together')
+
+    class Meta:
+        verbose_name = 'Co-purchase'
+        verbose_name_plural = 'Co-purchases'
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'other_product'], name='unique_copurchase_pair'),
+        ]
+        indexes = [
+            models.Index(fields=['product', '-count']),
+        ]
+
+    def __str__(self):
+        return f'{self.product_id} -> {self.other_product_id} ({self.count})'
+
+
+class RecommendationCursor(models.Model):
+    name = models.CharField(max_length=50, unique=True, verbose_name='Name')
+    position = models.BigIntegerField(default=0, verbose_name='Last processed ID')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Updated')
+
+    class Meta:
+        verbose_name = 'Recommendation cursor'
+        verbose_name_plural = 'Recommendation cursors'
+
+    def __str__(self):
+        return f'{self.name}: {self.position}'
+
+
+class ProductScore(models.Model):
+    product = models.OneToOneField(
+        'main.Product',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='score',
+        verbose_name='Product'
+    )
+    sales_7d = models.PositiveIntegerField(default=0, verbose_name='Sales in 7 days')
+    sales_30d = models.PositiveIntegerField(default=0, verbose_name='Sales in 30 days')
+    total_sales = models.PositiveIntegerField(default=0, verbose_name='Total sales')
+    avg_rating = models.DecimalField(max_digits=3, decimal_places=2, default=0, verbose_name='Average rating')
+    reviews_count = models.PositiveIntegerField(default=0, verbose_name='Quantity of reviews')
+    trend_score = models.PositiveIntegerField(default=0, verbose_name='Trend score')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Updated')
+
+    TREND_SALES_WEIGHT = 3
+
+    class Meta:
+        verbose_name = 'Product score'
+        verbose_name_plural = 'Product scores'
+        indexes = [
+            models.Index(fields=['-trend_score']),
+            models.Index(fields=['-total_sales']),
+            models.Index(fields=['-avg_rating', '-reviews_count']),
+        ]
+
+    def __str__(self):
+        return f'{self.product_id}: {self.trend_score}'
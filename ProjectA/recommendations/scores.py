@@ -0,0 +1,136 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Avg, Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from main.models import Product
+from orders.models import Order, OrderItem
+from orders.signals import order_placed
+from reviews.models import Review
+from .models import ProductScore
+
+
+SALES_WEIGHT = ProductScore.TREND_SALES_WEIGHT
+
+
+def ensure_scores():
+    missing = Product.objects.filter(score__isnull=True).values_list('pk', flat=True)
+    return len(ProductScore.objects.bulk_create(
+        [ProductScore(product_id=pk) for pk in missing.iterator()],
+        batch_size=1000,
+        ignore_conflicts=True,
+    ))
+
+
+def record_sales(product_counts):
+    product_counts = Counter(product_counts)
+    if not product_counts:
+        return
+
+    ProductScore.objects.bulk_create(
+        [ProductScore(product_id=pk) for pk in product_counts],
+        ignore_conflicts=True,
+    )
+    for product_id, count in sorted(product_counts.items()):
+        ProductScore.objects.filter(product_id=product_id).update(
+            sales_7d=F('sales_7d') + count,
+            sales_30d=F('sales_30d') + count,
+            total_sales=F('total_sales') + count,
+            trend_score=F('trend_score') + count * SALES_WEIGHT,
+        )
+
+
+def refresh_rating(product_id):
+    stats = Review.objects.filter(product_id=product_id).aggregate(
+        avg_rating=Avg('rating'),
+        reviews_count=Count('id'),
+    )
+    ProductScore.objects.filter(product_id=product_id).update(
+        avg_rating=stats['avg_rating'] or 0,
+        reviews_count=stats['reviews_count'],
+    )
+
+
+def _per_product(queryset, aggregate):
+    return Coalesce(
+        Subquery(
+            queryset
+            .filter(product_id=OuterRef('product_id'))
+            .values('product_id')
+            .annotate(value=aggregate)
+            .values('value')
+        ),
+        0,
+    )
+
+
+def refresh_scores(rebuild=False):
+    now = timezone.now()
+    week_ago = now - timedelta(days=7)
+
+    with transaction.atomic():
+        ensure_scores()
+
+        recent = (
+            OrderItem.objects
+            .filter(order__created_at__gte=now - timedelta(days=30))
+            .values('product_id')
+            .annotate(
+                sales_7d=Count('id', filter=Q(order__created_at__gte=week_ago)),
+                sales_30d=Count('id'),
+            )
+        )
+        recent = {row['product_id']: row for row in recent}
+
+        ProductScore.objects.filter(sales_30d__gt=0).exclude(product_id__in=recent).update(
+            sales_7d=0,
+            sales_30d=0,
+        )
+
+        scores = list(ProductScore.objects.filter(product_id__in=recent))
+        for score in scores:
+            score.sales_7d = recent[score.product_id]['sales_7d']
+            score.sales_30d = recent[score.product_id]['sales_30d']
+        ProductScore.objects.bulk_update(scores, ['sales_7d', 'sales_30d'], batch_size=1000)
+
+        if rebuild:
+            ProductScore.objects.update(
+                total_sales=_per_product(OrderItem.objects, Count('id')),
+                avg_rating=_per_product(Review.objects, Avg('rating')),
+                reviews_count=_per_product(Review.objects, Count('id')),
+            )
+
+        ProductScore.objects.update(
+            trend_score=F('sales_7d') * SALES_WEIGHT + Subquery(
+                Product.objects.filter(pk=OuterRef('product_id')).values('views_count')
+            ),
+        )
+
+
+@receiver(post_save, sender=Product)
+def create_product_score(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        ProductScore.objects.get_or_create(product=instance)
+
+
+@receiver(post_save, sender=OrderItem)
+def order_item_sold(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        record_sales({instance.product_id: 1})
+
+
+@receiver(order_placed, sender=Order)
+def order_items_sold(sender, items, **kwargs):
+    record_sales(Counter(item.product_id for item in items))
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def review_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        refresh_rating(instance.product_id)
@@ -0,0 +1,290 @@
+import os
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from main.models import Product
+
+
+VERSION_KEY = 'similarity:version:{}'
+
+COLUMNS = ('log_price', 'rating', 'log_views', 'log_sales')
+WEIGHTS = np.array([4.0, 0.5, 0.5, 1.0])
+COLOR_WEIGHT = 2.0
+
+
+def product_features(price, rating, views_count, total_sales):
+    return [
+        np.log1p(float(price)),
+        float(rating),
+        np.log1p(views_count),
+        np.log1p(total_sales or 0),
+    ]
+
+
+def normalize_color(color):
+    return (color or '').strip().lower()
+
+
+class CategoryIndex:
+
+    def __init__(self, ids=None, colors=None, features=None, version=0):
+        self._set(
+            np.asarray(ids if ids is not None else [], dtype=np.int64),
+            np.asarray(colors if colors is not None else [], dtype=object),
+            np.asarray(
+                features if features is not None else np.empty((0, len(COLUMNS))),
+                dtype=np.float64,
+            ).reshape(-1, len(COLUMNS)),
+        )
+        self.version = version
+
+    def _set(self, ids, colors, features):
+        for array in (ids, colors, features):
+            array.flags.writeable = False
+        positions = {int(pk): position for position, pk in enumerate(ids)}
+        self._data = (ids, colors, features, positions)
+
+    @property
+    def ids(self):
+        return self._data[0]
+
+    @property
+    def colors(self):
+        return self._data[1]
+
+    @property
+    def features(self):
+        return self._data[2]
+
+    @property
+    def positions(self):
+        return self._data[3]
+
+    @classmethod
+    def build(cls, category_id, version=0):
+        rows = list(
+            Product.objects
+            .filter(category_id=category_id)
+            .order_by('pk')
+            .values_list('pk', 'color', 'price', 'rating', 'views_count', 'score__total_sales')
+        )
+        return cls(
+            ids=[row[0] for row in rows],
+            colors=[normalize_color(row[1]) for row in rows],
+            features=[product_features(*row[2:]) for row in rows],
+            version=version,
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+    def upsert(self, product_id, color, features):
+        ids, colors, matrix, positions = self._data
+        position = positions.get(product_id)
+        if position is None:
+            self._set(
+                np.append(ids, product_id),
+                np.append(colors, np.array([color], dtype=object)),
+                np.vstack([matrix, features]),
+            )
+        else:
+            colors = colors.copy()
+            colors[position] = color
+            matrix = matrix.copy()
+            matrix[position] = features
+            self._set(ids, colors, matrix)
+
+    def remove(self, product_id):
+        ids, colors, features, positions = self._data
+        position = positions.get(product_id)
+        if position is None:
+            return
+        self._set(
+            np.delete(ids, position),
+            np.delete(colors, position),
+            np.delete(features, position, axis=0),
+        )
+
+    def nearest(self, product_id, limit):
+        ids, colors, features, positions = self._data
+        position = positions.get(product_id)
+        if position is None or len(ids) < 2:
+            return []
+
+        scale = features.std(axis=0)
+        scale[scale == 0] = 1
+        deltas = (features - features[position]) / scale
+        distances = (deltas ** 2) @ WEIGHTS
+        distances += COLOR_WEIGHT * (colors != colors[position])
+        distances[position] = np.inf
+
+        limit = min(limit, len(ids) - 1)
+        candidates = np.argpartition(distances, limit - 1)[:limit]
+        candidates = candidates[np.lexsort((ids[candidates], distances[candidates]))]
+        return [int(pk) for pk in ids[candidates]]
+
+
+class SimilarityIndex:
+
+    def __init__(self):
+        self.categories = {}
+        self.locations = {}
+        self._pending = Counter()
+        self._lock = threading.RLock()
+
+    def _version(self, category_id):
+        key = VERSION_KEY.format(category_id)
+        cache.add(key, time.time_ns(), timeout=None)
+        return cache.get(key)
+
+    def _bump_version(self, category_id):
+        key = VERSION_KEY.format(category_id)
+        self._version(category_id)
+        try:
+            return cache.incr(key)
+        except ValueError:
+            version = time.time_ns()
+            cache.set(key, version, timeout=None)
+            return version
+
+    def _publish(self, category_id):
+        version = self._bump_version(category_id)
+        with self._lock:
+            index = self.categories.get(category_id)
+            if self._pending[category_id] > 0:
+                self._pending[category_id] -= 1
+                if index is not None and index.version == version - 1:
+                    index.version = version
+
+    def _changed(self, category_id):
+        with self._lock:
+            self._pending[category_id] += 1
+        transaction.on_commit(lambda: self._publish(category_id))
+
+    def _set_category(self, category_id, index):
+        stale = [pk for pk, location in self.locations.items() if location == category_id]
+        for pk in stale:
+            del self.locations[pk]
+        for pk in index.ids:
+            self.locations[int(pk)] = category_id
+        self.categories[category_id] = index
+
+    def category(self, category_id):
+        version = self._version(category_id)
+        index = self.categories.get(category_id)
+        if index is None or index.version != version:
+            index = CategoryIndex.build(category_id, version)
+            with self._lock:
+                self._set_category(category_id, index)
+        return index
+
+    def rebuild(self):
+        category_ids = Product.objects.order_by().values_list('category_id', flat=True).distinct()
+        with self._lock:
+            self.categories = {}
+            self.locations = {}
+        for category_id in category_ids:
+            self.category(category_id)
+
+    def similar(self, product, limit=8):
+        return self.category(product.category_id).nearest(product.pk, limit)
+
+    def update_product(self, product):
+        total_sales = (
+            Product.objects
+            .filter(pk=product.pk)
+            .values_list('score__total_sales', flat=True)
+            .first()
+        )
+        features = product_features(product.price, product.rating, product.views_count, total_sales)
+
+        with self._lock:
+            previous = self.locations.get(product.pk)
+            if previous is not None and previous != product.category_id:
+                self._remove(product.pk)
+                self._changed(previous)
+
+            index = self.categories.get(product.category_id)
+            if index is not None:
+                index.upsert(product.pk, normalize_color(product.color), features)
+                self.locations[product.pk] = product.category_id
+        self._changed(product.category_id)
+
+    def remove_product(self, product_id, category_id):
+        with self._lock:
+            self._remove(product_id)
+        self._changed(category_id)
+
+    def _remove(self, product_id):
+        category_id = self.locations.pop(product_id, None)
+        if category_id is None:
+            return
+        self.categories[category_id].remove(product_id)
+
+    def save(self, path):
+        arrays = {}
+        for category_id, index in self.categories.items():
+            arrays[f'{category_id}_ids'] = index.ids
+            arrays[f'{category_id}_colors'] = index.colors.astype(str)
+            arrays[f'{category_id}_features'] = index.features
+            arrays[f'{category_id}_version'] = np.array(index.version)
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.tmp.npz'
+        np.savez_compressed(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+    def load(self, path):
+        with np.load(path) as data:
+            category_ids = {int(name.split('_')[0]) for name in data.files}
+            categories = {
+                category_id: CategoryIndex(
+                    ids=data[f'{category_id}_ids'],
+                    colors=data[f'{category_id}_colors'].astype(object),
+                    features=data[f'{category_id}_features'],
+                    version=int(data[f'{category_id}_version']),
+                )
+                for category_id in category_ids
+            }
+
+        with self._lock:
+            self.categories = {}
+            self.locations = {}
+            for category_id, index in categories.items():
+                self._set_category(category_id, index)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_similarity_index():
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                index = SimilarityIndex()
+                path = settings.SIMILARITY_INDEX_PATH
+                if path and os.path.exists(path):
+                    index.load(path)
+                _index = index
+    return _index
+
+
+@receiver(post_save, sender=Product)
+def product_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        get_similarity_index().update_product(instance)
+
+
+@receiver(post_delete, sender=Product)
+def product_deleted(sender, instance, **kwargs):
+    get_similarity_index().remove_product(instance.pk, instance.category_id)
@@ -0,0 +1,20 @@
+from celery import shared_task
+from django.core.management import call_command
+
+from .copurchase import build_copurchase as build
+from .scores import refresh_scores
+
+
+@shared_task
+def build_copurchase():
+    return build()
+
+
+@shared_task
+def refresh_product_scores():
+    refresh_scores()
+
+
+@shared_task
+def precompute_user_recommendations():
+    call_command('precompute_recommendations')
@@ -0,0 +1,137 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from orders.models import Order
+
+
+KEY = 'recs:user:{}'
+
+
+class LRUCache:
+
+    def __init__(self, max_size=1000, timeout=30):
+        self.max_size = max_size
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class UserRecommendationCache:
+
+    def __init__(self, size=50, timeout=3600, local_size=1000, local_timeout=30):
+        self.size = size
+        self.timeout = timeout
+        self.local = LRUCache(local_size, local_timeout)
+
+    @classmethod
+    def from_settings(cls):
+        config = settings.RECOMMENDATION_CACHE
+        return cls(
+            size=config['SIZE'],
+            timeout=config['TIMEOUT'],
+            local_size=config['LOCAL_MAX_ENTRIES'],
+            local_timeout=config['LOCAL_TIMEOUT'],
+        )
+
+    def compute(self, engine, user):
+        return [product.pk for product in engine.get_for_user(user, limit=self.size)]
+
+    def get_ids(self, engine, user):
+        key = KEY.format(user.pk)
+        product_ids = self.local.get(key)
+        if product_ids is None:
+            product_ids = cache.get(key)
+            if product_ids is None:
+                product_ids = self.compute(engine, user)
+                cache.set(key, product_ids, self.timeout)
+            self.local.set(key, product_ids)
+        return product_ids
+
+    def get(self, engine, user, limit=12):
+        if not user or not user.is_authenticated:
+            return engine.get_trending(limit=limit)
+
+        product_ids = self.get_ids(engine, user)[:limit]
+        products = engine.Product.objects.in_bulk(product_ids)
+        return [products[pk] for pk in product_ids if pk in products]
+
+    def precompute(self, engine, users):
+        values = {KEY.format(user.pk): self.compute(engine, user) for user in users}
+        cache.set_many(values, self.timeout)
+        for key in values:
+            self.local.delete(key)
+        return len(values)
+
+    def invalidate(self, user_id):
+        key = KEY.format(user_id)
+        cache.delete(key)
+        self.local.delete(key)
+
+
+def active_users(days=30):
+    since = timezone.now() - timedelta(days=days)
+    return get_user_model().objects.filter(
+        Q(last_login__gte=since) | Q(orders__created_at__gte=since),
+        is_active=True,
+    ).distinct().order_by('pk')
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_user_recommendation_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = UserRecommendationCache.from_settings()
+    return _cache
+
+
+@receiver(post_save, sender=Order)
+def order_placed(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        user_id = instance.user_id
+        transaction.on_commit(lambda: get_user_recommendation_cache().invalidate(user_id))
@@ -5,8 +5,11 @@ from django.shortcuts import get_object_or_404
 from main.models import Product
 from orders.models import OrderItem
 from .engine import RecommendationEngine
+from .models import ProductCoPurchase, ProductScore
+from .similarity import get_similarity_index
+from .user_cache import get_user_recommendation_cache
 from api.serializers import ProductListSerializer
-from cart.models import Cart
+from cart.storage import find_cart
 
 
 def get_models():
@@ -19,7 +22,12 @@ def get_models():
 
 def get_engine():
     Product, OrderItem, Review = get_models()
-    return RecommendationEngine(Product, OrderItem, Review)
+    return RecommendationEngine(
+        Product, OrderItem, Review,
+        copurchase_model=ProductCoPurchase,
+        score_model=ProductScore,
+        similarity_index=get_similarity_index(),
+    )
 
 
 def get_serializer():
@@ -48,7 +56,7 @@ class RecommendationsAPIView(APIView):
                 if not request.user.is_authenticated:
                     products = engine.get_trending(days=days, limit=limit)
                 else:
-                    products = engine.get_for_user(request.user, limit=limit)
+                    products = get_user_recommendation_cache().get(engine, request.user, limit=limit)
 
             elif rec_type == 'similar':
                 if not product_slug:
@@ -85,14 +93,8 @@ class RecommendationsAPIView(APIView):
                 products = engine.get_upsell(product, limit=limit)
 
             elif rec_type == 'cross_sell':
-                cart_products = []
-
-                if request.session.session_key:
-                    try:
-                        cart = Cart.objects.get(session_key=request.session.session_key)
-                        cart_products = [item.product for item in cart.items.all()]
-                    except Cart.DoesNotExist:
-                        pass
+                cart = find_cart(request)
+                cart_products = [item.product for item in cart.get_items()] if cart else []
 
                 products = engine.get_cross_sell(cart_products, limit=limit)
 
@@ -124,7 +126,7 @@ class PersonalizedHomeAPIView(APIView):
         blocks = []
 
         if request.user.is_authenticated:
-            personal = engine.get_for_user(request.user, limit=8)
+            personal = get_user_recommendation_cache().get(engine, request.user, limit=8)
             if personal:
                 blocks.append({
                     'title': 'Рекомендовано для вас',
@@ -85,4 +85,78 @@ class TestCartCount:
         response = api_client.get('/api/cart/count/')
 
         assert response.status_code == status.HTTP_200_OK
-        assert response.data['total_items'] == 0
\ No newline at end of file
+        assert response.data['total_items'] == 0
+
+@pytest.mark.django_db
+class TestCartBatch:
+
+    def test_batch_applies_all_operations(self, auth_client, user, products, product_with_sizes):
+        cart = Cart.for_user(user)
+        kept = cart.add_product(products[0], None, 1)
+        removed = cart.add_product(products[1], None, 1)
+        product_size = product_with_sizes.product_sizes.first()
+
+        response = auth_client.post('/api/cart/batch/', {'operations': [
+            {'op': 'add', 'product_id': products[2].id, 'quantity': 2},
+            {'op': 'add', 'product_id': products[3].id},
+            {'op': 'add', 'product_id': product_with_sizes.id, 'product_size_id': product_size.id, 'quantity': 3},
+            {'op': 'update', 'item_id': kept.id, 'quantity': 4},
+            {'op': 'remove', 'item_id': removed.id},
+        ]}, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['cart']['total_items'] == 10
+        assert dict(cart.items.values_list('product_id', 'quantity')) == {
+            products[0].id: 4,
+            products[2].id: 2,
+            products[3].id: 1,
+            product_with_sizes.id: 3,
+        }
+
+    def test_batch_query_count_does_not_grow_with_lines(self, auth_client, user, products, django_assert_max_num_queries):
+        Cart.for_user(user)
+        operations = [{'op': 'add', 'product_id': product.id} for product in products]
+
+        with django_assert_max_num_queries(16):
+            response = auth_client.post('/api/cart/batch/', {'operations': operations}, format='json')
+
+        assert response.data['cart']['total_items'] == len(products)
+
+    def test_anonymous_batch_uses_session_cart(self, api_client, products):
+        response = api_client.post('/api/cart/batch/', {'operations': [
+            {'op': 'add', 'product_id': products[0].id, 'quantity': 2},
+            {'op': 'add', 'product_id': products[1].id},
+        ]}, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['cart']['total_items'] == 3
+        assert Cart.objects.count() == 0
+
+        item_id = next(
+            item['id'] for item in response.data['cart']['items'] if item['product']['id'] == products[0].id
+        )
+        response = api_client.post('/api/cart/batch/', {'operations': [
+            {'op': 'update', 'item_id': item_id, 'quantity': 0},
+        ]}, format='json')
+
+        assert response.data['cart']['total_items'] == 1
+
+    def test_invalid_operation_rejects_whole_batch(self, auth_client, user, product, product_with_sizes):
+        product_size = product_with_sizes.product_sizes.first()
+
+        response = auth_client.post('/api/cart/batch/', {'operations': [
+            {'op': 'add', 'product_id': product.id},
+            {'op': 'add', 'product_id': 99999},
+            {'op': 'add', 'product_id': product_with_sizes.id, 'product_size_id': product_size.id, 'quantity': 50},
+            {'op': 'remove', 'item_id': 12345},
+        ]}, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert [error['index'] for error in response.data['errors']] == [1, 2, 3]
+        assert Cart.for_user(user).total_items == 0
+
+    def test_operation_fields_are_validated(self, auth_client):
+        response = auth_client.post('/api/cart/batch/', {'operations': [{'op': 'update', 'quantity': 1}]}, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'item_id' in response.data['operations'][0]
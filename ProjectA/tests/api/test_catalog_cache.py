@@ -0,0 +1,88 @@
+import pytest
+from decimal import Decimal
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+from main.models import Product
+from main.view_counter import view_counter
+
+
+@pytest.mark.django_db
+class TestCatalogCache:
+
+    def test_list_served_from_cache(self, api_client, products):
+        first = api_client.get('/api/products/')
+
+        with CaptureQueriesContext(connection) as queries:
+            second = api_client.get('/api/products/')
+
+        assert second.status_code == status.HTTP_200_OK
+        assert second.data == first.data
+        assert not [q for q in queries if 'main_product' in q['sql']]
+
+    def test_query_params_are_part_of_key(self, api_client, products):
+        api_client.get('/api/products/', {'ordering': 'price'})
+        response = api_client.get('/api/products/', {'ordering': '-price'})
+
+        prices = [Decimal(p['price']) for p in response.data['results']]
+        assert prices == sorted(prices, reverse=True)
+
+    def test_product_save_invalidates(self, api_client, product):
+        api_client.get(f'/api/products/{product.slug}/')
+
+        product.price = Decimal('100.00')
+        product.save()
+        response = api_client.get(f'/api/products/{product.slug}/')
+
+        assert Decimal(response.data['price']) == Decimal('100.00')
+
+    def test_product_size_save_invalidates(self, api_client, product_with_sizes):
+        api_client.get('/api/products/')
+
+        product_with_sizes.product_sizes.first().delete()
+        response = api_client.get('/api/products/')
+
+        assert response.data['results'][0]['total_stock'] == 30
+
+    def test_category_save_invalidates(self, api_client, category, products):
+        api_client.get(f'/api/categories/{category.slug}/products/')
+
+        category.name = 'Телефони'
+        category.save()
+        response = api_client.get(f'/api/categories/{category.slug}/products/')
+
+        assert response.data['results'][0]['category']['name'] == 'Телефони'
+
+    def test_product_delete_invalidates(self, api_client, products):
+        api_client.get('/api/products/')
+
+        products[0].delete()
+        response = api_client.get('/api/products/')
+
+        assert len(response.data['results']) == 4
+
+    def test_authenticated_requests_bypass_cache(self, auth_client, products):
+        auth_client.get('/api/products/')
+        Product.objects.filter(pk=products[0].pk).update(name='Renamed')
+
+        response = auth_client.get('/api/products/')
+
+        assert 'Renamed' in [p['name'] for p in response.data['results']]
+
+    def test_cached_detail_still_counts_views(self, api_client, product):
+        api_client.get(f'/api/products/{product.slug}/')
+        api_client.get(f'/api/products/{product.slug}/')
+        view_counter.flush()
+        product.refresh_from_db()
+
+        assert product.views_count == 2
+
+    def test_index_view_cached(self, client, products):
+        client.get('/')
+        Product.objects.filter(pk=products[0].pk).update(name='Renamed')
+
+        response = client.get('/')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert 'Renamed' not in response.content.decode()
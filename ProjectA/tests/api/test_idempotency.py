@@ -0,0 +1,123 @@
+import threading
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from api.idempotency import LOCK_KEY
+from cart.models import Cart
+from main.models import Product
+from marketplace.redis_client import get_redis
+from orders.models import Order
+
+
+CHECKOUT = {'first_name': 'Test', 'last_name': 'User'}
+
+
+@pytest.fixture
+def stocked_product(product):
+    product.stock = 5
+    product.save(update_fields=['stock'])
+    return product
+
+
+@pytest.mark.django_db
+class TestIdempotencyKey:
+
+    def test_checkout_retry_replays_first_response(self, auth_client, user, stocked_product,
+                                                   django_capture_on_commit_callbacks):
+        Cart.for_user(user).add_product(stocked_product, None, 2)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            first = auth_client.post('/api/orders/checkout/', CHECKOUT, HTTP_IDEMPOTENCY_KEY='order-1')
+        Cart.for_user(user).add_product(stocked_product, None, 1)
+
+        with CaptureQueriesContext(connection) as queries:
+            retry = auth_client.post('/api/orders/checkout/', CHECKOUT, HTTP_IDEMPOTENCY_KEY='order-1')
+
+        assert first.status_code == retry.status_code == status.HTTP_201_CREATED
+        assert retry.json() == first.json()
+        assert retry['Idempotent-Replayed'] == 'true'
+        assert Order.objects.count() == 1
+        assert Product.objects.get(pk=stocked_product.pk).stock == 3
+        assert not [query for query in queries.captured_queries
+                    if any(table in query['sql'] for table in ('cart_', 'orders_', 'main_'))]
+
+    def test_cart_add_is_applied_once_per_key(self, auth_client, user, product,
+                                               django_capture_on_commit_callbacks):
+        data = {'product_id': product.id, 'quantity': 1}
+
+        with django_capture_on_commit_callbacks(execute=True):
+            auth_client.post('/api/cart/add/', data, format='json', HTTP_IDEMPOTENCY_KEY='add-1')
+            auth_client.post('/api/cart/add/', data, format='json', HTTP_IDEMPOTENCY_KEY='add-1')
+            auth_client.post('/api/cart/add/', data, format='json', HTTP_IDEMPOTENCY_KEY='add-2')
+            auth_client.post('/api/cart/add/', data, format='json')
+
+        assert Cart.for_user(user).total_items == 3
+
+    def test_reused_key_with_other_payload_is_rejected(self, auth_client, product, product_with_discount,
+                                                       django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            auth_client.post('/api/cart/add/', {'product_id': product.id}, format='json',
+                             HTTP_IDEMPOTENCY_KEY='add-1')
+
+        response = auth_client.post('/api/cart/add/', {'product_id': product_with_discount.id}, format='json',
+                                    HTTP_IDEMPOTENCY_KEY='add-1')
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_in_flight_duplicate_gets_conflict(self, settings, auth_client, user, product):
+        settings.IDEMPOTENCY = {**settings.IDEMPOTENCY, 'WAIT': 0.1}
+        get_redis().set(LOCK_KEY.format(f'user:{user.pk}:/api/cart/add/:add-1'), 1)
+
+        response = auth_client.post('/api/cart/add/', {'product_id': product.id}, format='json',
+                                    HTTP_IDEMPOTENCY_KEY='add-1')
+
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert Cart.for_user(user).total_items == 0
+
+    def test_keys_are_scoped_per_user(self, auth_client, seller, product, django_capture_on_commit_callbacks):
+        other = APIClient()
+        other.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=seller).key}')
+
+        with django_capture_on_commit_callbacks(execute=True):
+            auth_client.post('/api/cart/add/', {'product_id': product.id}, format='json',
+                             HTTP_IDEMPOTENCY_KEY='add-1')
+            response = other.post('/api/cart/add/', {'product_id': product.id}, format='json',
+                                  HTTP_IDEMPOTENCY_KEY='add-1')
+
+        assert 'Idempotent-Replayed' not in response
+        assert Cart.for_user(seller).total_items == 1
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConcurrentRetries:
+
+    def test_concurrent_duplicates_create_one_order(self, user, stocked_product):
+        Cart.for_user(user).add_product(stocked_product, None, 1)
+        token = Token.objects.create(user=user).key
+        barrier = threading.Barrier(4)
+        responses = []
+
+        def retry():
+            try:
+                client = APIClient()
+                client.credentials(HTTP_AUTHORIZATION=f'Token {token}')
+                barrier.wait()
+                responses.append(client.post('/api/orders/checkout/', CHECKOUT, HTTP_IDEMPOTENCY_KEY='order-1'))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=retry) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert [response.status_code for response in responses] == [status.HTTP_201_CREATED] * 4
+        assert len({response.json()['order_id'] for response in responses}) == 1
+        assert Order.objects.count() == 1
+        assert Product.objects.get(pk=stocked_product.pk).stock == 4
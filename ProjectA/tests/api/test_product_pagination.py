@@ -0,0 +1,74 @@
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+from main.models import Product
+
+
+@pytest.fixture
+def catalog(db, category, seller):
+    return [
+        Product.objects.create(
+            name=f'Product {i}',
+            slug=f'product-{i}',
+            category=category,
+            price=Decimal(f'{100 * (i // 2)}.00'),
+            views_count=i % 3,
+            seller=seller,
+        )
+        for i in range(7)
+    ]
+
+
+def walk(client, url, params):
+    slugs = []
+    response = client.get(url, {**params, 'page_size': 2})
+    for _ in range(10):
+        assert response.status_code == status.HTTP_200_OK
+        slugs += [item['slug'] for item in response.data['results']]
+        if not response.data['next']:
+            return slugs
+        response = client.get(response.data['next'])
+    pytest.fail('pagination did not terminate')
+
+
+@pytest.mark.django_db
+class TestProductPagination:
+
+    @pytest.mark.parametrize('ordering', ['-created_at', 'price', '-price', 'views_count', '-views_count'])
+    def test_pages_cover_ties_exactly_once(self, api_client, catalog, ordering):
+        field = ordering.lstrip('-')
+        expected = sorted(catalog, key=lambda product: (getattr(product, field), product.pk),
+                          reverse=ordering.startswith('-'))
+
+        assert walk(api_client, '/api/products/', {'ordering': ordering}) == [p.slug for p in expected]
+
+    def test_ranked_search_pages_cover_ties_exactly_once(self, api_client, catalog):
+        expected = [product.slug for product in reversed(catalog)]
+
+        assert walk(api_client, '/api/products/', {'search': 'product'}) == expected
+
+    def test_deep_page_runs_no_count(self, api_client, catalog):
+        first = api_client.get('/api/products/', {'ordering': 'price', 'page_size': 3})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(first.data['next'])
+
+        assert [item['slug'] for item in response.data['results']] == ['product-3', 'product-4', 'product-5']
+        assert not [q for q in queries if q['sql'].startswith('SELECT COUNT(*)')]
+
+    def test_invalid_cursor_is_rejected(self, api_client, catalog):
+        first = api_client.get('/api/products/', {'ordering': 'price', 'page_size': 2})
+        cursor = first.data['next'].split('cursor=')[1]
+
+        assert api_client.get('/api/products/', {'cursor': 'garbage'}).status_code == status.HTTP_400_BAD_REQUEST
+        assert api_client.get('/api/products/', {'cursor': cursor}).status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_category_and_seller_listings_are_paginated(self, api_client, category, seller, catalog):
+        expected = [product.slug for product in reversed(catalog)]
+
+        assert walk(api_client, f'/api/categories/{category.slug}/products/', {}) == expected
+        assert walk(api_client, f'/api/users/{seller.pk}/products/', {}) == expected
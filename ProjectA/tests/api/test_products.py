@@ -3,6 +3,7 @@ from decimal import Decimal
 from rest_framework import status
 
 from main.models import Category, Product
+from main.view_counter import view_counter
 
 
 @pytest.mark.django_db
@@ -25,7 +26,7 @@ class TestCategoryAPI:
         response = api_client.get(f'/api/categories/{category.slug}/products/')
 
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 5
+        assert len(response.data['results']) == 5
 
     def test_create_category_unauthorized(self, api_client):
         data = {'name': 'New Category', 'slug': 'new-category'}
@@ -41,7 +42,7 @@ class TestProductAPI:
         response = api_client.get('/api/products/')
 
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 5
+        assert len(response.data['results']) == 5
 
     def test_retrieve_product(self, api_client, product):
         response = api_client.get(f'/api/products/{product.slug}/')
@@ -54,6 +55,7 @@ class TestProductAPI:
         initial_views = product.views_count
 
         api_client.get(f'/api/products/{product.slug}/')
+        view_counter.flush()
         product.refresh_from_db()
 
         assert product.views_count == initial_views + 1
@@ -62,32 +64,32 @@ class TestProductAPI:
         response = api_client.get('/api/products/', {'category_slug': category.slug})
 
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 5
+        assert len(response.data['results']) == 5
 
     def test_filter_by_price_range(self, api_client, products):
         response = api_client.get('/api/products/', {'min_price': 2000, 'max_price': 4000})
 
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 3
+        assert len(response.data['results']) == 3
 
     def test_search_products(self, api_client, product):
         response = api_client.get('/api/products/', {'search': 'iPhone'})
 
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) >= 1
+        assert len(response.data['results']) >= 1
 
     def test_ordering_by_price(self, api_client, products):
         response = api_client.get('/api/products/', {'ordering': 'price'})
 
         assert response.status_code == status.HTTP_200_OK
-        prices = [Decimal(p['price']) for p in response.data]
+        prices = [Decimal(p['price']) for p in response.data['results']]
         assert prices == sorted(prices)
 
     def test_ordering_by_price_desc(self, api_client, products):
         response = api_client.get('/api/products/', {'ordering': '-price'})
 
         assert response.status_code == status.HTTP_200_OK
-        prices = [Decimal(p['price']) for p in response.data]
+        prices = [Decimal(p['price']) for p in response.data['results']]
         assert prices == sorted(prices, reverse=True)
 
 @pytest.mark.django_db
@@ -144,4 +146,21 @@ class TestProductDiscount:
         assert product_with_discount.discount_percent == expected_discount
 
     def test_no_discount_when_no_old_price(self, product):
-        assert product.discount_percent == 0
\ No newline at end of file
+        assert product.discount_percent == 0
+
+@pytest.mark.django_db
+class TestProductStock:
+
+    def test_list_reports_sized_stock(self, api_client, product_with_sizes):
+        response = api_client.get('/api/products/')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['results'][0]['total_stock'] == 40
+        assert response.data['results'][0]['is_in_stock'] is True
+
+    def test_filter_in_stock(self, api_client, product, product_with_sizes):
+        response = api_client.get('/api/products/', {'in_stock': 'true'})
+
+        assert response.status_code == status.HTTP_200_OK
+        slugs = [p['slug'] for p in response.data['results']]
+        assert slugs == [product_with_sizes.slug]
@@ -0,0 +1,106 @@
+import pytest
+from decimal import Decimal
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+
+from api.query_budget import QueryBudgetExceeded
+from api.views import ProductViewSet, CategoryViewSet
+from main.models import Product, ProductSize
+
+
+@pytest.fixture
+def catalog(db, categories, sizes, seller):
+    products = []
+    for i in range(20):
+        category = categories[i % len(categories)]
+        product = Product.objects.create(
+            name=f'Catalog product {i}',
+            slug=f'catalog-product-{i}',
+            category=category,
+            price=Decimal(f'{100 + i}.00'),
+            old_price=Decimal(f'{200 + i}.00') if i % 4 == 0 else None,
+            seller=seller,
+            stock=i,
+            is_new=True,
+            is_bestseller=True,
+            is_recommended=True,
+            views_count=i,
+        )
+        if category.requires_size:
+            for size in sizes:
+                ProductSize.objects.create(product=product, size=size, stock=i)
+        products.append(product)
+    return products
+
+
+@pytest.mark.django_db
+class TestProductQueryBudgets:
+
+    @pytest.mark.parametrize('url', [
+        '/api/products/',
+        '/api/products/?in_stock=true',
+        '/api/products/?size=M',
+        '/api/products/recommended/',
+        '/api/products/bestsellers/',
+        '/api/products/new/',
+        '/api/products/popular/',
+        '/api/products/sale/',
+    ])
+    def test_list_endpoints_within_budget(self, api_client, catalog, url):
+        response = api_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) > 0
+
+    def test_retrieve_within_budget(self, api_client, catalog):
+        response = api_client.get(f'/api/products/{catalog[1].slug}/')
+
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_related_within_budget(self, api_client, catalog):
+        response = api_client.get(f'/api/products/{catalog[0].slug}/related/')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) > 0
+
+    def test_budget_holds_for_token_auth(self, api_client, catalog, user):
+        token, _ = Token.objects.get_or_create(user=user)
+        api_client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+        response = api_client.get('/api/products/')
+
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_category_counts_are_annotated(self, api_client, catalog, categories):
+        response = api_client.get('/api/products/')
+
+        counts = {p['category']['slug']: p['category']['products_count'] for p in response.data['results']}
+        for category in categories:
+            assert counts[category.slug] == category.products.count()
+
+    def test_exceeding_budget_fails(self, api_client, catalog, monkeypatch):
+        monkeypatch.setitem(ProductViewSet.query_budgets, 'list', 1)
+
+        with pytest.raises(QueryBudgetExceeded):
+            api_client.get('/api/products/')
+
+    def test_every_catalog_action_declares_budget(self):
+        for action in ['list', 'retrieve', 'recommended', 'bestsellers',
+                       'new', 'popular', 'sale', 'related']:
+            assert action in ProductViewSet.query_budgets
+
+
+@pytest.mark.django_db
+class TestCategoryQueryBudgets:
+
+    def test_category_list_within_budget(self, api_client, catalog):
+        response = api_client.get('/api/categories/')
+
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_category_products_within_budget(self, api_client, catalog, categories):
+        response = api_client.get(f'/api/categories/{categories[1].slug}/products/')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data['results']) > 0
+        assert 'products' in CategoryViewSet.query_budgets
@@ -1,15 +1,41 @@
 import pytest
 from decimal import Decimal
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from rest_framework.test import APIClient
 from rest_framework.authtoken.models import Token
 
 from main.models import Category, Product, Size, ProductSize
+from marketplace.redis_client import get_redis
+from logs.buffer import get_action_log_buffer
 from cart.models import Cart, CartItem
+from recommendations.user_cache import get_user_recommendation_cache
 
 
 User = get_user_model()
 
+
+@pytest.fixture(autouse=True)
+def strict_query_budgets(settings):
+    settings.QUERY_BUDGET_STRICT = True
+
+
+@pytest.fixture(autouse=True)
+def synchronous_action_log(monkeypatch):
+    monkeypatch.setattr(get_action_log_buffer(), 'enabled', False)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    get_redis().flushdb()
+    get_user_recommendation_cache().local.clear()
+    yield
+    cache.clear()
+    get_redis().flushdb()
+    get_user_recommendation_cache().local.clear()
+
+
 @pytest.fixture
 def api_client():
     return APIClient()
@@ -172,26 +198,13 @@ def cart(db):
 
 @pytest.fixture
 def cart_with_items(db, cart, product, product_with_discount):
-    CartItem.objects.create(
-        cart=cart,
-        product=product,
-        quantity=2
-    )
-    CartItem.objects.create(
-        cart=cart,
-        product=product_with_discount,
-        quantity=1
-    )
+    cart.add_product(product, None, quantity=2)
+    cart.add_product(product_with_discount, None, quantity=1)
     return cart
 
 
 @pytest.fixture
 def cart_with_sized_item(db, cart, product_with_sizes):
     product_size = product_with_sizes.product_sizes.first()
-    CartItem.objects.create(
-        cart=cart,
-        product=product_with_sizes,
-        product_size=product_size,
-        quantity=1
-    )
+    cart.add_product(product_with_sizes, product_size, quantity=1)
     return cart
\ No newline at end of file
@@ -0,0 +1,114 @@
+import time
+
+import pytest
+from rest_framework import status
+
+from logs.buffer import ActionLogBuffer
+from logs.models import ActionLog
+from logs.utils import log_action
+
+
+def make_entry(description='test'):
+    return ActionLog(action_type=ActionLog.ActionType.OTHER, description=description)
+
+
+@pytest.mark.django_db
+class TestActionLogBuffer:
+
+    def test_entries_are_queued_until_batch_is_full(self, django_capture_on_commit_callbacks):
+        buffer = ActionLogBuffer(batch_size=3, flush_interval=None)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            buffer.add(make_entry())
+            buffer.add(make_entry())
+
+        assert ActionLog.objects.count() == 0
+        assert buffer.stats()['queued'] == 2
+
+        with django_capture_on_commit_callbacks(execute=True):
+            buffer.add(make_entry())
+
+        assert ActionLog.objects.count() == 3
+        assert buffer.stats() == {'queued': 0, 'dropped': 0, 'written': 3}
+
+    def test_full_buffer_drops_entries(self, django_capture_on_commit_callbacks):
+        buffer = ActionLogBuffer(batch_size=10, flush_interval=None, max_size=2)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            for _ in range(5):
+                buffer.add(make_entry())
+
+        assert buffer.stats()['queued'] == 2
+        assert buffer.stats()['dropped'] == 3
+
+    def test_disabled_buffer_writes_synchronously(self):
+        buffer = ActionLogBuffer(enabled=False)
+
+        entry = buffer.add(make_entry())
+
+        assert entry.pk is not None
+        assert buffer.stats()['written'] == 1
+
+    def test_rolled_back_entries_are_not_queued(self, django_capture_on_commit_callbacks):
+        buffer = ActionLogBuffer(batch_size=10, flush_interval=None)
+
+        with django_capture_on_commit_callbacks(execute=False):
+            buffer.add(make_entry())
+
+        assert buffer.stats()['queued'] == 0
+
+    def test_drain_flushes_and_switches_to_sync(self, django_capture_on_commit_callbacks):
+        buffer = ActionLogBuffer(batch_size=10, flush_interval=None)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            buffer.add(make_entry())
+        buffer.drain()
+        buffer.add(make_entry())
+
+        assert ActionLog.objects.count() == 2
+
+    def test_timestamp_is_taken_at_log_time(self, django_capture_on_commit_callbacks):
+        buffer = ActionLogBuffer(batch_size=10, flush_interval=None)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            entry = buffer.add(make_entry())
+        logged_at = entry.created_at
+        time.sleep(0.01)
+        buffer.flush()
+
+        assert ActionLog.objects.get().created_at == logged_at
+
+    def test_public_helpers_keep_signature(self, rf, user):
+        request = rf.get('/')
+        request.user = user
+
+        entry = log_action(request, 'login', description='Logged in')
+
+        assert entry.action_type == ActionLog.ActionType.LOGIN
+        assert ActionLog.objects.filter(user=user).exists()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestActionLogWriterThread:
+
+    def test_background_flush_by_time(self):
+        buffer = ActionLogBuffer(batch_size=100, flush_interval=0.05)
+
+        buffer.add(make_entry())
+        deadline = time.monotonic() + 5
+        while ActionLog.objects.count() == 0 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        buffer.drain()
+
+        assert ActionLog.objects.count() == 1
+
+    def test_middleware_logs_auth_events(self, client, monkeypatch):
+        from logs.buffer import get_action_log_buffer
+        monkeypatch.setattr(get_action_log_buffer(), 'enabled', True)
+        monkeypatch.setattr(get_action_log_buffer(), 'flush_interval', None)
+
+        response = client.post('/api/auth/login/', {'email': 'x@example.com', 'password': 'x'})
+        get_action_log_buffer().flush()
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert ActionLog.objects.filter(is_success=False).count() == 1
@@ -0,0 +1,130 @@
+import datetime
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from logs.archive import archive_month, is_archived, read_archive, search_action_logs
+from logs.models import ActionLog
+from logs.partitions import (
+    add_months, ensure_partitions, list_partitions, month_bounds, month_start, partition_name,
+)
+
+
+OLD_MONTH = datetime.date(2024, 1, 1)
+
+
+def partition_of(entry):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT tableoid::regclass::text FROM logs_actionlog WHERE id = %s',
+            [entry.pk],
+        )
+        return cursor.fetchone()[0]
+
+
+def create_old_entry(user, description='old'):
+    start, end = month_bounds(OLD_MONTH)
+    return ActionLog.objects.create(
+        user=user,
+        action_type=ActionLog.ActionType.LOGIN,
+        description=description,
+        object_repr='Old object',
+        created_at=start + datetime.timedelta(days=3),
+    )
+
+
+@pytest.fixture
+def archive_dir(settings, tmp_path):
+    settings.ACTION_LOG_ARCHIVE_DIR = str(tmp_path / 'archive')
+    return settings.ACTION_LOG_ARCHIVE_DIR
+
+
+@pytest.mark.django_db
+class TestActionLogPartitions:
+
+    def test_upcoming_months_have_partitions(self):
+        months = [month for month, name in list_partitions()]
+
+        for offset in range(4):
+            assert add_months(month_start(), offset) in months
+
+    def test_entries_are_routed_to_month_partition(self, user):
+        entry = ActionLog.objects.create(user=user, action_type=ActionLog.ActionType.LOGIN)
+
+        assert partition_of(entry) == partition_name(month_start(entry.created_at))
+
+    def test_creating_partition_moves_rows_from_default(self, user):
+        entry = create_old_entry(user)
+        assert partition_of(entry) == 'logs_actionlog_default'
+
+        created = ensure_partitions(months_ahead=0, start=OLD_MONTH)
+
+        assert created == [partition_name(OLD_MONTH)]
+        assert partition_of(entry) == partition_name(OLD_MONTH)
+        assert ensure_partitions(months_ahead=0, start=OLD_MONTH) == []
+
+
+@pytest.mark.django_db
+class TestActionLogRetention:
+
+    def test_archive_writes_compressed_jsonl(self, user, archive_dir):
+        entry = create_old_entry(user)
+
+        assert archive_month(OLD_MONTH) == 1
+
+        rows = list(read_archive(OLD_MONTH))
+        assert rows[0]['id'] == entry.pk
+        assert rows[0]['user_email'] == user.email
+        assert rows[0]['created_at'] == entry.created_at
+
+    def test_retention_keeps_unarchived_partitions(self, user, archive_dir):
+        create_old_entry(user)
+        ensure_partitions(months_ahead=0, start=OLD_MONTH)
+
+        call_command('enforce_action_log_retention', months=6)
+
+        assert partition_name(OLD_MONTH) in [name for month, name in list_partitions()]
+        assert ActionLog.objects.count() == 1
+
+    def test_archive_then_retention_drops_partition(self, user, archive_dir):
+        create_old_entry(user)
+        recent = ActionLog.objects.create(user=user, action_type=ActionLog.ActionType.LOGOUT)
+        ensure_partitions(months_ahead=0, start=OLD_MONTH)
+
+        call_command('archive_action_logs', months=6)
+        call_command('enforce_action_log_retention', months=6)
+
+        assert is_archived(OLD_MONTH)
+        assert partition_name(OLD_MONTH) not in [name for month, name in list_partitions()]
+        assert list(ActionLog.objects.values_list('id', flat=True)) == [recent.pk]
+
+    def test_search_combines_live_and_archived_entries(self, user, archive_dir):
+        old = create_old_entry(user)
+        ensure_partitions(months_ahead=0, start=OLD_MONTH)
+        call_command('archive_action_logs', months=6)
+        call_command('enforce_action_log_retention', months=6)
+        recent = ActionLog.objects.create(user=user, action_type=ActionLog.ActionType.LOGIN)
+
+        start, _ = month_bounds(OLD_MONTH)
+        _, end = month_bounds(month_start())
+        rows = search_action_logs(start, end, action_type='login', query=user.email)
+
+        assert [row['id'] for row in rows] == [recent.pk, old.pk]
+
+    def test_admin_archive_view(self, admin_user, user, archive_dir):
+        create_old_entry(user, description='archived entry')
+        ensure_partitions(months_ahead=0, start=OLD_MONTH)
+        call_command('archive_action_logs', months=6)
+
+        client = Client()
+        client.force_login(admin_user)
+        response = client.get(reverse('admin:logs_actionlog_archive'), {
+            'date_from': '2024-01-01',
+            'date_to': '2024-01-31',
+        })
+
+        assert response.status_code == 200
+        assert [row['description'] for row in response.context['logs']] == ['archived entry']
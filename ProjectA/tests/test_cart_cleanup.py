@@ -0,0 +1,72 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.utils import timezone
+
+from cart.cleanup import purge_carts
+from cart.models import Cart, CartItem
+
+
+def make_session(expires_in):
+    session = SessionStore()
+    session.create()
+    Session.objects.filter(session_key=session.session_key).update(
+        expire_date=timezone.now() + expires_in,
+    )
+    return session.session_key
+
+
+def idle(cart, days):
+    Cart.objects.filter(pk=cart.pk).update(updated_at=timezone.now() - timedelta(days=days))
+
+
+@pytest.fixture
+def carts(db, user, seller, product):
+    live = Cart.objects.create(session_key=make_session(timedelta(days=1)))
+    expired = Cart.objects.create(session_key=make_session(-timedelta(minutes=1)))
+    abandoned = Cart.objects.create(session_key=make_session(timedelta(days=1)))
+    active_user = Cart.for_user(user)
+    idle_user = Cart.for_user(seller)
+    for cart in (live, expired, abandoned, active_user, idle_user):
+        cart.add_product(product, None, 1)
+    idle(abandoned, 30)
+    idle(idle_user, 365)
+    return {
+        'live': live,
+        'expired': expired,
+        'abandoned': abandoned,
+        'active_user': active_user,
+        'idle_user': idle_user,
+    }
+
+
+@pytest.mark.django_db
+class TestPurgeCarts:
+
+    def test_stale_carts_and_sessions_are_deleted(self, carts):
+        result = purge_carts(anonymous_idle_days=14, user_idle_days=180, batch_size=1)
+
+        assert result == {'carts': 3, 'items': 3, 'sessions': 1}
+        assert set(Cart.objects.values_list('pk', flat=True)) == {carts['live'].pk, carts['active_user'].pk}
+        assert CartItem.objects.count() == 2
+        assert not Session.objects.filter(expire_date__lt=timezone.now()).exists()
+
+    def test_user_carts_are_kept_when_disabled(self, carts):
+        result = purge_carts(anonymous_idle_days=14, user_idle_days=0)
+
+        assert result['carts'] == 2
+        assert Cart.objects.filter(pk=carts['idle_user'].pk).exists()
+
+    def test_dry_run_only_counts(self, carts):
+        result = purge_carts(anonymous_idle_days=14, user_idle_days=180, dry_run=True)
+
+        assert result == {'carts': 3, 'items': 3, 'sessions': 1}
+        assert Cart.objects.count() == 5
+
+    def test_command_reports_deleted_rows(self, carts, capsys):
+        call_command('purge_carts', '--batch-size', '2')
+
+        assert '3 carts, 3 cart items, 1 sessions deleted' in capsys.readouterr().out
@@ -0,0 +1,89 @@
+import pytest
+from decimal import Decimal
+from django.contrib.sessions.models import Session
+from django.db import connection
+from django.test import Client, RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from cart.context_processors import get_cart_summary
+from cart.models import Cart
+from cart.storage import RedisCart
+
+
+def cart_queries(queries):
+    return [query['sql'] for query in queries if 'cart_cart' in query['sql']]
+
+
+@pytest.mark.django_db
+class TestLazyCart:
+
+    def test_api_requests_do_not_create_session_or_cart(self, api_client, products):
+        response = api_client.get('/api/products/')
+
+        assert response.status_code == 200
+        assert Cart.objects.count() == 0
+        assert Session.objects.count() == 0
+        assert 'sessionid' not in response.cookies
+
+    def test_pages_without_session_run_no_cart_queries(self, products):
+        client = Client()
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get('/')
+
+        assert response.status_code == 200
+        assert cart_queries(queries.captured_queries) == []
+        assert Cart.objects.count() == 0
+
+    def test_cart_is_created_when_touched(self, product):
+        client = Client()
+
+        response = client.post(f'/cart/add/{product.slug}/', {'quantity': 1})
+
+        assert response.status_code == 200
+        assert len(RedisCart.from_session(client.session).get_items()) == 1
+        assert 'sessionid' in response.cookies
+
+    def test_anonymous_badge_count_needs_no_cart_queries(self, product):
+        client = Client()
+        client.post(f'/cart/add/{product.slug}/', {'quantity': 2})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get('/')
+
+        assert '<span class="cart-badge" id="cart-badge">2</span>' in response.content.decode()
+        assert cart_queries(queries.captured_queries) == []
+
+    def test_user_badge_count_comes_from_stored_summary(self, client, user, product):
+        Cart.for_user(user).add_product(product, None, 2)
+        client.force_login(user)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get('/')
+
+        assert '<span class="cart-badge" id="cart-badge">2</span>' in response.content.decode()
+        assert len(cart_queries(queries.captured_queries)) == 1
+
+
+@pytest.mark.django_db
+class TestCartSummary:
+
+    def test_summary_without_session(self):
+        request = RequestFactory().get('/')
+        request.session = Client().session
+
+        assert get_cart_summary(request) == {'total_items': 0, 'subtotal': Decimal('0')}
+
+    def test_summary_matches_item_totals(self, cart_with_items, settings, django_assert_num_queries):
+        settings.CART_STORAGE = {**settings.CART_STORAGE, 'ANONYMOUS': 'cart.models.Cart'}
+        request = RequestFactory().get('/')
+        request.session = type('Session', (), {'session_key': cart_with_items.session_key})()
+
+        with django_assert_num_queries(1):
+            summary = get_cart_summary(request)
+            get_cart_summary(request)
+
+        assert summary == {
+            'total_items': cart_with_items.total_items,
+            'subtotal': cart_with_items.subtotal,
+        }
@@ -0,0 +1,150 @@
+import pytest
+from django.test import Client
+from rest_framework import status
+
+from cart.models import Cart
+from cart.storage import KEY, RedisCart
+from marketplace.redis_client import get_redis
+from orders.models import Order
+
+
+@pytest.mark.django_db
+class TestRedisCart:
+
+    def test_add_update_and_remove(self, product, product_with_discount):
+        cart = RedisCart('token')
+
+        first = cart.add_product(product, None, 2)
+        cart.add_product(product_with_discount, None, 1)
+        cart.add_product(product, None, 1)
+
+        assert cart.total_items == 4
+        assert cart.subtotal == product.price * 3 + product_with_discount.price
+        assert [item.product for item in cart.get_items()] == [product_with_discount, product]
+
+        assert cart.update_item_quantity(first.id, 5)
+        assert cart.get_item(first.id).quantity == 5
+        assert cart.remove_item(first.id)
+        assert cart.get_item(first.id) is None
+        assert not cart.update_item_quantity('missing', 1)
+        assert not cart.remove_item('seq')
+
+        cart.clear()
+        assert cart.total_items == 0
+        assert get_redis().exists(KEY.format('token')) == 0
+
+    def test_deleted_products_are_skipped(self, product, product_with_discount):
+        cart = RedisCart('token')
+        cart.add_product(product, None, 1)
+        cart.add_product(product_with_discount, None, 1)
+        product_with_discount.delete()
+
+        assert [item.product for item in RedisCart('token').get_items()] == [product]
+        assert RedisCart('token').total_items == 1
+
+
+@pytest.mark.django_db
+class TestAnonymousCartViews:
+
+    def test_api_cart_lives_in_redis(self, api_client, product):
+        response = api_client.post('/api/cart/add/', {'product_id': product.id, 'quantity': 2}, format='json')
+        item_id = response.data['cart']['items'][0]['id']
+
+        response = api_client.patch(f'/api/cart/update/{item_id}/', {'quantity': 3}, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['cart']['total_items'] == 3
+        assert response.data['cart']['subtotal'] == product.price * 3
+        assert Cart.objects.count() == 0
+
+        response = api_client.delete(f'/api/cart/remove/{item_id}/')
+
+        assert response.data['cart']['total_items'] == 0
+
+    def test_api_remove_rejects_sequence_field(self, api_client, product, product_with_discount):
+        api_client.post('/api/cart/add/', {'product_id': product.id}, format='json')
+
+        response = api_client.delete('/api/cart/remove/seq/')
+        assert response.data['cart']['total_items'] == 1
+
+        response = api_client.post('/api/cart/add/', {'product_id': product_with_discount.id}, format='json')
+
+        assert {item['product']['id'] for item in response.data['cart']['items']} == {
+            product.id, product_with_discount.id,
+        }
+
+    def test_htmx_views_work_on_redis_cart(self, product_with_sizes):
+        client = Client()
+        product_size = product_with_sizes.product_sizes.first()
+        client.post(f'/cart/add/{product_with_sizes.slug}/', {'quantity': 1, 'size_id': product_size.id})
+        item = RedisCart.from_session(client.session).get_items()[0]
+
+        response = client.post(f'/cart/update/{item.id}/', {'quantity': 2}, HTTP_HX_REQUEST='true')
+
+        assert response.status_code == 200
+        assert response.context['cart'].total_items == 2
+        assert response.context['cart_items'][0].product_size == product_size
+
+        response = client.post(f'/cart/update/{item.id}/', {'quantity': 99})
+
+        assert response.status_code == 400
+        assert client.post('/cart/update/999/', {'quantity': 1}).status_code == 404
+        assert Cart.objects.count() == 0
+
+
+@pytest.mark.django_db
+class TestMergeOnLogin:
+
+    def test_session_cart_merges_into_user_cart(self, client, user, product, product_with_discount):
+        Cart.for_user(user).add_product(product, None, 1)
+        client.post(f'/cart/add/{product.slug}/', {'quantity': 2})
+        client.post(f'/cart/add/{product_with_discount.slug}/', {'quantity': 1})
+        token = client.session['cart_token']
+
+        client.force_login(user)
+        response = client.get('/cart/count/')
+
+        cart = Cart.objects.get(user=user)
+        assert response.json()['total_items'] == 4
+        assert dict(cart.items.values_list('product_id', 'quantity')) == {
+            product.id: 3,
+            product_with_discount.id: 1,
+        }
+        assert cart.subtotal == product.price * 3 + product_with_discount.price
+        assert get_redis().exists(KEY.format(token)) == 0
+        assert 'cart_token' not in client.session
+
+    def test_merge_caps_sized_items_at_stock(self, client, user, product_with_sizes):
+        product_size = product_with_sizes.product_sizes.first()
+        Cart.for_user(user).add_product(product_with_sizes, product_size, 8)
+        client.post(f'/cart/add/{product_with_sizes.slug}/', {'quantity': 5, 'size_id': product_size.id})
+
+        client.force_login(user)
+        client.get('/cart/count/')
+
+        assert Cart.objects.get(user=user).items.get().quantity == product_size.stock
+
+    def test_api_login_merges_session_cart(self, api_client, user, product):
+        api_client.post('/api/cart/add/', {'product_id': product.id, 'quantity': 2}, format='json')
+
+        response = api_client.post('/api/auth/login/', {'email': user.email, 'password': 'testpass123'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert Cart.objects.get(user=user).total_items == 2
+
+        api_client.credentials(HTTP_AUTHORIZATION=f"Token {response.data['token']}")
+        response = api_client.get('/api/cart/')
+
+        assert response.data['total_items'] == 2
+        assert response.data['subtotal'] == product.price * 2
+
+    def test_checkout_uses_user_cart(self, auth_client, user, product):
+        product.stock = 5
+        product.save(update_fields=['stock'])
+        Cart.for_user(user).add_product(product, None, 2)
+
+        response = auth_client.post('/api/orders/checkout/', {'first_name': 'Test', 'last_name': 'User'})
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert Order.objects.get(pk=response.data['order_id']).total_price == product.price * 2
+        assert Cart.objects.get(user=user).total_items == 0
@@ -0,0 +1,81 @@
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from main import search
+from main.models import Product
+
+
+@pytest.fixture
+def catalog(db, settings, category, seller):
+    settings.CATALOG_PAGE_SIZE = 2
+    return [
+        Product.objects.create(
+            name=f'Product {i}',
+            slug=f'product-{i}',
+            category=category,
+            price=Decimal(f'{100 * (i % 3)}.00'),
+            seller=seller,
+        )
+        for i in range(5)
+    ]
+
+
+def page_slugs(response):
+    return [product.slug for product in response.context['products']]
+
+
+def scroll(client, params):
+    response = client.get('/catalog/', params, HTTP_HX_REQUEST='true')
+    slugs = page_slugs(response)
+
+    for _ in range(10):
+        if not response.context['next_url']:
+            return response, slugs
+        response = client.get(response.context['next_url'], HTTP_HX_REQUEST='true')
+        assert [template.name for template in response.templates] == ['main/catalog_products.html']
+        slugs += page_slugs(response)
+    pytest.fail('scrolling did not terminate')
+
+
+@pytest.mark.django_db
+class TestCatalogPagination:
+
+    def test_scrolling_walks_every_product_once(self, client, catalog):
+        response, slugs = scroll(client, {'sort': 'price_asc'})
+
+        expected = sorted(catalog, key=lambda product: (product.price, product.pk))
+        assert slugs == [product.slug for product in expected]
+        assert b'hx-trigger="revealed"' not in response.content
+
+    def test_scrolling_ranked_search(self, client, catalog):
+        response, slugs = scroll(client, {'q': 'product'})
+
+        assert slugs == [product.slug for product in reversed(catalog)]
+
+    def test_unranked_search_falls_back_to_sort(self, client, catalog, monkeypatch):
+        assert page_slugs(client.get('/catalog/', {'q': '!!'})) == []
+
+        monkeypatch.setattr(search, 'full_text_enabled', lambda: False)
+        response, slugs = scroll(client, {'q': 'product'})
+
+        assert slugs == [product.slug for product in reversed(catalog)]
+
+    def test_fragment_skips_facets(self, client, catalog):
+        first = client.get('/catalog/', HTTP_HX_REQUEST='true')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(first.context['next_url'], HTTP_HX_REQUEST='true')
+
+        assert len([q for q in queries if 'SAVEPOINT' not in q['sql']]) == 1
+        assert response.content.count(b'product-card') == 2
+        assert b'hx-trigger="revealed"' in response.content
+
+    def test_invalid_cursor(self, client, catalog):
+        fragment = client.get('/catalog/', {'cursor': 'garbage'}, HTTP_HX_REQUEST='true')
+        page = client.get('/catalog/', {'cursor': 'garbage'})
+
+        assert page_slugs(fragment) == []
+        assert page_slugs(page) == ['product-4', 'product-3']
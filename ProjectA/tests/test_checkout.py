@@ -0,0 +1,148 @@
+import threading
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Sum
+from rest_framework import status
+
+from cart.models import Cart
+from main.models import Product, ProductSize
+from orders.models import Order, OrderItem
+from orders.services import EmptyCart, InsufficientStock, place_order
+from recommendations.models import ProductScore
+
+
+User = get_user_model()
+
+
+def details(user):
+    return {'first_name': 'Test', 'last_name': 'User', 'email': user.email}
+
+
+@pytest.fixture
+def stocked_product(product):
+    product.stock = 5
+    product.save(update_fields=['stock'])
+    return product
+
+
+@pytest.mark.django_db
+class TestPlaceOrder:
+
+    def test_order_decrements_stock_and_clears_cart(self, user, stocked_product, product_with_sizes):
+        product_size = product_with_sizes.product_sizes.first()
+        cart = Cart.for_user(user)
+        cart.add_product(stocked_product, None, 2)
+        cart.add_product(product_with_sizes, product_size, 3)
+
+        order = place_order(cart, user, **details(user))
+
+        assert order.total_price == stocked_product.price * 2 + product_with_sizes.price * 3
+        assert set(order.items.values_list('product_id', 'size_id', 'quantity')) == {
+            (stocked_product.id, None, 2),
+            (product_with_sizes.id, product_size.id, 3),
+        }
+        product_size.refresh_from_db()
+        product_with_sizes.refresh_from_db()
+        stocked_product.refresh_from_db()
+        assert product_size.stock == 7
+        assert product_with_sizes.stock == 10 * product_with_sizes.product_sizes.count() - 3
+        assert stocked_product.stock == 3
+        assert cart.total_items == 0
+        assert ProductScore.objects.get(product=stocked_product).total_sales == 1
+
+    def test_selling_out_updates_availability(self, user, stocked_product):
+        cart = Cart.for_user(user)
+        cart.add_product(stocked_product, None, 5)
+
+        place_order(cart, user, **details(user))
+
+        stocked_product.refresh_from_db()
+        assert stocked_product.stock == 0
+        assert not stocked_product.is_in_stock
+
+    def test_short_stock_rejects_whole_order(self, user, stocked_product, product_with_sizes):
+        product_size = product_with_sizes.product_sizes.first()
+        cart = Cart.for_user(user)
+        cart.add_product(stocked_product, None, 1)
+        cart.add_product(product_with_sizes, product_size, 11)
+
+        with pytest.raises(InsufficientStock) as error:
+            place_order(cart, user, **details(user))
+
+        assert error.value.shortages == [{
+            'product_id': product_with_sizes.id,
+            'product_size_id': product_size.id,
+            'name': product_with_sizes.name,
+            'requested': 11,
+            'available': 10,
+        }]
+        assert Order.objects.count() == 0
+        assert ProductSize.objects.get(pk=product_size.pk).stock == 10
+        assert Product.objects.get(pk=stocked_product.pk).stock == 5
+        assert cart.total_items == 12
+
+    def test_empty_cart_is_rejected(self, user):
+        with pytest.raises(EmptyCart):
+            place_order(Cart.for_user(user), user, **details(user))
+
+    def test_query_count_does_not_depend_on_lines(self, user, products, django_assert_max_num_queries):
+        Product.objects.update(stock=10)
+        cart = Cart.for_user(user)
+        for product in products:
+            cart.add_product(product, None, 1)
+
+        with django_assert_max_num_queries(17):
+            order = place_order(cart, user, **details(user))
+
+        assert OrderItem.objects.filter(order=order).count() == len(products)
+
+    def test_api_reports_shortages(self, auth_client, user, stocked_product):
+        Cart.for_user(user).add_product(stocked_product, None, 6)
+
+        response = auth_client.post('/api/orders/checkout/', {'first_name': 'Test', 'last_name': 'User'})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['shortages'][0]['available'] == 5
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConcurrentCheckout:
+
+    def test_parallel_checkouts_never_oversell(self, product_with_sizes):
+        product_size = product_with_sizes.product_sizes.first()
+        ProductSize.objects.filter(pk=product_size.pk).update(stock=3)
+
+        buyers = []
+        for index in range(8):
+            buyer = User.objects.create_user(
+                email=f'buyer{index}@example.com', password='testpass123', first_name='Buyer', last_name=str(index),
+            )
+            Cart.for_user(buyer).add_product(product_with_sizes, product_size, 1)
+            buyers.append(buyer)
+
+        barrier = threading.Barrier(len(buyers))
+        results = []
+
+        def buy(buyer):
+            try:
+                barrier.wait()
+                place_order(Cart.objects.get(user=buyer), buyer, **details(buyer))
+                results.append('ok')
+            except InsufficientStock:
+                results.append('short')
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=buy, args=(buyer,)) for buyer in buyers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results.count('ok') == 3
+        assert results.count('short') == 5
+        assert ProductSize.objects.get(pk=product_size.pk).stock == 0
+        assert OrderItem.objects.filter(size=product_size).count() == 3
+        assert Order.objects.aggregate(total=Sum('total_price'))['total'] == product_with_sizes.price * 3
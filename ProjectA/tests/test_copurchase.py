@@ -0,0 +1,116 @@
+from decimal import Decimal
+
+import pytest
+
+from main.models import Category, Product
+from orders.models import Order, OrderItem
+from recommendations.copurchase import build_copurchase, rebuild_copurchase
+from recommendations.engine import RecommendationEngine
+from recommendations.models import ProductCoPurchase
+
+
+def make_order(user, products):
+    order = Order.objects.create(
+        user=user,
+        first_name='Test',
+        last_name='User',
+        email=user.email,
+        total_price=Decimal('0'),
+    )
+    for product in products:
+        OrderItem.objects.create(order=order, product=product, quantity=1, price=product.price)
+    return order
+
+
+def copurchase_counts():
+    return {
+        (row.product_id, row.other_product_id): row.count
+        for row in ProductCoPurchase.objects.all()
+    }
+
+
+@pytest.fixture
+def engines():
+    return (
+        RecommendationEngine(Product, OrderItem),
+        RecommendationEngine(Product, OrderItem, copurchase_model=ProductCoPurchase),
+    )
+
+
+@pytest.mark.django_db
+class TestCoPurchaseBuilder:
+
+    def test_counts_pairs_in_both_directions(self, user, products):
+        first, second, third = products[:3]
+        make_order(user, [first, second])
+        make_order(user, [first, second, third])
+
+        assert build_copurchase(settle_seconds=0) == 2
+        assert copurchase_counts() == {
+            (first.pk, second.pk): 2, (second.pk, first.pk): 2,
+            (first.pk, third.pk): 1, (third.pk, first.pk): 1,
+            (second.pk, third.pk): 1, (third.pk, second.pk): 1,
+        }
+
+    def test_only_new_orders_are_consumed(self, user, products):
+        first, second = products[:2]
+        make_order(user, [first, second])
+        build_copurchase(settle_seconds=0)
+
+        assert build_copurchase(settle_seconds=0) == 0
+        assert copurchase_counts()[first.pk, second.pk] == 1
+
+        make_order(user, [first, second])
+
+        assert build_copurchase(settle_seconds=0) == 1
+        assert copurchase_counts()[first.pk, second.pk] == 2
+
+    def test_recent_orders_wait_for_settle_window(self, user, products):
+        make_order(user, products[:2])
+
+        assert build_copurchase(settle_seconds=600) == 0
+        assert ProductCoPurchase.objects.count() == 0
+
+    def test_batches_match_single_pass(self, user, products):
+        for i in range(5):
+            make_order(user, products[i:i + 3])
+
+        build_copurchase(batch_size=2, settle_seconds=0)
+        batched = copurchase_counts()
+
+        rebuild_copurchase(settle_seconds=0)
+
+        assert copurchase_counts() == batched
+
+
+@pytest.mark.django_db
+class TestCoPurchaseLookups:
+
+    def test_also_bought_matches_self_join(self, engines, user, products):
+        first, second, third, fourth = products[:4]
+        make_order(user, [first, second, third])
+        make_order(user, [first, second])
+        make_order(user, [first, fourth])
+        make_order(user, [second, third])
+        build_copurchase(settle_seconds=0)
+
+        old, new = engines
+        expected = set(old.get_also_bought(first))
+        result = list(new.get_also_bought(first))
+
+        assert set(result) == expected
+        assert result[0] == second
+
+    def test_cross_sell_excludes_cart_categories(self, engines, user, products, seller):
+        accessories = Category.objects.create(name='Аксесуари', slug='aksesuari')
+        case = Product.objects.create(
+            name='Чохол', slug='chokhol', category=accessories, price=Decimal('500.00'), seller=seller,
+        )
+        make_order(user, [products[0], products[1], case])
+        make_order(user, [products[0], case])
+        build_copurchase(settle_seconds=0)
+
+        old, new = engines
+
+        assert list(new.get_cross_sell([products[0]])) == [case]
+        assert list(old.get_cross_sell([products[0]])) == [case]
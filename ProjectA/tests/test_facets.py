@@ -0,0 +1,90 @@
+import pytest
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+from main.facets import facet_counts
+from main.models import Product
+from main.views import CatalogView
+
+
+@pytest.fixture
+def catalog(product, product_with_discount, product_with_sizes):
+    return [product, product_with_discount, product_with_sizes]
+
+
+@pytest.mark.django_db
+class TestFacetCounts:
+
+    def test_counts_every_facet_in_one_query(self, catalog):
+        with CaptureQueriesContext(connection) as queries:
+            facets = facet_counts(Product.objects.all(), {})
+
+        assert len(queries) == 1
+        assert facets['total'] == 3
+        assert facets['category'] == {'smartfoni': 2, 'odyag': 1}
+        assert facets['color'] == {'Black': 1, 'Blue': 1, 'White': 1}
+        assert facets['size'] == {'L': 1, 'M': 1, 'S': 1, 'XL': 1}
+        assert facets['price']['1000-2500'] == 1
+        assert facets['price']['25000+'] == 2
+        assert sum(facets['price'].values()) == 3
+        assert facets['discount'] == {'true': 1, 'false': 2}
+        assert facets['in_stock']['true'] == 1
+
+    def test_facet_ignores_its_own_filter(self, catalog):
+        facets = facet_counts(Product.objects.all(), {'color': 'black', 'max_price': '45000'})
+
+        assert facets['total'] == 0
+        assert facets['color'] == {'Blue': 1, 'White': 1}
+        assert facets['price']['25000+'] == 1
+        assert facets['category'] == {}
+
+    def test_sold_out_sizes_are_not_counted(self, product_with_sizes):
+        product_with_sizes.product_sizes.filter(size__name='XL').update(stock=0)
+
+        facets = facet_counts(Product.objects.all(), {'size': 'XL'})
+
+        assert facets['total'] == 0
+        assert facets['size'] == {'L': 1, 'M': 1, 'S': 1}
+
+
+@pytest.mark.django_db
+class TestFacetViews:
+
+    def test_api_facets_follow_list_filters(self, api_client, catalog):
+        params = {'color': 'blu', 'search': 'футболка'}
+
+        facets = api_client.get('/api/products/facets/', params)
+        products = api_client.get('/api/products/', params)
+
+        assert facets.status_code == status.HTTP_200_OK
+        assert facets.data['total'] == len(products.data['results']) == 1
+        assert facets.data['category'] == {'odyag': 1}
+
+    def test_api_facets_follow_filterset_fields(self, api_client, catalog):
+        cases = [
+            ({'is_bestseller': 'true'}, {'smartfoni': 1}),
+            ({'category': catalog[2].category_id}, {'odyag': 1}),
+        ]
+
+        for params, categories in cases:
+            facets = api_client.get('/api/products/facets/', params)
+            products = api_client.get('/api/products/', params)
+
+            assert facets.status_code == status.HTTP_200_OK
+            assert facets.data['total'] == len(products.data['results']) == 1
+            assert facets.data['category'] == categories
+
+    def test_catalog_counts_categories_and_sizes(self, catalog):
+        request = RequestFactory().get('/catalog/', {'color': 'white'})
+        view = CatalogView()
+        view.setup(request)
+
+        context = view.get_context_data()
+
+        assert list(context['products']) == [catalog[1]]
+        assert {category.slug: category.facet_count for category in context['categories']} == {
+            'smartfoni': 1, 'odyag': 0,
+        }
+        assert {size.name: size.facet_count for size in context['sizes']} == {'S': 0, 'M': 0, 'L': 0, 'XL': 0}
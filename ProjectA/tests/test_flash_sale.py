@@ -0,0 +1,150 @@
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from cart.models import Cart
+from marketplace.redis_client import get_redis
+from orders import flash_sale
+from orders.flash_sale import WORKER_KEY, enqueue_checkout, get_ticket, process_queue
+from orders.models import Order
+
+
+User = get_user_model()
+
+
+def details(user):
+    return {'first_name': 'Test', 'last_name': 'User', 'email': user.email}
+
+
+@pytest.fixture
+def flash_product(product):
+    product.stock = 1
+    product.flash_sale = True
+    product.save(update_fields=['stock', 'flash_sale'])
+    return product
+
+
+@pytest.fixture
+def buyers(db):
+    return [
+        User.objects.create_user(
+            email=f'buyer{index}@example.com', password='testpass123', first_name='Buyer', last_name=str(index),
+        )
+        for index in range(3)
+    ]
+
+
+@pytest.mark.django_db
+class TestFlashSaleQueue:
+
+    def test_checkout_returns_ticket(self, auth_client, user, flash_product):
+        Cart.for_user(user).add_product(flash_product, None, 1)
+
+        response = auth_client.post('/api/orders/checkout/', {'first_name': 'Test', 'last_name': 'User'})
+
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert response.data['status'] == 'queued'
+        assert response.data['position'] == 1
+        assert Order.objects.count() == 0
+
+        assert process_queue() == 1
+
+        response = auth_client.get(f"/api/orders/tickets/{response.data['ticket']}/")
+
+        assert response.data['status'] == 'completed'
+        assert Order.objects.get(pk=response.data['order_id']).user == user
+        assert Cart.for_user(user).total_items == 0
+
+    def test_tickets_are_admitted_in_order(self, buyers, flash_product):
+        tickets = []
+        for buyer in buyers:
+            Cart.for_user(buyer).add_product(flash_product, None, 1)
+            tickets.append(enqueue_checkout(buyer, details(buyer)))
+
+        assert [get_ticket(ticket, buyer)['position'] for ticket, buyer in zip(tickets, buyers)] == [1, 2, 3]
+
+        process_queue()
+
+        results = [get_ticket(ticket, buyer) for ticket, buyer in zip(tickets, buyers)]
+        assert [result['status'] for result in results] == ['completed', 'rejected', 'rejected']
+        assert results[1]['shortages'][0]['available'] == 0
+        assert Order.objects.get().user == buyers[0]
+
+    def test_worker_slots_are_bounded(self, settings, user, flash_product):
+        settings.FLASH_SALE = {**settings.FLASH_SALE, 'WORKERS': 1}
+        Cart.for_user(user).add_product(flash_product, None, 1)
+        ticket = enqueue_checkout(user, details(user))
+        get_redis().set(WORKER_KEY.format(0), 'busy', nx=True)
+
+        assert process_queue() == 0
+        assert get_ticket(ticket, user)['status'] == 'queued'
+
+        get_redis().delete(WORKER_KEY.format(0))
+
+        assert process_queue() == 1
+
+    def test_tickets_are_private(self, user, buyers, flash_product):
+        Cart.for_user(user).add_product(flash_product, None, 1)
+        ticket = enqueue_checkout(user, details(user))
+        client = APIClient()
+        client.force_authenticate(buyers[0])
+
+        response = client.get(f'/api/orders/tickets/{ticket}/')
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_unexpected_failure_marks_ticket(self, monkeypatch, buyers, flash_product):
+        tickets = []
+        for buyer in buyers[:2]:
+            Cart.for_user(buyer).add_product(flash_product, None, 1)
+            tickets.append(enqueue_checkout(buyer, details(buyer)))
+        place_order = flash_sale.place_order
+        calls = []
+
+        def flaky(*args, **kwargs):
+            calls.append(1)
+            if len(calls) == 1:
+                raise RuntimeError('deadlock detected')
+            return place_order(*args, **kwargs)
+
+        monkeypatch.setattr(flash_sale, 'place_order', flaky)
+
+        assert process_queue() == 2
+        assert get_ticket(tickets[0], buyers[0])['status'] == 'error'
+        assert get_ticket(tickets[1], buyers[1])['status'] == 'completed'
+
+    def test_local_queue_is_drained_inline(self, auth_client, user, flash_product,
+                                           django_capture_on_commit_callbacks):
+        Cart.for_user(user).add_product(flash_product, None, 1)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = auth_client.post('/api/orders/checkout/', {'first_name': 'Test', 'last_name': 'User'})
+
+        assert not flash_sale.queue_is_shared()
+        ticket = auth_client.get(f"/api/orders/tickets/{response.data['ticket']}/")
+        assert ticket.data['status'] == 'completed'
+
+    def test_html_checkout_queues_flash_sale_carts(self, client, user, flash_product,
+                                                   django_capture_on_commit_callbacks):
+        client.force_login(user)
+        Cart.for_user(user).add_product(flash_product, None, 1)
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            response = client.post('/orders/checkout/', {
+                'first_name': 'Test', 'last_name': 'User', 'email': user.email,
+            }, HTTP_HX_REQUEST='true')
+
+        ticket = response.context['ticket']
+        assert ticket['status'] == 'queued'
+        assert b'hx-trigger="every 2s"' in response.content
+        assert Order.objects.count() == 0
+
+        for callback in callbacks:
+            callback()
+        response = client.get(f"/orders/tickets/{ticket['ticket']}/", HTTP_HX_REQUEST='true')
+
+        assert response.context['ticket']['status'] == 'completed'
+        assert b'hx-trigger' not in response.content
+        assert client.get('/orders/tickets/missing/').status_code == status.HTTP_404_NOT_FOUND
+
@@ -1,6 +1,7 @@
 import pytest
 from decimal import Decimal
-from django.db import IntegrityError
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
 
 from main.models import Category, Product, Size, ProductSize
 from cart.models import Cart, CartItem
@@ -174,4 +175,105 @@ class TestCartItemModel:
             quantity=1
         )
 
-        assert item.product_size == ps
\ No newline at end of file
+        assert item.product_size == ps
+
+@pytest.mark.django_db
+class TestStockProjection:
+
+    def test_sized_product_stock_from_sizes(self, product_with_sizes):
+        product_with_sizes.refresh_from_db()
+
+        assert product_with_sizes.stock == 40
+        assert product_with_sizes.is_in_stock
+
+    def test_sized_product_out_of_stock(self, product_with_sizes):
+        product_with_sizes.product_sizes.update(stock=0)
+        for ps in product_with_sizes.product_sizes.all():
+            ps.save()
+        product_with_sizes.refresh_from_db()
+
+        assert product_with_sizes.stock == 0
+        assert not product_with_sizes.is_in_stock
+
+    def test_size_delete_updates_stock(self, product_with_sizes):
+        product_with_sizes.product_sizes.first().delete()
+        product_with_sizes.refresh_from_db()
+
+        assert product_with_sizes.stock == 30
+
+    def test_unsized_product_flag_follows_stock(self, product):
+        assert not product.is_in_stock
+
+        product.stock = 5
+        product.save(update_fields=['stock'])
+        product.refresh_from_db()
+
+        assert product.is_in_stock
+
+    def test_sized_product_ignores_manual_stock(self, product_with_sizes):
+        product_with_sizes.stock = 999
+        product_with_sizes.save()
+        product_with_sizes.refresh_from_db()
+
+        assert product_with_sizes.stock == 40
+
+    def test_unrelated_save_skips_stock_refresh(self, product_with_sizes):
+        product = Product.objects.get(pk=product_with_sizes.pk)
+        product.price = Decimal('100.00')
+
+        with CaptureQueriesContext(connection) as queries:
+            product.save()
+
+        assert not [q for q in queries if 'main_productsize' in q['sql']]
+
+    def test_category_change_refreshes_stock(self, product_with_sizes, category, category_with_sizes):
+        Product.objects.filter(pk=product_with_sizes.pk).update(category=category, stock=5)
+        product = Product.objects.get(pk=product_with_sizes.pk)
+
+        product.category = category_with_sizes
+        product.save()
+        product.refresh_from_db()
+
+        assert product.stock == 40
+
+
+@pytest.mark.django_db
+class TestCartSummary:
+
+    def test_summary_follows_cart_mutations(self, cart_with_items, product):
+        item = cart_with_items.items.get(product=product)
+
+        cart_with_items.update_item_quantity(item.id, 5)
+        assert cart_with_items.total_items == 6
+
+        cart_with_items.remove_item(item.id)
+        cart_with_items.refresh_from_db()
+        assert cart_with_items.total_items == 1
+        assert cart_with_items.subtotal == Decimal('39999.00')
+
+        cart_with_items.clear()
+        cart_with_items.refresh_from_db()
+        assert cart_with_items.total_items == 0
+        assert cart_with_items.subtotal == 0
+
+    def test_summary_is_one_aggregate(self, cart_with_items, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            summary = cart_with_items.summary()
+
+        assert summary == {'total_items': 3, 'subtotal': Decimal('139997.00')}
+
+    def test_price_change_refreshes_subtotal(self, cart_with_items, product):
+        product.price = Decimal('100.00')
+        product.save()
+
+        cart_with_items.refresh_from_db()
+        assert cart_with_items.subtotal == Decimal('200.00') + Decimal('39999.00')
+
+    def test_count_endpoint_does_not_scan_items(self, api_client, product):
+        api_client.post('/api/cart/add/', {'product_id': product.id, 'quantity': 2}, format='json')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get('/api/cart/count/')
+
+        assert response.data == {'total_items': 2, 'subtotal': 99998.0}
+        assert not [query for query in queries.captured_queries if 'cart_cartitem' in query['sql']]
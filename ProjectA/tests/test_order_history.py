@@ -0,0 +1,90 @@
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.test import RequestFactory
+from django.utils import timezone
+from rest_framework import status
+
+from orders.history import history_page
+from orders.models import Order, OrderItem
+from orders.views import OrderHistoryView
+
+
+@pytest.fixture
+def orders(user, product, product_with_discount):
+    created_at = timezone.now()
+    orders = []
+    for index in range(5):
+        order = Order.objects.create(
+            user=user, first_name='Test', last_name='User', email=user.email, total_price=Decimal('100.00'),
+        )
+        OrderItem.objects.create(order=order, product=product, quantity=index + 1, price=product.price)
+        OrderItem.objects.create(order=order, product=product_with_discount, quantity=1, price=product.price)
+        orders.append(order)
+    Order.objects.filter(pk__in=[order.pk for order in orders[:3]]).update(created_at=created_at)
+    for index, order in enumerate(orders[3:], start=1):
+        Order.objects.filter(pk=order.pk).update(created_at=created_at - timedelta(days=index))
+    return orders
+
+
+@pytest.mark.django_db
+class TestHistoryPage:
+
+    def test_pages_follow_created_at_and_id(self, user, seller, orders):
+        Order.objects.create(
+            user=seller, first_name='Other', last_name='User', email=seller.email, total_price=Decimal('1.00'),
+        )
+        pages, cursor = [], None
+        while True:
+            page, cursor = history_page(user, cursor, page_size=2)
+            pages.append([order.pk for order in page])
+            if cursor is None:
+                break
+
+        ids = [order.pk for order in orders]
+        assert pages == [[ids[2], ids[1]], [ids[0], ids[3]], [ids[4]]]
+
+    def test_page_is_one_query_with_annotations(self, user, orders, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            page, _ = history_page(user, page_size=10)
+
+        assert [(order.items_count, order.items_quantity) for order in page] == [(2, 4), (2, 3), (2, 2), (2, 5), (2, 6)]
+
+    def test_invalid_cursor(self, user):
+        with pytest.raises(ValueError):
+            history_page(user, 'not-a-cursor')
+
+
+@pytest.mark.django_db
+class TestOrderHistoryViews:
+
+    def test_api_list_is_cursor_paginated(self, settings, auth_client, orders):
+        settings.ORDER_HISTORY_PAGE_SIZE = 3
+
+        response = auth_client.get('/api/orders/')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [order['id'] for order in response.data['results']] == [orders[2].pk, orders[1].pk, orders[0].pk]
+        assert response.data['results'][0]['items_count'] == 2
+        assert response.data['results'][0]['items_quantity'] == 4
+
+        response = auth_client.get(response.data['next'])
+
+        assert [order['id'] for order in response.data['results']] == [orders[3].pk, orders[4].pk]
+        assert response.data['next'] is None
+
+    def test_api_rejects_bad_cursor(self, auth_client):
+        response = auth_client.get('/api/orders/', {'cursor': '!!'})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_html_history_pages(self, settings, user, orders):
+        settings.ORDER_HISTORY_PAGE_SIZE = 4
+        request = RequestFactory().get('/orders/history/', HTTP_HX_REQUEST='true')
+        request.user = user
+
+        response = OrderHistoryView.as_view()(request)
+
+        assert len(response.context_data['orders']) == 4
+        assert response.context_data['next_cursor']
@@ -0,0 +1,140 @@
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.utils import timezone
+
+from main.models import Product
+from orders.models import Order, OrderItem
+from recommendations.engine import RecommendationEngine
+from recommendations.models import ProductScore
+from recommendations.scores import refresh_scores
+from reviews.models import Review
+
+
+def make_order(user, products, days_ago=0):
+    order = Order.objects.create(
+        user=user,
+        first_name='Test',
+        last_name='User',
+        email=user.email,
+        total_price=Decimal('0'),
+    )
+    for product in products:
+        OrderItem.objects.create(order=order, product=product, quantity=1, price=product.price)
+    if days_ago:
+        Order.objects.filter(pk=order.pk).update(created_at=timezone.now() - timedelta(days=days_ago))
+    return order
+
+
+def score_of(product):
+    return ProductScore.objects.get(product=product)
+
+
+@pytest.fixture
+def engines():
+    return (
+        RecommendationEngine(Product, OrderItem, Review),
+        RecommendationEngine(Product, OrderItem, Review, score_model=ProductScore),
+    )
+
+
+@pytest.mark.django_db
+class TestProductScoreEvents:
+
+    def test_new_product_gets_empty_score(self, product):
+        score = score_of(product)
+
+        assert score.total_sales == 0
+        assert score.trend_score == 0
+
+    def test_order_items_record_sales(self, user, products):
+        make_order(user, [products[0], products[1]])
+        make_order(user, [products[0]])
+
+        score = score_of(products[0])
+        assert score.sales_7d == 2
+        assert score.sales_30d == 2
+        assert score.total_sales == 2
+        assert score.trend_score == 2 * ProductScore.TREND_SALES_WEIGHT
+
+    def test_reviews_update_rating(self, user, seller, product):
+        Review.objects.create(product=product, user=user, rating=5)
+        review = Review.objects.create(product=product, user=seller, rating=2)
+
+        score = score_of(product)
+        assert score.avg_rating == Decimal('3.50')
+        assert score.reviews_count == 2
+
+        review.delete()
+
+        score = score_of(product)
+        assert score.avg_rating == Decimal('5.00')
+        assert score.reviews_count == 1
+
+
+@pytest.mark.django_db
+class TestProductScoreRefresh:
+
+    def test_sales_windows_decay(self, user, product):
+        make_order(user, [product], days_ago=10)
+        make_order(user, [product], days_ago=40)
+        Product.objects.filter(pk=product.pk).update(views_count=7)
+
+        refresh_scores()
+
+        score = score_of(product)
+        assert score.sales_7d == 0
+        assert score.sales_30d == 1
+        assert score.total_sales == 2
+        assert score.trend_score == 7
+
+    def test_rebuild_recomputes_totals(self, user, product):
+        make_order(user, [product])
+        ProductScore.objects.update(total_sales=0, sales_7d=0, sales_30d=0)
+
+        refresh_scores(rebuild=True)
+
+        score = score_of(product)
+        assert score.total_sales == 1
+        assert score.sales_7d == 1
+        assert score.trend_score == ProductScore.TREND_SALES_WEIGHT
+
+    def test_missing_scores_are_created(self, product):
+        ProductScore.objects.all().delete()
+
+        refresh_scores()
+
+        assert ProductScore.objects.filter(product=product).exists()
+
+
+@pytest.mark.django_db
+class TestScoredRecommendations:
+
+    def test_trending_and_bestsellers_match_annotations(self, engines, user, products):
+        make_order(user, [products[2]] * 3)
+        make_order(user, [products[4], products[2]])
+        make_order(user, [products[4]], days_ago=20)
+        refresh_scores()
+
+        old, new = engines
+
+        assert list(new.get_trending(limit=2)) == list(old.get_trending(limit=2))
+        assert list(new.get_bestsellers(limit=2)) == list(old.get_bestsellers(limit=2))
+
+    def test_top_rated_matches_annotations(self, engines, user, seller, products):
+        Review.objects.create(product=products[0], user=user, rating=3)
+        Review.objects.create(product=products[1], user=user, rating=5)
+        Review.objects.create(product=products[1], user=seller, rating=4)
+
+        old, new = engines
+
+        assert list(new.get_top_rated(min_reviews=1)) == [products[1], products[0]]
+        assert list(new.get_top_rated(min_reviews=1)) == list(old.get_top_rated(min_reviews=1))
+
+    def test_other_trending_windows_use_annotations(self, engines, user, products):
+        make_order(user, [products[1]], days_ago=20)
+
+        old, new = engines
+
+        assert list(new.get_trending(days=30, limit=1)) == [products[1]]
@@ -0,0 +1,105 @@
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test import RequestFactory
+from rest_framework import status
+
+from main import search
+from main.models import Product
+from main.search import search_products
+from main.views import CatalogView
+
+
+postgres_only = pytest.mark.skipif(connection.vendor != 'postgresql', reason='ranking needs PostgreSQL full-text search')
+
+
+@pytest.fixture
+def sneakers(db, category, seller):
+    def create(name, description, slug):
+        return Product.objects.create(
+            name=name, slug=slug, category=category, price=Decimal('1000.00'),
+            description=description, seller=seller,
+        )
+
+    return {
+        'in_name': create('Кросівки Nike Air', 'Легке взуття для бігу', 'nike-air'),
+        'in_description': create('Nike Pegasus', 'Бігові кросівки на кожен день', 'nike-pegasus'),
+        'other': create('Футболка', 'Стовідсоткова бавовна', 'tshirt'),
+    }
+
+
+def catalog_products(query):
+    request = RequestFactory().get('/catalog/', query)
+    view = CatalogView()
+    view.setup(request)
+    return list(view.get_context_data()['products'])
+
+
+@pytest.mark.django_db
+class TestFullTextSearch:
+
+    @postgres_only
+    def test_name_matches_rank_above_description(self, sneakers):
+        results = list(search_products(Product.objects.all(), 'кросівки'))
+
+        assert results == [sneakers['in_name'], sneakers['in_description']]
+
+    @postgres_only
+    def test_terms_match_word_prefixes(self, sneakers):
+        assert list(search_products(Product.objects.all(), 'крос ni')) == [
+            sneakers['in_name'], sneakers['in_description'],
+        ]
+        assert not search_products(Product.objects.all(), 'біг футболка').exists()
+        assert not search_products(Product.objects.all(), '!!!').exists()
+
+    def test_vector_follows_product_edits(self, sneakers):
+        product = sneakers['other']
+        product.name = 'Кросівки Adidas'
+        product.save()
+
+        assert product in search_products(Product.objects.all(), 'adidas')
+        assert not search_products(Product.objects.all(), 'футболка').exists()
+
+    def test_icontains_fallback_without_postgres(self, monkeypatch, product):
+        monkeypatch.setattr(search, 'full_text_enabled', lambda: False)
+
+        assert list(search_products(Product.objects.all(), 'Phone 15')) == [product]
+
+
+@pytest.mark.django_db
+class TestSearchViews:
+
+    @postgres_only
+    def test_api_search_is_ranked(self, api_client, sneakers):
+        response = api_client.get('/api/products/', {'search': 'кросівки'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [item['slug'] for item in response.data['results']] == ['nike-air', 'nike-pegasus']
+
+    @postgres_only
+    def test_api_explicit_ordering_wins(self, api_client, sneakers):
+        Product.objects.filter(pk=sneakers['in_description'].pk).update(price=Decimal('10.00'))
+
+        response = api_client.get('/api/products/', {'search': 'кросівки', 'ordering': 'price'})
+
+        assert [item['slug'] for item in response.data['results']] == ['nike-pegasus', 'nike-air']
+
+    @postgres_only
+    def test_catalog_search_is_ranked(self, sneakers):
+        assert catalog_products({'q': 'кросівки'}) == [sneakers['in_name'], sneakers['in_description']]
+
+    def test_catalog_sort_overrides_rank(self, sneakers):
+        Product.objects.filter(pk=sneakers['in_description'].pk).update(price=Decimal('10.00'))
+
+        assert catalog_products({'q': 'кросівки', 'sort': 'price_asc'})[0] == sneakers['in_description']
+
+    def test_views_fall_back_to_icontains(self, monkeypatch, api_client, sneakers):
+        monkeypatch.setattr(search, 'full_text_enabled', lambda: False)
+        expected = [sneakers['in_description'], sneakers['in_name']]
+
+        response = api_client.get('/api/products/', {'search': 'Nike'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [item['slug'] for item in response.data['results']] == [product.slug for product in expected]
+        assert catalog_products({'q': 'Nike'}) == expected
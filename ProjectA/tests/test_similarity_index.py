@@ -0,0 +1,126 @@
+from decimal import Decimal
+
+import pytest
+
+from main.models import Category, Product
+from orders.models import OrderItem
+from recommendations.engine import RecommendationEngine
+from recommendations.similarity import CategoryIndex, SimilarityIndex
+
+
+@pytest.fixture
+def catalog(db, category, seller):
+    def create(slug, price, color, category=category):
+        return Product.objects.create(
+            name=slug, slug=slug, category=category, price=Decimal(price), color=color, seller=seller,
+        )
+
+    other_category = Category.objects.create(name='Планшети', slug='plansheti')
+    return {
+        'base': create('base', '1000.00', 'Black'),
+        'same_color_close': create('same-color-close', '1100.00', 'black'),
+        'other_color_close': create('other-color-close', '1050.00', 'White'),
+        'same_color_far': create('same-color-far', '9000.00', 'Black'),
+        'other_category': create('other-category', '1000.00', 'Black', other_category),
+    }
+
+
+@pytest.mark.django_db
+class TestSimilarityIndex:
+
+    def test_nearest_prefers_color_and_price(self, catalog):
+        index = SimilarityIndex()
+
+        result = index.similar(catalog['base'], limit=3)
+
+        assert result == [
+            catalog['same_color_close'].pk,
+            catalog['other_color_close'].pk,
+            catalog['same_color_far'].pk,
+        ]
+
+    def test_engine_returns_products_in_one_query(self, catalog, django_assert_num_queries):
+        index = SimilarityIndex()
+        index.similar(catalog['base'])
+        engine = RecommendationEngine(Product, OrderItem, similarity_index=index)
+
+        with django_assert_num_queries(1):
+            result = engine.get_similar_products(catalog['base'], limit=2)
+
+        assert result == [catalog['same_color_close'], catalog['other_color_close']]
+
+    def test_product_save_updates_index_in_place(self, catalog, monkeypatch, django_capture_on_commit_callbacks):
+        index = SimilarityIndex()
+        index.similar(catalog['base'])
+        monkeypatch.setattr(index, 'category', lambda category_id: index.categories[category_id])
+        far = catalog['same_color_far']
+
+        with django_capture_on_commit_callbacks(execute=True):
+            far.price = Decimal('1000.00')
+            index.update_product(far)
+
+        assert index.similar(catalog['base'], limit=1) == [far.pk]
+
+    def test_other_workers_rebuild_changed_category(self, catalog, monkeypatch, django_capture_on_commit_callbacks):
+        worker = SimilarityIndex()
+        worker.similar(catalog['base'])
+        builds = []
+        original_build = CategoryIndex.build
+        monkeypatch.setattr(CategoryIndex, 'build', lambda *args: builds.append(args) or original_build(*args))
+
+        far = catalog['same_color_far']
+        far.price = Decimal('1000.00')
+        with django_capture_on_commit_callbacks(execute=True):
+            far.save()
+
+        assert worker.similar(catalog['base'], limit=1) == [far.pk]
+        assert len(builds) == 1
+
+    def test_interleaved_changes_leave_the_index_stale(self, catalog, django_capture_on_commit_callbacks):
+        worker = SimilarityIndex()
+        worker.similar(catalog['base'])
+        far = catalog['same_color_far']
+
+        with django_capture_on_commit_callbacks(execute=True):
+            far.price = Decimal('1000.00')
+            far.save()
+        with django_capture_on_commit_callbacks(execute=True):
+            worker.update_product(catalog['other_color_close'])
+
+        assert worker.similar(catalog['base'], limit=1) == [far.pk]
+
+    def test_deleted_product_leaves_index(self, catalog, django_capture_on_commit_callbacks):
+        index = SimilarityIndex()
+        index.similar(catalog['base'])
+        close = catalog['same_color_close']
+
+        with django_capture_on_commit_callbacks(execute=True):
+            index.remove_product(close.pk, close.category_id)
+
+        assert close.pk not in index.similar(catalog['base'])
+
+    def test_saved_index_starts_warm(self, catalog, tmp_path, django_assert_num_queries):
+        index = SimilarityIndex()
+        index.rebuild()
+        path = str(tmp_path / 'similarity.npz')
+        index.save(path)
+
+        warm = SimilarityIndex()
+        warm.load(path)
+
+        with django_assert_num_queries(0):
+            assert warm.similar(catalog['base'], limit=3) == index.similar(catalog['base'], limit=3)
+
+    def test_updates_never_touch_arrays_readers_hold(self, catalog):
+        index = SimilarityIndex()
+        category = index.category(catalog['base'].category_id)
+        ids, colors, features = category.ids, category.colors, category.features
+        snapshot = (ids.copy(), colors.copy(), features.copy())
+
+        category.upsert(catalog['base'].pk, 'red', [0.0, 0.0, 0.0, 0.0])
+        category.upsert(10 ** 6, 'red', [0.0, 0.0, 0.0, 0.0])
+        category.remove(catalog['same_color_close'].pk)
+
+        assert (ids == snapshot[0]).all() and (colors == snapshot[1]).all() and (features == snapshot[2]).all()
+        assert len(category.ids) == len(category.colors) == len(category.features) == len(category.positions) == 4
+        assert category.colors[category.positions[catalog['base'].pk]] == 'red'
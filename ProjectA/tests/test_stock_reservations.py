@@ -0,0 +1,243 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+
+from cart.cleanup import stale_carts
+from cart.models import Cart
+from main.models import Product, ProductSize
+from orders.models import StockReservation
+from orders.reservations import release_cart, release_expired, reserve_cart
+from orders.services import InsufficientStock, place_order
+
+
+User = get_user_model()
+
+
+def details(user):
+    return {'first_name': 'Test', 'last_name': 'User', 'email': user.email}
+
+
+@pytest.fixture
+def other_user(db):
+    return User.objects.create_user(
+        email='other@example.com', password='testpass123', first_name='Other', last_name='User',
+    )
+
+
+@pytest.fixture
+def stocked_product(product):
+    product.stock = 5
+    product.save(update_fields=['stock'])
+    return product
+
+
+@pytest.mark.django_db
+class TestReserveCart:
+
+    def test_reserve_holds_stock(self, user, stocked_product, product_with_sizes):
+        product_size = product_with_sizes.product_sizes.first()
+        cart = Cart.for_user(user)
+        cart.add_product(stocked_product, None, 2)
+        cart.add_product(product_with_sizes, product_size, 3)
+
+        expires_at = reserve_cart(cart, ttl=60)
+
+        product_size.refresh_from_db()
+        stocked_product.refresh_from_db()
+        product_with_sizes.refresh_from_db()
+        assert expires_at > timezone.now()
+        assert cart.reservations.count() == 2
+        assert (product_size.reserved, product_size.available_stock) == (3, 7)
+        assert (stocked_product.reserved, stocked_product.available_stock) == (2, 3)
+        assert product_with_sizes.reserved == 3
+
+    def test_second_reserve_replaces_holds(self, user, stocked_product):
+        cart = Cart.for_user(user)
+        item = cart.add_product(stocked_product, None, 2)
+        reserve_cart(cart)
+
+        cart.update_item_quantity(item.id, 4)
+        reserve_cart(cart)
+
+        assert cart.reservations.get().quantity == 4
+        assert Product.objects.get(pk=stocked_product.pk).reserved == 4
+
+    def test_holds_block_other_carts(self, user, other_user, stocked_product):
+        Cart.for_user(user).add_product(stocked_product, None, 4)
+        reserve_cart(Cart.for_user(user))
+        cart = Cart.for_user(other_user)
+        cart.add_product(stocked_product, None, 2)
+
+        with pytest.raises(InsufficientStock) as error:
+            place_order(cart, other_user, **details(other_user))
+
+        assert error.value.shortages[0]['available'] == 1
+        assert Product.objects.get(pk=stocked_product.pk).reserved == 4
+
+    def test_order_consumes_holds(self, user, stocked_product, product_with_sizes):
+        product_size = product_with_sizes.product_sizes.first()
+        cart = Cart.for_user(user)
+        cart.add_product(stocked_product, None, 5)
+        cart.add_product(product_with_sizes, product_size, 10)
+        reserve_cart(cart)
+
+        place_order(cart, user, **details(user))
+
+        product_size.refresh_from_db()
+        stocked_product.refresh_from_db()
+        product_with_sizes.refresh_from_db()
+        assert (product_size.stock, product_size.reserved) == (0, 0)
+        assert (stocked_product.stock, stocked_product.reserved) == (0, 0)
+        assert product_with_sizes.reserved == 0
+        assert not StockReservation.objects.exists()
+
+    def test_release_cart(self, user, stocked_product):
+        cart = Cart.for_user(user)
+        cart.add_product(stocked_product, None, 3)
+        reserve_cart(cart)
+
+        assert release_cart(cart) == 1
+        assert Product.objects.get(pk=stocked_product.pk).reserved == 0
+
+    def test_fully_reserved_product_is_out_of_stock(self, user, stocked_product):
+        cart = Cart.for_user(user)
+        cart.add_product(stocked_product, None, 5)
+
+        reserve_cart(cart)
+        assert not Product.objects.get(pk=stocked_product.pk).is_in_stock
+        assert not Product.objects.filter(is_in_stock=True).exists()
+
+        release_cart(cart)
+        assert Product.objects.get(pk=stocked_product.pk).is_in_stock
+
+    def test_carts_with_holds_are_not_purged(self, user, stocked_product):
+        cart = Cart.for_user(user)
+        cart.add_product(stocked_product, None, 1)
+        reserve_cart(cart)
+
+        assert not stale_carts(0, 0, now=timezone.now() + timedelta(days=1)).filter(pk=cart.pk).exists()
+
+
+@pytest.mark.django_db
+class TestReleaseExpired:
+
+    def test_expired_holds_are_released_in_batches(self, user, other_user, stocked_product, product_with_sizes):
+        product_size = product_with_sizes.product_sizes.first()
+        for owner in (user, other_user):
+            cart = Cart.for_user(owner)
+            cart.add_product(stocked_product, None, 1)
+            cart.add_product(product_with_sizes, product_size, 2)
+            reserve_cart(cart)
+        Cart.for_user(user).reservations.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        assert release_expired(batch_size=1) == 2
+
+        product_size.refresh_from_db()
+        assert product_size.reserved == 2
+        assert Product.objects.get(pk=stocked_product.pk).reserved == 1
+        assert Product.objects.get(pk=product_with_sizes.pk).reserved == 2
+        assert StockReservation.objects.filter(cart__user=other_user).count() == 2
+
+    def test_expired_holds_still_cover_own_checkout(self, user, stocked_product):
+        cart = Cart.for_user(user)
+        cart.add_product(stocked_product, None, 5)
+        reserve_cart(cart)
+        cart.reservations.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        place_order(cart, user, **details(user))
+
+        stocked_product.refresh_from_db()
+        assert (stocked_product.stock, stocked_product.reserved) == (0, 0)
+
+
+@pytest.mark.django_db
+class TestReservationViews:
+
+    def test_api_reserve(self, auth_client, user, stocked_product):
+        Cart.for_user(user).add_product(stocked_product, None, 2)
+
+        response = auth_client.post('/api/orders/reserve/')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['expires_at']
+        assert Product.objects.get(pk=stocked_product.pk).reserved == 2
+
+    def test_api_reserve_reports_shortages(self, auth_client, user, stocked_product):
+        Cart.for_user(user).add_product(stocked_product, None, 6)
+
+        response = auth_client.post('/api/orders/reserve/')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['shortages'][0]['available'] == 5
+
+    def test_cart_respects_reserved_sizes(self, api_client, product_with_sizes):
+        product_size = product_with_sizes.product_sizes.first()
+        ProductSize.objects.filter(pk=product_size.pk).update(reserved=8)
+
+        response = api_client.post(
+            '/api/cart/add/',
+            {'product_id': product_with_sizes.id, 'product_size_id': product_size.id, 'quantity': 3},
+            format='json',
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['error'] == 'Доступно лише 2 шт.'
+
+    def test_own_holds_count_towards_cart_changes(self, auth_client, user, product_with_sizes):
+        product_size = product_with_sizes.product_sizes.first()
+        ProductSize.objects.filter(pk=product_size.pk).update(stock=5)
+        cart = Cart.for_user(user)
+        item = cart.add_product(product_with_sizes, product_size, 3)
+        reserve_cart(cart)
+
+        response = auth_client.patch(f'/api/cart/update/{item.id}/', {'quantity': 5}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+
+        response = auth_client.patch(f'/api/cart/update/{item.id}/', {'quantity': 6}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['error'] == 'Доступно лише 5 шт.'
+
+    def test_cart_pages_count_own_holds(self, client, user, product_with_sizes):
+        product_size = product_with_sizes.product_sizes.first()
+        ProductSize.objects.filter(pk=product_size.pk).update(stock=5)
+        cart = Cart.for_user(user)
+        cart.add_product(product_with_sizes, product_size, 3)
+        reserve_cart(cart)
+        client.force_login(user)
+
+        response = client.get('/cart/summary/', HTTP_HX_REQUEST='true')
+
+        assert response.context['cart_items'][0].available_stock == 5
+        assert '(5 шт.)' in response.content.decode()
+
+    def test_full_saves_keep_live_holds(self, user, stocked_product, product_with_sizes):
+        product_size = product_with_sizes.product_sizes.first()
+        stale_product = Product.objects.get(pk=stocked_product.pk)
+        stale_size = ProductSize.objects.get(pk=product_size.pk)
+        cart = Cart.for_user(user)
+        cart.add_product(stocked_product, None, 2)
+        cart.add_product(product_with_sizes, product_size, 3)
+        reserve_cart(cart)
+
+        stale_product.price = 100
+        stale_product.save()
+        stale_size.stock = 20
+        stale_size.save()
+
+        assert Product.objects.get(pk=stocked_product.pk).reserved == 2
+        assert ProductSize.objects.get(pk=product_size.pk).reserved == 3
+
+    def test_full_saves_skip_deferred_fields(self, stocked_product):
+        product = Product.objects.defer('stock', 'description').get(pk=stocked_product.pk)
+        product.price = 100
+
+        with CaptureQueriesContext(connection) as queries:
+            product.save()
+
+        update = next(q['sql'] for q in queries if q['sql'].startswith('UPDATE "main_product"'))
+        assert '"stock"' not in update and '"description"' not in update
@@ -0,0 +1,104 @@
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+from main.models import Category, Product
+from main.suggest import SuggestIndex
+from recommendations.models import ProductScore
+
+
+@pytest.fixture
+def catalog(db, category, seller):
+    def create(name, slug, views_count=0):
+        return Product.objects.create(
+            name=name, slug=slug, category=category, price=Decimal('100.00'),
+            description='Опис', seller=seller, views_count=views_count,
+        )
+
+    products = {
+        'air': create('Кросівки Nike Air', 'nike-air', views_count=10),
+        'pegasus': create('Кросівки Nike Pegasus', 'nike-pegasus', views_count=50),
+        'ultra': create('Кросівки Adidas Ultraboost', 'adidas-ultra', views_count=5),
+        'shirt': create('Футболка Nike', 'nike-shirt', views_count=100),
+    }
+    ProductScore.objects.filter(product=products['ultra']).update(total_sales=20)
+    Category.objects.create(name='Кросівки', slug='sneakers')
+    return products
+
+
+@pytest.mark.django_db
+class TestSuggestIndex:
+
+    def test_prefix_matches_are_ranked_by_views_and_sales(self, catalog):
+        result = SuggestIndex().suggest('крос')
+
+        assert [item['slug'] for item in result['products']] == ['adidas-ultra', 'nike-pegasus', 'nike-air']
+        assert [item['slug'] for item in result['categories']] == ['sneakers']
+
+    def test_every_term_must_match(self, catalog):
+        result = SuggestIndex().suggest('nike крос', limit=1)
+
+        assert [item['slug'] for item in result['products']] == ['nike-pegasus']
+        assert result['categories'] == []
+
+    def test_short_queries_are_ignored(self, catalog):
+        assert SuggestIndex().suggest('к') == {'products': [], 'categories': []}
+
+    def test_index_is_served_from_memory(self, catalog):
+        index = SuggestIndex()
+        index.suggest('крос')
+
+        with CaptureQueriesContext(connection) as queries:
+            index.suggest('nike')
+
+        assert len(queries) == 0
+
+    def test_saves_update_the_built_index(self, catalog, django_capture_on_commit_callbacks):
+        index = SuggestIndex()
+        index.rebuild()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            index.update('product', catalog['shirt'].pk, 'Кросівки Nike Court', 'nike-shirt')
+            index.remove('product', catalog['air'].pk)
+
+        with CaptureQueriesContext(connection) as queries:
+            result = index.suggest('кросівки nike')
+
+        assert len(queries) == 0
+        assert [item['slug'] for item in result['products']] == ['nike-shirt', 'nike-pegasus']
+
+    def test_other_workers_rebuild_after_changes(self, catalog, django_capture_on_commit_callbacks):
+        worker = SuggestIndex()
+        worker.suggest('крос')
+
+        with django_capture_on_commit_callbacks(execute=True):
+            catalog['shirt'].name = 'Кросівки Puma'
+            catalog['shirt'].save()
+
+        assert 'nike-shirt' in [item['slug'] for item in worker.suggest('puma')['products']]
+
+    def test_interleaved_changes_leave_the_index_stale(self, catalog, django_capture_on_commit_callbacks):
+        worker = SuggestIndex()
+        worker.rebuild()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            catalog['ultra'].name = 'Кросівки Puma'
+            catalog['ultra'].save()
+        with django_capture_on_commit_callbacks(execute=True):
+            worker.update('product', catalog['shirt'].pk, 'Футболка Nike Court', 'nike-shirt')
+
+        assert 'adidas-ultra' in [item['slug'] for item in worker.suggest('puma')['products']]
+
+
+@pytest.mark.django_db
+class TestSuggestAPI:
+
+    def test_suggest_endpoint(self, api_client, catalog):
+        response = api_client.get('/api/products/suggest/', {'q': 'Крос', 'limit': 2})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [item['slug'] for item in response.data['products']] == ['adidas-ultra', 'nike-pegasus']
+        assert response.data['categories'][0]['name'] == 'Кросівки'
@@ -0,0 +1,105 @@
+from decimal import Decimal
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework import status
+
+from orders.models import Order, OrderItem
+from recommendations.user_cache import KEY, LRUCache, UserRecommendationCache
+from recommendations.views import get_engine
+
+
+def make_order(user, products):
+    order = Order.objects.create(
+        user=user,
+        first_name='Test',
+        last_name='User',
+        email=user.email,
+        total_price=Decimal('0'),
+    )
+    for product in products:
+        OrderItem.objects.create(order=order, product=product, quantity=1, price=product.price)
+    return order
+
+
+class TestLRUCache:
+
+    def test_least_recently_used_entry_is_evicted(self):
+        lru = LRUCache(max_size=2, timeout=60)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        lru.get('a')
+        lru.set('c', 3)
+
+        assert lru.get('a') == 1
+        assert lru.get('b') is None
+        assert lru.get('c') == 3
+
+    def test_expired_entries_are_dropped(self):
+        lru = LRUCache(max_size=2, timeout=-1)
+        lru.set('a', 1)
+
+        assert lru.get('a') is None
+        assert len(lru) == 0
+
+
+@pytest.mark.django_db
+class TestUserRecommendationCache:
+
+    def test_get_for_user_recommends_from_purchased_categories(self, user, products):
+        make_order(user, [products[1]])
+
+        result = get_engine().get_for_user(user, limit=3)
+
+        assert products[1] not in result
+        assert result[0] in (products[0], products[2])
+        assert len(result) == len({product.pk for product in result})
+
+    def test_recommendations_are_computed_once(self, user, products, monkeypatch):
+        recommendation_cache = UserRecommendationCache(size=5)
+        engine = get_engine()
+        calls = []
+        compute = recommendation_cache.compute
+        monkeypatch.setattr(recommendation_cache, 'compute', lambda *args: calls.append(args) or compute(*args))
+
+        first = recommendation_cache.get(engine, user, limit=3)
+        second = recommendation_cache.get(engine, user, limit=3)
+
+        assert first == second
+        assert len(calls) == 1
+
+    def test_placing_order_invalidates_cache(self, user, products, django_capture_on_commit_callbacks):
+        recommendation_cache = UserRecommendationCache(size=5)
+        engine = get_engine()
+        recommendation_cache.get(engine, user)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            make_order(user, [products[0]])
+
+        assert cache.get(KEY.format(user.pk)) is None
+
+    def test_precompute_command_fills_cache_for_active_users(self, user, seller, products):
+        user.last_login = timezone.now()
+        user.save(update_fields=['last_login'])
+
+        call_command('precompute_recommendations')
+
+        assert cache.get(KEY.format(user.pk)) is not None
+        assert cache.get(KEY.format(seller.pk)) is None
+
+    def test_api_serves_cached_recommendations(self, auth_client, user, products):
+        make_order(user, [products[1]])
+        cached = [products[4].pk, products[3].pk]
+        cache.set(KEY.format(user.pk), cached)
+
+        response = auth_client.get('/api/recommendations/', {'type': 'for_user', 'limit': 5})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [item['id'] for item in response.data['products']] == cached
+
+        response = auth_client.get('/api/recommendations/home/')
+
+        assert response.data['blocks'][0]['type'] == 'for_user'
+        assert [item['id'] for item in response.data['blocks'][0]['products']] == cached
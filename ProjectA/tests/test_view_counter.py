@@ -0,0 +1,64 @@
+import pytest
+from rest_framework import status
+
+from main.models import Product
+from main.view_counter import ViewCounter, view_counter
+
+
+@pytest.mark.django_db
+class TestViewCounter:
+
+    def test_increments_are_buffered(self, product):
+        view_counter.increment(product.pk)
+        view_counter.increment(product.pk)
+        product.refresh_from_db()
+
+        assert product.views_count == 0
+        assert view_counter.pending(product.pk) == 2
+        assert view_counter.live_count(product) == 2
+
+    def test_flush_writes_all_products(self, products):
+        for i, product in enumerate(products):
+            view_counter.increment(product.pk, amount=i + 1)
+
+        flushed = view_counter.flush()
+
+        assert flushed == sum(range(1, len(products) + 1))
+        for i, product in enumerate(products):
+            product.refresh_from_db()
+            assert product.views_count == i + 1
+            assert view_counter.pending(product.pk) == 0
+
+    def test_flush_adds_to_existing_count(self, product):
+        Product.objects.filter(pk=product.pk).update(views_count=10)
+        view_counter.increment(product.pk, amount=5)
+
+        view_counter.flush()
+        product.refresh_from_db()
+
+        assert product.views_count == 15
+
+    def test_flush_with_nothing_pending(self, db):
+        assert view_counter.flush() == 0
+
+    def test_counters_are_isolated_by_key(self, product):
+        other = ViewCounter(key='test_views:pending')
+        other.increment(product.pk)
+
+        assert view_counter.pending(product.pk) == 0
+        assert other.flush() == 1
+
+    def test_api_detail_reports_live_count(self, api_client, product):
+        api_client.get(f'/api/products/{product.slug}/')
+        response = api_client.get(f'/api/products/{product.slug}/')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['views_count'] == 2
+
+    def test_html_detail_buffers_views(self, client, product):
+        response = client.get(f'/product/{product.slug}')
+        product.refresh_from_db()
+
+        assert response.status_code == status.HTTP_200_OK
+        assert product.views_count == 0
+        assert view_counter.pending(product.pk) == 1
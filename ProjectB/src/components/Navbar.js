@@ -1,14 +1,29 @@
-import React, { useState } from 'react';
+import React, { useState, useEffect } from 'react';
 import { Link, useNavigate } from 'react-router-dom';
 import { useAuth } from '../context/AuthContext';
 import { useCart } from '../context/CartContext';
+import { productsAPI } from '../services/api';
 
 function Navbar({ categories }) {
   const [searchQuery, setSearchQuery] = useState('');
+  const [suggestions, setSuggestions] = useState([]);
   const { user, isAuthenticated, logout } = useAuth();
   const { totalItems } = useCart();
   const navigate = useNavigate();
 
+  useEffect(() => {
+    if (searchQuery.trim().length < 2) {
+      setSuggestions([]);
+      return undefined;
+    }
+    const timer = setTimeout(() => {
+      productsAPI.suggest(searchQuery.trim())
+        .then((response) => setSuggestions([...response.data.products, ...response.data.categories]))
+        .catch(() => setSuggestions([]));
+    }, 150);
+    return () => clearTimeout(timer);
+  }, [searchQuery]);
+
   const handleSearch = (e) => {
     e.preventDefault();
     if (searchQuery.trim()) {
@@ -33,7 +48,14 @@ function Navbar({ categories }) {
                 placeholder="Я шукаю..."
                 value={searchQuery}
                 onChange={(e) => setSearchQuery(e.target.value)}
+                list="search-suggestions"
+                autoComplete="off"
               />
+              <datalist id="search-suggestions">
+                {suggestions.map((item) => (
+                  <option key={`${item.slug}-${item.id}`} value={item.name} />
+                ))}
+              </datalist>
               <button type="submit" className="btn search-btn">
                 <i className="bi bi-search"></i>
               </button>
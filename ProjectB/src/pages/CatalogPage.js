@@ -11,6 +11,9 @@ function CatalogPage() {
   const [products, setProducts] = useState([]);
   const [categories, setCategories] = useState([]);
   const [sizes, setSizes] = useState([]);
+  const [facets, setFacets] = useState(null);
+  const [nextUrl, setNextUrl] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [currentCategory, setCurrentCategory] = useState(null);
   const [loading, setLoading] = useState(true);
 
@@ -52,6 +55,8 @@ function CatalogPage() {
         if (size) params.size = size;
         if (inStock) params.in_stock = 'true';
 
+        const facetsRequest = productsAPI.getFacets({ ...params });
+
         switch (sort) {
           case 'price_asc':
             params.ordering = 'price';
@@ -66,8 +71,10 @@ function CatalogPage() {
             params.ordering = '-created_at';
         }
 
-        const productsRes = await productsAPI.getAll(params);
-        setProducts(productsRes.data);
+        const [productsRes, facetsRes] = await Promise.all([productsAPI.getAll(params), facetsRequest]);
+        setProducts(productsRes.data.results);
+        setNextUrl(productsRes.data.next);
+        setFacets(facetsRes.data);
       } catch (error) {
         console.error('Error fetching data:', error);
       } finally {
@@ -78,6 +85,19 @@ function CatalogPage() {
     fetchData();
   }, [categorySlug, searchParams, sort, minPrice, maxPrice, color, size, inStock, searchQuery]);
 
+  const handleLoadMore = async () => {
+    setLoadingMore(true);
+    try {
+      const response = await api.get(nextUrl);
+      setProducts(prev => [...prev, ...response.data.results]);
+      setNextUrl(response.data.next);
+    } catch (error) {
+      console.error('Error loading more products:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleApplyFilters = (e) => {
     e.preventDefault();
     const newParams = new URLSearchParams();
@@ -136,7 +156,7 @@ function CatalogPage() {
             <small className="text-muted fs-6"> — результати пошуку "{searchQuery}"</small>
           )}
         </h1>
-        <span className="text-muted">{products.length} товарів</span>
+        <span className="text-muted">{facets ? facets.total : products.length} товарів</span>
       </div>
 
       <div className="row">
@@ -177,8 +197,14 @@ function CatalogPage() {
                   className="form-control"
                   placeholder="Введіть колір"
                   value={color}
+                  list="color-options"
                   onChange={(e) => setColor(e.target.value)}
                 />
+                <datalist id="color-options">
+                  {Object.entries(facets?.color || {}).map(([value, count]) => (
+                    <option key={value} value={value}>{value} ({count})</option>
+                  ))}
+                </datalist>
               </div>
 
               {(currentCategory?.requires_size || !categorySlug) && sizes.length > 0 && (
@@ -191,7 +217,9 @@ function CatalogPage() {
                   >
                     <option value="">Всі розміри</option>
                     {sizes.map(s => (
-                      <option key={s.id} value={s.id}>{s.name}</option>
+                      <option key={s.id} value={s.id}>
+                        {s.name}{facets ? ` (${facets.size[s.name] || 0})` : ''}
+                      </option>
                     ))}
                   </select>
                 </div>
@@ -247,7 +275,7 @@ function CatalogPage() {
                   >
                     <i className="bi bi-chevron-right me-2"></i>
                     {category.name}
-                    <span className="text-muted"> ({category.products_count || 0})</span>
+                    <span className="text-muted"> ({facets ? facets.category[category.slug] || 0 : category.products_count || 0})</span>
                   </Link>
                 </li>
               ))}
@@ -286,6 +314,13 @@ function CatalogPage() {
                   <ProductCard product={product} />
                 </div>
               ))}
+              {nextUrl && (
+                <div className="col-12 text-center mt-4">
+                  <button className="btn btn-outline-success" onClick={handleLoadMore} disabled={loadingMore}>
+                    {loadingMore ? 'Завантаження...' : 'Показати ще'}
+                  </button>
+                </div>
+              )}
             </div>
           ) : (
             <div className="bg-white rounded-4 p-5 text-center">
@@ -2,7 +2,9 @@ import React, { useState, useEffect, useContext } from 'react';
 import { useNavigate, Link } from 'react-router-dom';
 import { AuthContext } from '../context/AuthContext';
 import { CartContext } from '../context/CartContext';
-import api, { getImageUrl } from '../services/api';
+import api, { getImageUrl, ordersAPI } from '../services/api';
+
+const TICKET_POLL_INTERVAL = 2000;
 
 const CheckoutPage = () => {
     const navigate = useNavigate();
@@ -27,6 +29,7 @@ const CheckoutPage = () => {
 
     const [loading, setLoading] = useState(false);
     const [errors, setErrors] = useState({});
+    const [queuePosition, setQueuePosition] = useState(null);
 
     useEffect(() => {
         if (!isAuthenticated) {
@@ -68,6 +71,17 @@ const CheckoutPage = () => {
         }, 0);
     };
 
+    const waitForTicket = async (ticket) => {
+        while (true) {
+            await new Promise(resolve => setTimeout(resolve, TICKET_POLL_INTERVAL));
+            const { data } = await ordersAPI.getTicket(ticket);
+            if (data.status !== 'queued') {
+                return data;
+            }
+            setQueuePosition(data.position);
+        }
+    };
+
     const handleSubmit = async (paymentProvider) => {
         setLoading(true);
         setErrors({});
@@ -78,9 +92,17 @@ const CheckoutPage = () => {
                 payment_provider: paymentProvider,
             });
 
-            if (response.data.order_id) {
+            let result = response.data;
+            if (response.status === 202) {
+                setQueuePosition(result.position);
+                result = await waitForTicket(result.ticket);
+            }
+
+            if (result.order_id) {
                 clearCart();
-                navigate(`/orders/${response.data.order_id}/success`);
+                navigate(`/orders/${result.order_id}/success`);
+            } else if (result.error) {
+                setErrors({ error: result.error });
             }
         } catch (error) {
             if (error.response?.data) {
@@ -89,6 +111,7 @@ const CheckoutPage = () => {
                 setErrors({ general: 'Помилка при оформленні замовлення' });
             }
         } finally {
+            setQueuePosition(null);
             setLoading(false);
         }
     };
@@ -131,6 +154,11 @@ const CheckoutPage = () => {
                             {errors.error && (
                                 <div className="alert alert-danger">{errors.error}</div>
                             )}
+                            {queuePosition && (
+                                <div className="alert alert-info">
+                                    Ви в черзі на оформлення, позиція {queuePosition}. Не закривайте сторінку.
+                                </div>
+                            )}
 
                             <form>
                                 <div className="mb-3">
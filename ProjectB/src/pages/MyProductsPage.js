@@ -29,8 +29,14 @@ const MyProductsPage = () => {
     const fetchProducts = async () => {
         try {
             setLoading(true);
-            const response = await api.get(`/users/${user.id}/products/`);
-            setProducts(response.data || []);
+            const loaded = [];
+            let url = `/users/${user.id}/products/?page_size=100`;
+            while (url) {
+                const response = await api.get(url);
+                loaded.push(...response.data.results);
+                url = response.data.next;
+            }
+            setProducts(loaded);
         } catch (err) {
             setError('Помилка завантаження товарів');
             console.error(err);
@@ -58,6 +58,8 @@ export const productsAPI = {
   getPopular: () => api.get('/products/popular/'),
   getRelated: (slug) => api.get(`/products/${slug}/related/`),
   search: (query) => api.get('/products/', { params: { search: query } }),
+  suggest: (query) => api.get('/products/suggest/', { params: { q: query } }),
+  getFacets: (params) => api.get('/products/facets/', { params }),
 };
 
 export const categoriesAPI = {
@@ -90,6 +92,7 @@ export const ordersAPI = {
   getAll: () => api.get('/orders/'),
   getById: (id) => api.get(`/orders/${id}/`),
   create: (data) => api.post('/orders/checkout/', data),
+  getTicket: (ticket) => api.get(`/orders/tickets/${ticket}/`),
 };
 
 export default api;
\ No newline at end of file